@@ -1,10 +1,11 @@
 from fastapi import APIRouter
 
 
-from api.v1.endpoints import usuario
+from api.v1.endpoints import diagnostico, usuario
 
 
 api_router = APIRouter()
 
 
 api_router.include_router(usuario.router, prefix="/usuarios", tags=["usuarios"])
+api_router.include_router(diagnostico.router, prefix="/diagnostico", tags=["diagnostico"])
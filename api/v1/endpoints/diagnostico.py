@@ -0,0 +1,74 @@
+import asyncio
+
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+from schemas.diagnostico_schema import CapturaLentasSchema
+from core.cache import Principal
+from core.configs import settings
+from core.deps import get_current_admin
+from core.perfil import amostrar_pilhas, captura_lentas
+from core.rotas import RotaMedida
+
+
+router = APIRouter(default_response_class=ORJSONResponse, route_class=RotaMedida)
+
+# Uma amostragem por vez em cada processo
+_perfil_em_andamento = asyncio.Lock()
+
+
+def _captura() -> dict:
+    return {
+        "ativo": captura_lentas.ativo,
+        "limiar_ms": captura_lentas.limiar_ms,
+        "requisicoes": captura_lentas.listar(),
+    }
+
+
+# GET Profiler por amostragem (administradores)
+@router.get("/perfil", response_class=PlainTextResponse)
+async def get_perfil(
+    segundos: float = Query(10, gt=0, le=settings.PERFIL_MAX_SEGUNDOS),
+    intervalo_ms: float = Query(10, ge=1, le=1000),
+    usuario_logado: Principal = Depends(get_current_admin),
+):
+    """
+    Amostra as pilhas de todas as threads do processo durante `segundos`
+    e retorna o resultado no formato "collapsed" (flamegraph.pl,
+    speedscope). Cada chamada perfila apenas o worker que a atendeu.
+    """
+    if _perfil_em_andamento.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma amostragem em andamento neste processo.",
+        )
+
+    async with _perfil_em_andamento:
+        pilhas = await asyncio.to_thread(amostrar_pilhas, segundos, intervalo_ms / 1000)
+
+    return PlainTextResponse(
+        pilhas,
+        headers={"Content-Disposition": 'attachment; filename="perfil.collapsed"'},
+    )
+
+
+# GET Requisições lentas capturadas (administradores)
+@router.get("/lentas")
+def get_lentas(usuario_logado: Principal = Depends(get_current_admin)):
+    return _captura()
+
+
+# PUT Liga/desliga a captura de requisições lentas e ajusta o limiar
+@router.put("/lentas")
+def put_lentas(
+    dados: CapturaLentasSchema, usuario_logado: Principal = Depends(get_current_admin)
+):
+    captura_lentas.configurar(ativo=dados.ativo, limiar_ms=dados.limiar_ms)
+    return _captura()
+
+
+# DELETE Esvazia o buffer de requisições lentas
+@router.delete("/lentas", status_code=status.HTTP_204_NO_CONTENT)
+def delete_lentas(usuario_logado: Principal = Depends(get_current_admin)):
+    captura_lentas.limpar()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
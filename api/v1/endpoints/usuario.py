@@ -1,8 +1,8 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
 
-from fastapi import APIRouter, status, Depends, HTTPException, Response
+from fastapi import APIRouter, status, Depends, HTTPException, Response, Query, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -13,72 +13,341 @@ from schemas.usuario_schema import (
     UsuarioSchemaBase,
     UsuarioSchemaCreate,
     UsuarioSchemaUp,
+    RefreshTokenSchema,
+    RevogacaoSchema,
+    IntrospeccaoSchema,
 )
-from core.deps import get_session, get_current_user
-from core.security import gerar_hash_senha
-from core.auth import autenticar, criar_token_acesso
+from core.cache import Principal, cache_principais
+from core.configs import settings
+from core.paginacao import codificar_cursor, decodificar_cursor, escapar_like
+from core.consultas import COLUNAS_PRINCIPAL
+from core.database import UnidadeTrabalho
+from core.deps import (
+    get_session,
+    get_session_leitura,
+    get_unidade_trabalho,
+    get_current_user,
+    get_current_admin,
+    get_token_payload,
+    verificar_gateway,
+)
+from core.revogacao import encerrar_sessao, encerrar_sessoes, revogar_token
+from core.security import gerar_hash_senha_async
+from core.admissao import verificar_prazo
+from core.auth import autenticar, emitir_tokens, renovar_tokens
+from core.filtro_emails import filtro_emails
+from core.busca import BuscaExpiradaError, buscar_usuarios
+from core.exportacao import TIPOS_EXPORTACAO, aceita_gzip, exportar_usuarios
+from core.importacao import ImportadorUsuarios, linhas_do_corpo
+from core.introspeccao import introspectar_tokens
+from core.rotas import RotaMedida
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse, route_class=RotaMedida)
 
 
 # GET Logado
 @router.get("/logado", response_model=UsuarioSchemaBase)
-def get_logado(usuario_logado: UsuarioModel = Depends(get_current_user)):
-    return usuario_logado
+def get_logado(usuario_logado: Principal = Depends(get_current_user)):
+    # Principal já vem validado: serializa direto, sem o response_model
+    return ORJSONResponse(usuario_logado._asdict())
+
 
+# GET Estatísticas do cache de usuários autenticados
+@router.get("/cache")
+def get_cache_estatisticas(usuario_logado: Principal = Depends(get_current_admin)):
+    return cache_principais.estatisticas()
 
-# GET / Listar todos os usuários
+
+# GET / Listar usuários (paginação por cursor, keyset no id)
 @router.get("/", response_model=List[UsuarioSchemaBase])
-async def get_usuarios(db: AsyncSession = Depends(get_session)):
+async def get_usuarios(
+    limite: int = Query(
+        settings.LISTAGEM_LIMITE_PADRAO, ge=1, le=settings.LISTAGEM_LIMITE_MAXIMO
+    ),
+    cursor: Optional[str] = None,
+    eh_admin: Optional[bool] = None,
+    email_prefixo: Optional[str] = Query(None, min_length=1),
+    db: AsyncSession = Depends(get_session_leitura),
+):
+    """
+    Retorna até `limite` usuários ordenados por id. Quando há mais
+    resultados, o cursor da próxima página vem no header X-Proximo-Cursor.
+    """
+    posicao = decodificar_cursor(cursor)
+
+    query = select(*COLUNAS_PRINCIPAL).order_by(UsuarioModel.id).limit(limite + 1)
+    if posicao is not None:
+        if not isinstance(posicao.get("id"), int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido.",
+            )
+        query = query.filter(UsuarioModel.id > posicao["id"])
+    if eh_admin is not None:
+        query = query.filter(UsuarioModel.eh_admin == eh_admin)
+    if email_prefixo:
+        # LIKE 'prefixo%' aproveita o índice de email
+        query = query.filter(
+            UsuarioModel.email.like(f"{escapar_like(email_prefixo)}%", escape="\\")
+        )
+
     async with db as session:
-        query = select(UsuarioModel)
         result = await session.execute(query)
-        usuarios = result.scalars().unique().all()
-        return usuarios
+        usuarios = [linha._asdict() for linha in result]
+
+    headers = {}
+    if len(usuarios) > limite:
+        usuarios = usuarios[:limite]
+        headers["X-Proximo-Cursor"] = codificar_cursor({"id": usuarios[-1]["id"]})
+
+    # Linhas projetadas direto das colunas de UsuarioSchemaBase: dispensa
+    # a revalidação pelo response_model
+    return ORJSONResponse(usuarios, headers=headers)
+
+
+# GET / Busca de usuários por nome, sobrenome e email
+@router.get("/busca", response_model=List[UsuarioSchemaBase])
+async def get_busca(
+    q: str = Query(..., min_length=3, max_length=256),
+    limite: int = Query(settings.BUSCA_LIMITE_PADRAO, ge=1, le=settings.BUSCA_LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    usuario_logado: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_session_leitura),
+):
+    """
+    Busca usuários cujo nome, sobrenome ou email contenham todos os termos
+    de `q` (no início ou no meio), usando o índice de texto do banco. Os
+    resultados vêm ordenados por relevância; quando há mais resultados, o
+    cursor da próxima página vem no header X-Proximo-Cursor.
+    """
+    posicao = decodificar_cursor(cursor) or {"o": 0}
+    deslocamento = posicao.get("o")
+    if not isinstance(deslocamento, int) or not 0 <= deslocamento < settings.BUSCA_MAX_RESULTADOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        )
+    limite = min(limite, settings.BUSCA_MAX_RESULTADOS - deslocamento)
+
+    try:
+        async with db as session:
+            usuarios = await buscar_usuarios(
+                session, q, limite + 1, deslocamento, settings.BUSCA_TEMPO_LIMITE_MS
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except BuscaExpiradaError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="A busca passou do tempo limite; use termos mais específicos.",
+        )
+
+    headers = {}
+    if len(usuarios) > limite:
+        usuarios = usuarios[:limite]
+        if deslocamento + limite < settings.BUSCA_MAX_RESULTADOS:
+            headers["X-Proximo-Cursor"] = codificar_cursor({"o": deslocamento + limite})
+
+    return ORJSONResponse(usuarios, headers=headers)
+
+
+# GET / Exportação de usuários (NDJSON ou CSV, em streaming)
+@router.get("/exportar", response_class=StreamingResponse)
+async def exportar(
+    request: Request,
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    usuario_logado: Principal = Depends(get_current_admin),
+    unidade: UnidadeTrabalho = Depends(get_unidade_trabalho),
+):
+    """
+    Exporta todos os usuários (sem as senhas) em NDJSON ou CSV, gerados
+    em pedaços a partir de um cursor no servidor. Compacta com gzip
+    quando o cliente aceita.
+    """
+    gzip = aceita_gzip(request.headers.get("accept-encoding"))
+    headers = {
+        "Content-Disposition": f'attachment; filename="usuarios.{formato}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        exportar_usuarios(unidade.nova_sessao_leitura, formato, settings.EXPORTACAO_TAMANHO_LOTE, gzip=gzip),
+        media_type=TIPOS_EXPORTACAO[formato],
+        headers=headers,
+    )
 
 
 # POST / Signup
 @router.post(
-    "/signup", status_code=status.HTTP_201_CREATED, response_model=UsuarioSchemaBase
+    "/signup",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UsuarioSchemaBase,
+    dependencies=[Depends(verificar_prazo)],
 )
 async def post_usuario(
     usuario: UsuarioSchemaCreate, db: AsyncSession = Depends(get_session)
 ):
+    email_duplicado = HTTPException(
+        status_code=status.HTTP_406_NOT_ACCEPTABLE,
+        detail="Já existe um usuário com este email cadastrado.",
+    )
+
+    # Com o filtro de emails pronto, só os emails que talvez já existam
+    # são conferidos no banco, e os duplicados não chegam a pagar o bcrypt
+    if filtro_emails.pronto and filtro_emails.pode_existir(usuario.email):
+        async with db as session:
+            query = select(UsuarioModel.id).filter(UsuarioModel.email == usuario.email)
+            if (await session.execute(query)).first() is not None:
+                raise email_duplicado
+
     novo_usuario: UsuarioModel = UsuarioModel(
         nome=usuario.nome,
         sobrenome=usuario.sobrenome,
         email=usuario.email,
-        senha=gerar_hash_senha(usuario.senha),
+        senha=await gerar_hash_senha_async(usuario.senha),
         eh_admin=usuario.eh_admin,
     )
     async with db as session:
         try:
             session.add(novo_usuario)
             await session.commit()
+            filtro_emails.adicionar(novo_usuario.email)
 
             return novo_usuario
         except IntegrityError:
-            raise HTTPException(
-                status_code=status.HTTP_406_NOT_ACCEPTABLE,
-                detail="Já existe um usuário com este email cadastrado.",
-            )
+            raise email_duplicado
+
 
+# GET Estatísticas do filtro de emails
+@router.get("/filtro-emails")
+def get_filtro_emails(usuario_logado: Principal = Depends(get_current_admin)):
+    return filtro_emails.estatisticas()
+
+
+# POST / Importação em massa (NDJSON ou CSV, corpo em streaming)
+@router.post("/importar", dependencies=[Depends(verificar_prazo)])
+async def importar_usuarios(
+    request: Request,
+    senhas_hash: bool = False,
+    tamanho_lote: int = Query(settings.IMPORTACAO_TAMANHO_LOTE, ge=1, le=5000),
+    usuario_logado: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Importa usuários a partir de um corpo NDJSON (application/x-ndjson,
+    um UsuarioSchemaCreate por linha) ou CSV (text/csv, com cabeçalho).
+    Com `senhas_hash=true` o campo senha deve conter um hash bcrypt já
+    calculado. Retorna o resultado de cada linha, sem abortar o lote
+    inteiro em caso de conflito de email.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip()
+    if tipo in ("text/csv", "application/csv"):
+        formato = "csv"
+    elif tipo in ("application/x-ndjson", "application/jsonl", "application/json"):
+        formato = "ndjson"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use application/x-ndjson ou text/csv.",
+        )
+
+    async with db as session:
+        importador = ImportadorUsuarios(session, tamanho_lote, senhas_hash=senhas_hash)
+        return await importador.importar(linhas_do_corpo(request.stream()), formato)
 
 
 # POST Login
-@router.post('/login')
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_session)):
-    usuario = await autenticar(email=form_data.username, senha=form_data.password, db=db)
+@router.post('/login', dependencies=[Depends(verificar_prazo)])
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_session),
+    db_leitura: AsyncSession = Depends(get_session_leitura),
+):
+    usuario = await autenticar(
+        email=form_data.username,
+        senha=form_data.password,
+        db=db_leitura,
+        db_escrita=db,
+        ip=request.client.host if request.client else None,
+    )
 
     if not usuario:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail='Dados de acesso incorretos.')
     
-    # Criar token de acesso
-    token_acesso = criar_token_acesso(sub=str(usuario.id))
-    
-    return {
-        "access_token": token_acesso,
-        "token_type": "bearer"
-    }
\ No newline at end of file
+    # Criar tokens de acesso e de renovação
+    return await emitir_tokens(usuario.id, db, usuario=usuario)
+
+
+# POST Refresh
+@router.post('/refresh')
+async def refresh(dados: RefreshTokenSchema, db: AsyncSession = Depends(get_session)):
+    tokens = await renovar_tokens(dados.refresh_token, db)
+
+    if not tokens:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail='Refresh token inválido ou expirado.',
+                            headers={"WWW-Authenticate": "Bearer"})
+
+    return tokens
+
+
+# POST Introspecção de tokens em lote (API gateway)
+@router.post('/introspeccao', dependencies=[Depends(verificar_gateway)])
+async def introspeccao(dados: IntrospeccaoSchema, unidade: UnidadeTrabalho = Depends(get_unidade_trabalho)):
+    """
+    Verifica uma lista de tokens de acesso e retorna, na mesma ordem,
+    {"active": false} ou os claims e o usuário de cada token. Só para o
+    gateway: exige o header X-Gateway-Segredo.
+    """
+    return {"resultados": await introspectar_tokens(dados.tokens, unidade)}
+
+
+# POST Logout (revoga o token de acesso atual e os refresh tokens da mesma sessão)
+@router.post('/logout', status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_session),
+):
+    async with db as session:
+        if payload.get("jti"):
+            await revogar_token(session, payload["jti"], payload.get("exp"))
+        # Sem isso, o refresh token continuaria emitindo tokens de acesso.
+        # Tokens emitidos antes do claim "sid" encerram todas as sessões
+        if payload.get("sid"):
+            await encerrar_sessao(session, int(payload["sub"]), payload["sid"])
+        else:
+            await encerrar_sessoes(session, int(payload["sub"]))
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# POST Logout de todos os dispositivos (revoga o token atual e todos os refresh tokens do usuário)
+@router.post('/logout/todos', status_code=status.HTTP_204_NO_CONTENT)
+async def logout_todos(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_session),
+):
+    async with db as session:
+        if payload.get("jti"):
+            await revogar_token(session, payload["jti"], payload.get("exp"))
+        await encerrar_sessoes(session, int(payload["sub"]))
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# POST Revogar token (administradores)
+@router.post('/revogar', status_code=status.HTTP_204_NO_CONTENT)
+async def revogar(
+    dados: RevogacaoSchema,
+    usuario_logado: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_session),
+):
+    async with db as session:
+        await revogar_token(session, dados.jti)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1 @@
+# Este arquivo torna o diretório benchmarks um módulo Python
@@ -0,0 +1,99 @@
+"""
+Utilitários compartilhados pelos benchmarks: sobe o main:app em processo,
+apontando para um banco SQLite (aiosqlite), e calcula percentis.
+"""
+import sys
+from pathlib import Path
+from typing import AsyncGenerator, List, Tuple
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from core.database import Base, UnidadeTrabalho, criar_engine
+from core.deps import get_unidade_trabalho
+from models.usuario_model import UsuarioModel
+
+SQLITE_MEMORIA = "sqlite+aiosqlite:///:memory:"
+
+
+async def preparar_banco(url: str = SQLITE_MEMORIA) -> Tuple[AsyncEngine, sessionmaker]:
+    """
+    Cria o engine/sessionmaker do benchmark e as tabelas. Fora do SQLite
+    em memória o engine usa o pool configurado em Settings.
+    """
+    import models.__all_models  # noqa: F401
+
+    if url == SQLITE_MEMORIA:
+        engine = create_async_engine(
+            url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = criar_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    return engine, session_maker
+
+
+async def semear_usuarios(
+    session_maker: sessionmaker, quantidade: int, hash_senha: str, inicio: int = 0, lote: int = 5000
+) -> None:
+    """Insere `quantidade` usuários sintéticos em lotes (todos com o mesmo hash)."""
+    async with session_maker() as session:
+        for base in range(inicio, inicio + quantidade, lote):
+            fim = min(base + lote, inicio + quantidade)
+            await session.execute(
+                insert(UsuarioModel),
+                [
+                    {
+                        "nome": f"Nome{i}",
+                        "sobrenome": f"Sobrenome{i}",
+                        "email": f"usuario{i}@bench.com",
+                        "senha": hash_senha,
+                        "eh_admin": i % 10 == 0,
+                    }
+                    for i in range(base, fim)
+                ],
+            )
+        await session.commit()
+
+
+def cliente(session_maker: sessionmaker) -> AsyncClient:
+    """Cliente HTTP em processo com a sessão do benchmark injetada."""
+
+    async def override_unidade() -> AsyncGenerator[UnidadeTrabalho, None]:
+        unidade = UnidadeTrabalho(session_maker)
+        try:
+            yield unidade
+        finally:
+            await unidade.fechar()
+
+    app.dependency_overrides[get_unidade_trabalho] = override_unidade
+    return AsyncClient(app=app, base_url="http://bench")
+
+
+def percentis(amostras: List[float], pontos=(50, 95, 99)) -> dict:
+    """Retorna os percentis (em ms) de uma lista de amostras em segundos."""
+    if not amostras:
+        return {f"p{p}": 0.0 for p in pontos}
+    ordenadas = sorted(amostras)
+    resultado = {}
+    for p in pontos:
+        idx = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+        resultado[f"p{p}"] = round(ordenadas[idx] * 1000, 2)
+    resultado["max"] = round(ordenadas[-1] * 1000, 2)
+    return resultado
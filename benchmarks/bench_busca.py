@@ -0,0 +1,153 @@
+"""
+Benchmark da busca de usuários (core.busca) com 1M+ usuários: semeia
+nomes, sobrenomes e emails sintéticos (SQLite em memória por padrão, ou
+a URL de um MySQL com --db-url) e mede p50/p95/p99 de cada tipo de
+consulta pelo índice (FTS5 trigram / FULLTEXT ngram) e, para
+comparação, pela varredura com LIKE '%termo%' e a mesma ordenação.
+
+Uso:
+    python -m benchmarks.bench_busca --usuarios 1000000 --consultas 200
+
+    # Sem a comparação com a varredura (mais rápido)
+    python -m benchmarks.bench_busca --consultas-varredura 0
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+
+from benchmarks._comum import SQLITE_MEMORIA, percentis, preparar_banco
+from core.busca import BuscaExpiradaError, _montar_consulta, buscar_usuarios, termos_da_busca
+from core.configs import settings
+from models.usuario_model import UsuarioModel
+
+NOMES = (
+    "Ana Bruno Carla Daniel Eduarda Felipe Gabriela Henrique Isabela Joao Juliana Lucas "
+    "Mariana Mateus Natalia Otavio Paula Pedro Rafaela Rodrigo Sofia Thiago Vitoria Yuri"
+).split()
+SOBRENOMES = (
+    "Silva Santos Oliveira Souza Rodrigues Ferreira Alves Pereira Lima Gomes Costa Ribeiro "
+    "Martins Carvalho Almeida Lopes Soares Fernandes Vieira Barbosa Rocha Dias Nascimento"
+).split()
+DOMINIOS = ("example.com", "urbanfood.com.br", "mail.com", "empresa.net")
+
+
+def _usuario(i: int, rng: random.Random) -> dict:
+    nome, sobrenome = rng.choice(NOMES), rng.choice(SOBRENOMES)
+    return {
+        "nome": nome,
+        "sobrenome": sobrenome,
+        "email": f"{nome.lower()}.{sobrenome.lower()}{i}@{rng.choice(DOMINIOS)}",
+        "senha": "x",
+        "eh_admin": False,
+    }
+
+
+async def _semear(session_maker, usuarios: int, semente: int, lote: int) -> float:
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+    async with session_maker() as session:
+        existentes = await session.scalar(select(func.count()).select_from(UsuarioModel))
+        for base in range(existentes, usuarios, lote):
+            await session.execute(
+                insert(UsuarioModel.__table__),
+                [_usuario(i, rng) for i in range(base, min(base + lote, usuarios))],
+            )
+            await session.commit()
+    return time.perf_counter() - inicio
+
+
+async def _consultas(session_maker, usuarios: int, quantidade: int, rng: random.Random) -> Dict[str, List[str]]:
+    """Textos de busca por tipo, tirados de usuários sorteados do banco."""
+    ids = rng.sample(range(1, usuarios + 1), quantidade)
+    async with session_maker() as session:
+        amostra = (
+            await session.execute(
+                select(UsuarioModel.nome, UsuarioModel.sobrenome, UsuarioModel.email).where(
+                    UsuarioModel.id.in_(ids)
+                )
+            )
+        ).all()
+    return {
+        "prefixo_nome": [u.nome[:4] for u in amostra],
+        "trecho_sobrenome": [u.sobrenome[1:5] for u in amostra],
+        "nome_e_sobrenome": [f"{u.nome} {u.sobrenome}" for u in amostra],
+        "trecho_email_raro": [u.email.split("@")[0][-6:] + "@" for u in amostra],
+        "email_completo": [u.email for u in amostra],
+    }
+
+
+async def _medir_indice(session_maker, textos: List[str], limite: int) -> dict:
+    latencias, expiradas = [], 0
+    for texto in textos:
+        async with session_maker() as session:
+            inicio = time.perf_counter()
+            try:
+                await buscar_usuarios(session, texto, limite, 0, settings.BUSCA_TEMPO_LIMITE_MS)
+            except BuscaExpiradaError:
+                expiradas += 1
+            latencias.append(time.perf_counter() - inicio)
+    return {"consultas": len(textos), "expiradas": expiradas, "latencia_ms": percentis(latencias)}
+
+
+async def _medir_varredura(session_maker, textos: List[str], limite: int) -> dict:
+    latencias = []
+    for texto in textos:
+        query = _montar_consulta("varredura", texto, termos_da_busca(texto), 0).limit(limite)
+        async with session_maker() as session:
+            inicio = time.perf_counter()
+            (await session.execute(query)).all()
+            latencias.append(time.perf_counter() - inicio)
+    return {"consultas": len(textos), "latencia_ms": percentis(latencias)}
+
+
+async def executar(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.semente)
+    engine, session_maker = await preparar_banco(args.db_url)
+    try:
+        semeadura = await _semear(session_maker, args.usuarios, args.semente, args.lote)
+        consultas = await _consultas(session_maker, args.usuarios, args.consultas, rng)
+
+        resultado = {}
+        for tipo, textos in consultas.items():
+            resultado[tipo] = {"indice": await _medir_indice(session_maker, textos, args.limite)}
+            if args.consultas_varredura:
+                resultado[tipo]["varredura"] = await _medir_varredura(
+                    session_maker, textos[: args.consultas_varredura], args.limite
+                )
+    finally:
+        await engine.dispose()
+
+    return {
+        "banco": "sqlite-memoria" if args.db_url == SQLITE_MEMORIA else engine.dialect.name,
+        "usuarios": args.usuarios,
+        "semeadura_s": round(semeadura, 1),
+        "limite": args.limite,
+        "tempo_limite_ms": settings.BUSCA_TEMPO_LIMITE_MS,
+        "resultados": resultado,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--db-url", default=SQLITE_MEMORIA)
+    parser.add_argument("--usuarios", type=int, default=1_000_000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--consultas-varredura", type=int, default=10)
+    parser.add_argument("--limite", type=int, default=settings.BUSCA_LIMITE_PADRAO)
+    parser.add_argument("--lote", type=int, default=20000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(executar(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark das consultas do caminho quente: compara o caminho ORM
+(select(UsuarioModel) + scalars().unique()) com as consultas projetadas
+de core.consultas, em consultas por segundo e pico de memória alocada
+(tracemalloc) em 500 consultas, no engine SQLite em memória.
+
+Uso:
+    python -m benchmarks.bench_consultas --usuarios 10000 --consultas 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from sqlalchemy.future import select
+
+from benchmarks._comum import preparar_banco, semear_usuarios
+from core.cache import Principal
+from core.consultas import buscar_credencial, buscar_principal
+from models.usuario_model import UsuarioModel
+
+
+async def _orm_credencial(session, email: str):
+    result = await session.execute(select(UsuarioModel).filter(UsuarioModel.email == email))
+    return result.scalars().unique().one_or_none()
+
+
+async def _orm_principal(session, usuario_id: int):
+    result = await session.execute(select(UsuarioModel).filter(UsuarioModel.id == usuario_id))
+    usuario = result.scalars().unique().one_or_none()
+    return Principal.de_usuario(usuario) if usuario is not None else None
+
+
+async def _medir(session_maker, consulta, argumentos: list) -> dict:
+    # Uma sessão por consulta, como em uma requisição
+    async def _rodada(args):
+        for arg in args:
+            async with session_maker() as session:
+                assert await consulta(session, arg) is not None
+
+    await _rodada(argumentos[:100])  # aquecimento (cache de SQL compilado)
+
+    inicio = time.perf_counter()
+    await _rodada(argumentos)
+    duracao = time.perf_counter() - inicio
+
+    amostra = argumentos[:500]
+    tracemalloc.start()
+    await _rodada(amostra)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "consultas_por_segundo": round(len(argumentos) / duracao, 1),
+        "us_por_consulta": round(duracao / len(argumentos) * 1e6, 1),
+        "pico_kib": round(pico / 1024, 1),
+    }
+
+
+async def executar(usuarios: int, consultas: int, semente: int) -> dict:
+    engine, session_maker = await preparar_banco()
+    try:
+        await semear_usuarios(session_maker, usuarios, "hash")
+        rng = random.Random(semente)
+        indices = [rng.randrange(usuarios) for _ in range(consultas)]
+        emails = [f"usuario{i}@bench.com" for i in indices]
+        ids = [i + 1 for i in indices]
+
+        return {
+            "usuarios": usuarios,
+            "consultas": consultas,
+            "login": {
+                "orm": await _medir(session_maker, _orm_credencial, emails),
+                "projetada": await _medir(session_maker, buscar_credencial, emails),
+            },
+            "usuario_logado": {
+                "orm": await _medir(session_maker, _orm_principal, ids),
+                "projetada": await _medir(session_maker, buscar_principal, ids),
+            },
+        }
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--consultas", type=int, default=5000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(executar(args.usuarios, args.consultas, args.semente)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Tempo de inicialização a frio: importação do main:app em um processo novo
+(a média de várias execuções) e duração de cada etapa do aquecimento
+(conexões, hash de senha, JWT e consultas) até o /ready ficar verde.
+
+Com --orcamento-import-ms a execução termina com código 1 se a
+importação passar do orçamento.
+
+Uso:
+    python -m benchmarks.bench_inicializacao --execucoes 5 --orcamento-import-ms 600
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks._comum import SQLITE_MEMORIA, preparar_banco
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def medir_importacao(execucoes: int) -> List[float]:
+    """Milissegundos para importar o main:app em um interpretador novo."""
+    codigo = "import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000)"
+    tempos = []
+    for _ in range(execucoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout
+        tempos.append(float(saida.strip().splitlines()[-1]))
+    return tempos
+
+
+async def medir_aquecimento(db_url: str, conexoes: int) -> dict:
+    from core.aquecimento import Prontidao, aquecer
+
+    engine, session_maker = await preparar_banco(db_url)
+    estado = Prontidao()
+    try:
+        inicio = time.perf_counter()
+        await aquecer([engine], session_maker, conexoes, estado)
+        total = (time.perf_counter() - inicio) * 1000
+    finally:
+        await engine.dispose()
+    return {"total_ms": round(total, 2), "etapas_ms": estado.etapas_ms}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--db-url", default=SQLITE_MEMORIA)
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--conexoes", type=int, default=2)
+    parser.add_argument("--orcamento-import-ms", type=float)
+    args = parser.parse_args(argv)
+
+    importacao = medir_importacao(args.execucoes)
+    resultado = {
+        "importacao_ms": {
+            "mediana": round(statistics.median(importacao), 2),
+            "minimo": round(min(importacao), 2),
+            "maximo": round(max(importacao), 2),
+        },
+        "aquecimento": asyncio.run(medir_aquecimento(args.db_url, args.conexoes)),
+    }
+    print(json.dumps(resultado, indent=2))
+
+    if args.orcamento_import_ms and resultado["importacao_ms"]["mediana"] > args.orcamento_import_ms:
+        print(
+            f"Importação acima do orçamento: {resultado['importacao_ms']['mediana']}ms"
+            f" > {args.orcamento_import_ms}ms",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
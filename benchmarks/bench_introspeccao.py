@@ -0,0 +1,62 @@
+"""
+Benchmark da introspecção em lote: mede o custo por token de
+POST /usuarios/introspeccao conforme o tamanho do lote cresce. Cada
+rodada usa tokens novos e o cache de usuários vazio, de modo que o
+custo inclui a verificação do token e a consulta (única) dos usuários.
+
+Uso:
+    python -m benchmarks.bench_introspeccao --lotes 1 10 100 500
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._comum import cliente, preparar_banco, semear_usuarios
+from core.auth import criar_token_acesso
+from core.cache import cache_principais
+from core.configs import settings
+
+RODADAS = 10
+
+
+async def executar(lotes: list) -> list:
+    settings.INTROSPECCAO_SEGREDO = settings.INTROSPECCAO_SEGREDO or "benchmark"
+    headers = {"X-Gateway-Segredo": settings.INTROSPECCAO_SEGREDO}
+    engine, session_maker = await preparar_banco()
+    await semear_usuarios(session_maker, max(lotes), hash_senha="hash")
+    resultados = []
+    try:
+        async with cliente(session_maker) as ac:
+            for tamanho in lotes:
+                duracoes = []
+                for _ in range(RODADAS):
+                    tokens = [criar_token_acesso(sub=str(i + 1)) for i in range(tamanho)]
+                    cache_principais.limpar()
+                    inicio = time.perf_counter()
+                    resposta = await ac.post("/api/v1/usuarios/introspeccao", json={"tokens": tokens}, headers=headers)
+                    duracoes.append(time.perf_counter() - inicio)
+                    assert all(r["active"] for r in resposta.json()["resultados"])
+
+                media = sum(duracoes) / RODADAS
+                resultados.append(
+                    {
+                        "tokens_por_lote": tamanho,
+                        "lote_ms": round(media * 1000, 3),
+                        "por_token_ms": round(media * 1000 / tamanho, 4),
+                    }
+                )
+    finally:
+        await engine.dispose()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 10, 100, 500])
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(executar(args.lotes)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
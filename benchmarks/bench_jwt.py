@@ -0,0 +1,87 @@
+"""
+Micro-benchmark do JWT: compara operações por segundo da implementação
+anterior (python-jose jwt.encode/jwt.decode com pytz) com o CodecJWT de
+core.token, com e sem o cache de tokens verificados.
+
+Uso:
+    python -m benchmarks.bench_jwt --iteracoes 20000
+"""
+import argparse
+import json
+import time
+
+from datetime import datetime, timedelta
+
+import benchmarks._comum  # noqa: F401  (ajusta o PYTHONPATH)
+
+from jose import jwt
+from pytz import timezone
+
+from core.configs import settings
+from core.token import CodecJWT
+
+TEMPO_VIDA = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def _encode_jose(sub: str) -> str:
+    sp = timezone("America/Sao_Paulo")
+    payload = {
+        "type": "access_token",
+        "exp": datetime.now(tz=sp) + TEMPO_VIDA,
+        "iat": datetime.now(tz=sp),
+        "sub": sub,
+    }
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
+
+
+def _decode_jose(token: str) -> dict:
+    return jwt.decode(
+        token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM], options={"verify_aud": False}
+    )
+
+
+def _ops_por_segundo(funcao, argumentos: list) -> float:
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(argumento)
+    return round(len(argumentos) / (time.perf_counter() - inicio), 1)
+
+
+def executar(iteracoes: int) -> dict:
+    subs = [str(i) for i in range(iteracoes)]
+    sem_cache = CodecJWT(settings.JWT_SECRET, settings.ALGORITHM, 0, 0)
+    com_cache = CodecJWT(settings.JWT_SECRET, settings.ALGORITHM, iteracoes, 300)
+
+    def _encode_codec(sub: str) -> str:
+        agora = int(time.time())
+        return sem_cache.codificar(
+            {"type": "access_token", "exp": agora + int(TEMPO_VIDA.total_seconds()), "iat": agora, "sub": sub}
+        )
+
+    tokens = [_encode_codec(sub) for sub in subs]
+    for token in tokens:
+        com_cache.decodificar(token)
+
+    return {
+        "iteracoes": iteracoes,
+        "encode_ops_s": {
+            "jose": _ops_por_segundo(_encode_jose, subs),
+            "codec": _ops_por_segundo(_encode_codec, subs),
+        },
+        "decode_ops_s": {
+            "jose": _ops_por_segundo(_decode_jose, tokens),
+            "codec": _ops_por_segundo(sem_cache.decodificar, tokens),
+            "codec_cache": _ops_por_segundo(com_cache.decodificar, tokens),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iteracoes", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(executar(args.iteracoes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
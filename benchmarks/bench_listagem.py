@@ -0,0 +1,70 @@
+"""
+Benchmark da listagem paginada: mede a latência da primeira, de uma
+página do meio e da última página conforme a tabela cresce. Com keyset
+no id a latência por página deve ficar praticamente constante.
+
+Uso:
+    python -m benchmarks.bench_listagem --tamanhos 1000 10000 100000 --limite 100
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._comum import cliente, percentis, preparar_banco, semear_usuarios
+from core.security import gerar_hash_senha
+
+REPETICOES = 20
+
+
+async def _medir(ac, params: dict) -> dict:
+    amostras = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resposta = await ac.get("/api/v1/usuarios/", params=params)
+        amostras.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.text
+    return percentis(amostras)
+
+
+async def executar(tamanhos: list, limite: int) -> list:
+    from core.paginacao import codificar_cursor
+
+    hash_senha = gerar_hash_senha("senha123")
+    engine, session_maker = await preparar_banco()
+    resultados = []
+    try:
+        async with cliente(session_maker) as ac:
+            semeados = 0
+            for tamanho in sorted(tamanhos):
+                await semear_usuarios(session_maker, tamanho - semeados, hash_senha, inicio=semeados)
+                semeados = tamanho
+
+                resultados.append(
+                    {
+                        "usuarios": tamanho,
+                        "limite": limite,
+                        "primeira_pagina_ms": await _medir(ac, {"limite": limite}),
+                        "pagina_meio_ms": await _medir(
+                            ac, {"limite": limite, "cursor": codificar_cursor({"id": tamanho // 2})}
+                        ),
+                        "ultima_pagina_ms": await _medir(
+                            ac, {"limite": limite, "cursor": codificar_cursor({"id": tamanho - limite})}
+                        ),
+                    }
+                )
+    finally:
+        await engine.dispose()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--limite", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(executar(args.tamanhos, args.limite)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark de vazão de login: dispara rajadas de logins concorrentes e,
+em paralelo, mede a latência do /health. Com o bcrypt rodando no pool
+de workers o /health deve continuar respondendo em poucos ms. Logins
+recusados pelo controle de admissão (503) são contados à parte.
+
+Uso:
+    python -m benchmarks.bench_login_rajada --logins 40 --concorrencia 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from collections import Counter
+
+from benchmarks._comum import cliente, percentis, preparar_banco
+
+USUARIO = {
+    "nome": "Bench",
+    "sobrenome": "Login",
+    "email": "bench@example.com",
+    "senha": "senha123",
+    "eh_admin": False,
+}
+
+
+async def _sondar_health(ac, parar: asyncio.Event, latencias: list) -> None:
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await ac.get("/health")
+        latencias.append(time.perf_counter() - inicio)
+        await asyncio.sleep(0.01)
+
+
+async def executar(logins: int, concorrencia: int) -> dict:
+    engine, session_maker = await preparar_banco()
+    try:
+        async with cliente(session_maker) as ac:
+            await ac.post("/api/v1/usuarios/signup", json=USUARIO)
+            dados = {"username": USUARIO["email"], "password": USUARIO["senha"]}
+
+            semaforo = asyncio.Semaphore(concorrencia)
+            status_respostas: Counter = Counter()
+
+            async def _login():
+                async with semaforo:
+                    resposta = await ac.post("/api/v1/usuarios/login", data=dados)
+                    status_respostas[resposta.status_code] += 1
+
+            parar = asyncio.Event()
+            latencias_health: list = []
+            sonda = asyncio.create_task(_sondar_health(ac, parar, latencias_health))
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(_login() for _ in range(logins)))
+            duracao = time.perf_counter() - inicio
+
+            parar.set()
+            await sonda
+    finally:
+        await engine.dispose()
+
+    return {
+        "logins": logins,
+        "concorrencia": concorrencia,
+        "duracao_s": round(duracao, 3),
+        "logins_por_s": round(status_respostas[200] / duracao, 2),
+        "status": dict(status_respostas),
+        "health_amostras": len(latencias_health),
+        "health_latencia_ms": percentis(latencias_health),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concorrencia", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(executar(args.logins, args.concorrencia)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
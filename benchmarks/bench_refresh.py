@@ -0,0 +1,69 @@
+"""
+Benchmark do refresh token: compara a latência de POST /usuarios/login
+(bcrypt + consulta do usuário) com POST /usuarios/refresh (HMAC + um
+UPDATE por jti), encadeando as rotações.
+
+Uso:
+    python -m benchmarks.bench_refresh --iteracoes 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._comum import cliente, percentis, preparar_banco
+
+USUARIO = {
+    "nome": "Bench",
+    "sobrenome": "Refresh",
+    "email": "refresh@example.com",
+    "senha": "senha123",
+    "eh_admin": False,
+}
+
+
+async def executar(iteracoes: int) -> dict:
+    engine, session_maker = await preparar_banco()
+    try:
+        async with cliente(session_maker) as ac:
+            await ac.post("/api/v1/usuarios/signup", json=USUARIO)
+            dados = {"username": USUARIO["email"], "password": USUARIO["senha"]}
+
+            latencias_login = []
+            for _ in range(iteracoes):
+                inicio = time.perf_counter()
+                resposta = await ac.post("/api/v1/usuarios/login", data=dados)
+                latencias_login.append(time.perf_counter() - inicio)
+            refresh_token = resposta.json()["refresh_token"]
+
+            latencias_refresh = []
+            for _ in range(iteracoes):
+                inicio = time.perf_counter()
+                resposta = await ac.post(
+                    "/api/v1/usuarios/refresh", json={"refresh_token": refresh_token}
+                )
+                latencias_refresh.append(time.perf_counter() - inicio)
+                assert resposta.status_code == 200, resposta.text
+                refresh_token = resposta.json()["refresh_token"]
+    finally:
+        await engine.dispose()
+
+    media_login = sum(latencias_login) / iteracoes
+    media_refresh = sum(latencias_refresh) / iteracoes
+    return {
+        "iteracoes": iteracoes,
+        "login_ms": percentis(latencias_login),
+        "refresh_ms": percentis(latencias_refresh),
+        "refresh_sobre_login": round(media_refresh / media_login, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iteracoes", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(executar(args.iteracoes)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
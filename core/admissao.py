@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Request
+
+from core.configs import settings
+from core.metricas import medidor_funcao
+from core.perfil import registrar_etapa
+from core.servidor import nucleos_disponiveis
+
+# Prazo absoluto (epoch em segundos) informado pelo cliente na requisição atual
+prazo_requisicao: ContextVar[Optional[float]] = ContextVar("prazo_requisicao", default=None)
+
+CABECALHO_PRAZO = "X-Request-Deadline"
+
+
+class SobrecargaError(Exception):
+    """Requisição recusada pelo controle de admissão (vira HTTP 503)."""
+
+    def __init__(self, motivo: str, retry_after: int) -> None:
+        super().__init__(motivo)
+        self.motivo = motivo
+        self.retry_after = retry_after
+
+
+class ControleAdmissao:
+    """
+    Limita quantas operações de CPU (bcrypt) rodam ao mesmo tempo e
+    quantas podem esperar na fila. Acima da fila, ou quando o prazo do
+    cliente não comporta a espera, a requisição é recusada na hora em
+    vez de acumular latência para todos.
+    """
+
+    def __init__(self, max_concorrentes: int, max_fila: int, espera_maxima_segundos: float, retry_after: int) -> None:
+        self.max_concorrentes = max_concorrentes
+        self.max_fila = max_fila
+        self.espera_maxima_segundos = espera_maxima_segundos
+        self.retry_after = retry_after
+        self._semaforo = asyncio.Semaphore(max_concorrentes)
+        self.em_execucao = 0
+        self.na_fila = 0
+        self.admitidos = 0
+        self.rejeitados = 0
+        self.espera_media_segundos = 0.0
+
+    def recusar(self, motivo: str) -> SobrecargaError:
+        """Conta a recusa e retorna o erro a ser lançado pelo chamador."""
+        self.rejeitados += 1
+        return SobrecargaError(motivo, self.retry_after)
+
+    @asynccontextmanager
+    async def slot(self, prazo: Optional[float] = None) -> AsyncIterator[None]:
+        espera_maxima = self.espera_maxima_segundos
+        if prazo is not None:
+            espera_maxima = min(espera_maxima, prazo - time.time())
+            if espera_maxima <= 0:
+                raise self.recusar("Prazo da requisição expirado.")
+
+        if self._semaforo.locked() and self.na_fila >= self.max_fila:
+            raise self.recusar("Fila de processamento cheia.")
+
+        inicio = time.perf_counter()
+        self.na_fila += 1
+        try:
+            async with asyncio.timeout(espera_maxima):
+                await self._semaforo.acquire()
+        except TimeoutError:
+            raise self.recusar("Tempo de espera na fila esgotado.")
+        finally:
+            self.na_fila -= 1
+
+        # Média móvel exponencial do tempo de espera na fila
+        espera = time.perf_counter() - inicio
+        registrar_etapa("fila_hash", espera)
+        self.espera_media_segundos += 0.2 * (espera - self.espera_media_segundos)
+        self.admitidos += 1
+        self.em_execucao += 1
+        try:
+            yield
+        finally:
+            self.em_execucao -= 1
+            self._semaforo.release()
+
+    def estatisticas(self) -> Dict[str, float]:
+        return {
+            "em_execucao": self.em_execucao,
+            "max_concorrentes": self.max_concorrentes,
+            "na_fila": self.na_fila,
+            "max_fila": self.max_fila,
+            "saturacao": round((self.em_execucao + self.na_fila) / (self.max_concorrentes + self.max_fila), 4),
+            "espera_media_ms": round(self.espera_media_segundos * 1000, 2),
+            "admitidos": self.admitidos,
+            "rejeitados": self.rejeitados,
+        }
+
+
+controle_hash: ControleAdmissao = ControleAdmissao(
+    max_concorrentes=(
+        settings.ADMISSAO_HASH_MAX_CONCORRENTES or settings.HASH_POOL_WORKERS or nucleos_disponiveis()
+    ),
+    max_fila=settings.ADMISSAO_HASH_MAX_FILA,
+    espera_maxima_segundos=settings.ADMISSAO_HASH_ESPERA_MAXIMA_SEGUNDOS,
+    retry_after=settings.ADMISSAO_RETRY_AFTER_SEGUNDOS,
+)
+
+
+async def verificar_prazo(request: Request) -> None:
+    """
+    Dependência das rotas com bcrypt: lê o prazo absoluto do cliente
+    (X-Request-Deadline, epoch em segundos) e recusa de imediato as
+    requisições cujo prazo já passou.
+    """
+    valor = request.headers.get(CABECALHO_PRAZO)
+    if not valor:
+        prazo_requisicao.set(None)
+        return
+
+    try:
+        prazo = float(valor)
+    except ValueError:
+        prazo_requisicao.set(None)
+        return
+
+    if prazo <= time.time():
+        raise controle_hash.recusar("Prazo da requisição expirado.")
+    prazo_requisicao.set(prazo)
+
+
+medidor_funcao(
+    "hash_em_execucao", "Hashes de senha em execução no pool.", (),
+    lambda: [((), controle_hash.em_execucao)],
+)
+medidor_funcao(
+    "hash_na_fila", "Hashes de senha aguardando vaga no controle de admissão.", (),
+    lambda: [((), controle_hash.na_fila)],
+)
@@ -0,0 +1,145 @@
+"""
+Aquecimento na inicialização: abre conexões dos pools, inicializa o
+hash de senha e o codec JWT e compila as consultas do caminho quente,
+para que as primeiras requisições depois de um deploy não paguem esse
+custo. O /ready só responde 200 depois do aquecimento.
+"""
+import asyncio
+import logging
+import time
+
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from core.busca import verificar_stopwords
+from core.consultas import buscar_credencial, buscar_principal
+from core.security import (
+    gerar_hash_senha_async,
+    get_pool_hash,
+    precisa_rehash,
+    tamanho_pool_hash,
+    verificar_senha_async,
+)
+from core.token import codec_jwt
+
+logger = logging.getLogger(__name__)
+
+
+class Prontidao:
+    """Estado do aquecimento exposto no /ready."""
+
+    def __init__(self) -> None:
+        self.pronto = False
+        self.etapas_ms: Dict[str, float] = {}
+        self.tentativas = 0
+        self.erro: Optional[str] = None
+
+    def estado(self) -> Dict[str, Any]:
+        return {
+            "status": "pronto" if self.pronto else "aquecendo",
+            "etapas_ms": self.etapas_ms,
+            "tentativas": self.tentativas,
+            "erro": self.erro,
+        }
+
+
+prontidao: Prontidao = Prontidao()
+
+
+async def _abrir_conexoes(engine: AsyncEngine, quantidade: int) -> None:
+    """
+    Abre `quantidade` conexões em paralelo, executa um SELECT 1 em cada e
+    as devolve ao pool, mesmo que alguma delas falhe.
+    """
+    resultados = await asyncio.gather(
+        *(engine.connect() for _ in range(quantidade)), return_exceptions=True
+    )
+    conexoes = [r for r in resultados if not isinstance(r, BaseException)]
+    try:
+        for erro in resultados:
+            if isinstance(erro, BaseException):
+                raise erro
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conexoes))
+    finally:
+        for conn in conexoes:
+            await conn.close()
+
+
+async def _aquecer_hash() -> None:
+    # Um hash de verdade inicializa o backend (bcrypt/argon2) e a
+    # verificação ajusta a média usada para igualar o tempo dos logins
+    # recusados
+    hash_senha = await gerar_hash_senha_async("aquecimento", admissao=False)
+    await verificar_senha_async("aquecimento", hash_senha)
+
+    # Chamadas baratas e simultâneas sobem todas as threads/processos do pool
+    loop = asyncio.get_running_loop()
+    pool = get_pool_hash()
+    await asyncio.gather(
+        *(loop.run_in_executor(pool, precisa_rehash, hash_senha) for _ in range(tamanho_pool_hash()))
+    )
+
+
+def _aquecer_jwt() -> None:
+    token = codec_jwt.codificar({"sub": "0", "type": "aquecimento", "exp": int(time.time()) + 60})
+    codec_jwt.decodificar(token)
+    codec_jwt.cache.invalidar(token)
+
+
+async def _compilar_consultas(session_maker: Callable[[], AsyncSession]) -> None:
+    async with session_maker() as session:
+        await buscar_credencial(session, "aquecimento@invalido")
+        await buscar_principal(session, 0)
+        # Só avisa: a busca continua funcionando com o índice atual
+        await verificar_stopwords(session)
+
+
+async def aquecer(
+    engines: Sequence[AsyncEngine],
+    session_maker: Callable[[], AsyncSession],
+    conexoes: int,
+    estado: Prontidao = prontidao,
+) -> None:
+    """Executa todas as etapas do aquecimento, registrando a duração de cada uma."""
+
+    async def _etapa(nome: str, coro) -> None:
+        inicio = time.perf_counter()
+        await coro
+        estado.etapas_ms[nome] = round((time.perf_counter() - inicio) * 1000, 2)
+
+    async def _jwt() -> None:
+        _aquecer_jwt()
+
+    await _etapa("jwt", _jwt())
+    await asyncio.gather(
+        _etapa("conexoes", asyncio.gather(*(_abrir_conexoes(e, conexoes) for e in engines))),
+        _etapa("hash", _aquecer_hash()),
+    )
+    await _etapa("consultas", _compilar_consultas(session_maker))
+    estado.pronto = True
+    estado.erro = None
+
+
+async def aquecer_ate_conseguir(
+    engines: Sequence[AsyncEngine],
+    session_maker: Callable[[], AsyncSession],
+    conexoes: int,
+    intervalo: float,
+    estado: Prontidao = prontidao,
+) -> None:
+    """
+    Repete o aquecimento até conseguir (ex.: banco ainda indisponível);
+    enquanto isso o /ready continua respondendo 503.
+    """
+    while True:
+        estado.tentativas += 1
+        try:
+            await aquecer(engines, session_maker, conexoes, estado)
+            logger.info("Aquecimento concluído: %s", estado.etapas_ms)
+            return
+        except Exception as exc:
+            estado.erro = f"{type(exc).__name__}: {exc}"
+            logger.exception("Falha no aquecimento (tentativa %s)", estado.tentativas)
+            await asyncio.sleep(intervalo)
@@ -0,0 +1,313 @@
+"""
+Auditoria de login em write-behind: o login só enfileira o evento em
+memória e uma tarefa em background grava os eventos em lote, fora do
+caminho da resposta. Os logins de um mesmo usuário no intervalo viram
+uma única atualização de ultimo_login_em/total_logins/falhas_login.
+"""
+import asyncio
+import logging
+import time
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import case, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.configs import settings
+from core.metricas import Contador, medidor_funcao, registro
+from models.auditoria_login_model import AuditoriaLoginModel
+from models.usuario_model import UsuarioModel
+
+logger = logging.getLogger(__name__)
+
+POLITICAS_EXCESSO = ("descartar_novos", "descartar_antigos")
+
+EVENTOS_AUDITORIA: Contador = registro.registrar(
+    Contador(
+        "auditoria_login_eventos_total",
+        "Eventos da auditoria de login por destino (gravado, descartado, falha, rejeitado).",
+        ("destino",),
+    )
+)
+
+_GRAVADOS = EVENTOS_AUDITORIA.rotulado("gravado")
+_DESCARTADOS = EVENTOS_AUDITORIA.rotulado("descartado")
+_FALHAS = EVENTOS_AUDITORIA.rotulado("falha")
+_REJEITADOS = EVENTOS_AUDITORIA.rotulado("rejeitado")
+
+# Tamanho das colunas: um valor maior derrubaria o INSERT do lote inteiro
+_TABELA = AuditoriaLoginModel.__table__
+_EMAIL_MAX = _TABELA.c.email.type.length
+_IP_MAX = _TABELA.c.ip.type.length
+
+
+class _Atualizacao:
+    """Logins de um usuário acumulados desde a última gravação."""
+
+    __slots__ = ("sucessos", "falhas", "ultimo_login_em")
+
+    def __init__(self) -> None:
+        self.sucessos = 0
+        self.falhas = 0
+        self.ultimo_login_em: Optional[int] = None
+
+
+class AuditoriaLogin:
+    """
+    Fila limitada dos eventos de login. `registrar` não faz I/O; a
+    gravação acontece em `descarregar`, chamada por `executar` a cada
+    `intervalo` segundos ou assim que a fila atinge `tamanho_lote`, e uma
+    última vez no shutdown.
+
+    Um lote que falha volta para a fila. Depois de `max_tentativas`
+    falhas seguidas, os eventos são gravados um a um e os que ainda
+    falham vão para a lista de rejeitados, para que um evento ruim não
+    trave a fila.
+    """
+
+    def __init__(
+        self,
+        capacidade: int,
+        tamanho_lote: int,
+        intervalo: float,
+        excesso: str = "descartar_novos",
+        ativo: bool = True,
+        max_tentativas: int = 3,
+    ) -> None:
+        if excesso not in POLITICAS_EXCESSO:
+            raise ValueError(f"Política de excesso inválida: {excesso}")
+        self.capacidade = max(1, capacidade)
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.intervalo = intervalo
+        self.excesso = excesso
+        self.ativo = ativo
+        self._eventos: Deque[Dict[str, Any]] = deque()
+        self._atualizacoes: Dict[int, _Atualizacao] = {}
+        self._lote_cheio = asyncio.Event()
+        self._gravando = asyncio.Lock()
+        self.max_tentativas = max(1, max_tentativas)
+        self._tentativas = 0
+        self.rejeitados: Deque[Dict[str, Any]] = deque(maxlen=self.capacidade)
+        self.gravados = 0
+        self.descartados = 0
+        self.falhas = 0
+        self.lotes = 0
+        self.ultima_gravacao: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._eventos)
+
+    def registrar(
+        self,
+        email: str,
+        sucesso: bool,
+        usuario_id: Optional[int] = None,
+        ip: Optional[str] = None,
+        momento: Optional[int] = None,
+    ) -> bool:
+        """Enfileira uma tentativa de login. Retorna False se o evento foi descartado."""
+        if not self.ativo:
+            return False
+
+        if len(self._eventos) >= self.capacidade:
+            self._descartar(1)
+            if self.excesso == "descartar_novos":
+                return False
+            # O evento antigo sai da trilha, mas os contadores do usuário já o incluem
+            self._eventos.popleft()
+
+        momento = momento or int(time.time())
+        self._eventos.append(
+            {
+                "usuario_id": usuario_id,
+                "email": email[:_EMAIL_MAX],
+                "sucesso": sucesso,
+                "ip": ip[:_IP_MAX] if ip else None,
+                "momento": momento,
+            }
+        )
+
+        if usuario_id is not None:
+            atualizacao = self._atualizacoes.get(usuario_id)
+            if atualizacao is None:
+                atualizacao = self._atualizacoes[usuario_id] = _Atualizacao()
+            if sucesso:
+                atualizacao.sucessos += 1
+                atualizacao.ultimo_login_em = momento
+            else:
+                atualizacao.falhas += 1
+
+        if len(self._eventos) >= self.tamanho_lote:
+            self._lote_cheio.set()
+        return True
+
+    def _descartar(self, quantidade: int) -> None:
+        self.descartados += quantidade
+        _DESCARTADOS.inc(quantidade)
+
+    def _retirar(self):
+        eventos, self._eventos = list(self._eventos), deque()
+        atualizacoes, self._atualizacoes = self._atualizacoes, {}
+        self._lote_cheio.clear()
+        return eventos, atualizacoes
+
+    def _devolver(self, eventos: List[Dict[str, Any]], atualizacoes: Dict[int, _Atualizacao]) -> None:
+        """Recoloca na fila um lote que não foi gravado, antes dos eventos novos."""
+        for usuario_id, antiga in atualizacoes.items():
+            atual = self._atualizacoes.get(usuario_id)
+            if atual is None:
+                self._atualizacoes[usuario_id] = antiga
+                continue
+            atual.sucessos += antiga.sucessos
+            atual.falhas += antiga.falhas
+            atual.ultimo_login_em = atual.ultimo_login_em or antiga.ultimo_login_em
+
+        espaco = max(0, self.capacidade - len(self._eventos))
+        if len(eventos) > espaco:
+            self._descartar(len(eventos) - espaco)
+            eventos = eventos[len(eventos) - espaco:] if espaco else []
+        self._eventos.extendleft(reversed(eventos))
+
+    async def _gravar(
+        self, session: AsyncSession, eventos: List[Dict[str, Any]], atualizacoes: Dict[int, _Atualizacao]
+    ) -> None:
+        # INSERT da tabela (Core): com o modelo, o ORM separa as linhas com
+        # colunas nulas em comandos diferentes
+        for inicio in range(0, len(eventos), self.tamanho_lote):
+            await session.execute(insert(_TABELA), eventos[inicio:inicio + self.tamanho_lote])
+
+        await self._atualizar_usuarios(session, atualizacoes)
+        await session.commit()
+
+    async def _atualizar_usuarios(self, session: AsyncSession, atualizacoes: Dict[int, _Atualizacao]) -> None:
+        # Um UPDATE por lote de usuários, com CASE no id, em vez de um por login
+        ids = list(atualizacoes)
+        for inicio in range(0, len(ids), self.tamanho_lote):
+            lote = {i: atualizacoes[i] for i in ids[inicio:inicio + self.tamanho_lote]}
+            ultimos = {i: a.ultimo_login_em for i, a in lote.items() if a.ultimo_login_em}
+            valores = {
+                "total_logins": UsuarioModel.total_logins
+                + case({i: a.sucessos for i, a in lote.items()}, value=UsuarioModel.id, else_=0),
+                "falhas_login": UsuarioModel.falhas_login
+                + case({i: a.falhas for i, a in lote.items()}, value=UsuarioModel.id, else_=0),
+            }
+            if ultimos:
+                valores["ultimo_login_em"] = case(
+                    ultimos, value=UsuarioModel.id, else_=UsuarioModel.ultimo_login_em
+                )
+            await session.execute(
+                update(UsuarioModel)
+                .where(UsuarioModel.id.in_(list(lote)))
+                .values(**valores)
+                .execution_options(synchronize_session=False, preserva_principal=True)
+            )
+
+    async def _gravar_isolado(
+        self, session_maker, eventos: List[Dict[str, Any]], atualizacoes: Dict[int, _Atualizacao]
+    ) -> int:
+        """
+        Grava os contadores e depois cada evento na sua própria transação;
+        os eventos que falham vão para `rejeitados`. Uma falha nos
+        contadores (ex.: banco fora do ar) propaga e o lote volta à fila.
+        """
+        async with session_maker() as session:
+            await self._atualizar_usuarios(session, atualizacoes)
+            await session.commit()
+
+            gravados = 0
+            for evento in eventos:
+                try:
+                    await session.execute(insert(_TABELA), [evento])
+                    await session.commit()
+                    gravados += 1
+                except Exception:
+                    await session.rollback()
+                    logger.exception("Evento da auditoria de login rejeitado: %s", evento)
+                    self.rejeitados.append(evento)
+                    _REJEITADOS.inc()
+        return gravados
+
+    async def descarregar(self, session_maker) -> int:
+        """Grava tudo o que está na fila. Retorna o número de eventos gravados."""
+        async with self._gravando:
+            if not self._eventos and not self._atualizacoes:
+                return 0
+
+            eventos, atualizacoes = self._retirar()
+            try:
+                if self._tentativas >= self.max_tentativas:
+                    gravados = await self._gravar_isolado(session_maker, eventos, atualizacoes)
+                else:
+                    async with session_maker() as session:
+                        await self._gravar(session, eventos, atualizacoes)
+                    gravados = len(eventos)
+            except Exception:
+                self._tentativas += 1
+                self.falhas += len(eventos)
+                _FALHAS.inc(len(eventos))
+                self._devolver(eventos, atualizacoes)
+                raise
+            except asyncio.CancelledError:
+                # Cancelado no meio da gravação (shutdown): o lote volta para
+                # a fila e sai na gravação final
+                self._devolver(eventos, atualizacoes)
+                raise
+
+            self._tentativas = 0
+            self.gravados += gravados
+            _GRAVADOS.inc(gravados)
+            self.lotes += 1
+            self.ultima_gravacao = time.time()
+            return gravados
+
+    async def executar(self, session_maker) -> None:
+        """Laço de gravação em background: por tempo ou por tamanho do lote."""
+        while True:
+            try:
+                await asyncio.wait_for(self._lote_cheio.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.descarregar(session_maker)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha ao gravar a auditoria de login")
+                # Evita repetir a falha sem pausa enquanto o lote continua cheio
+                await asyncio.sleep(self.intervalo)
+
+    def limpar(self) -> None:
+        self._retirar()
+        self.rejeitados.clear()
+        self._tentativas = 0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "ativo": self.ativo,
+            "na_fila": len(self._eventos),
+            "usuarios_pendentes": len(self._atualizacoes),
+            "capacidade": self.capacidade,
+            "excesso": self.excesso,
+            "gravados": self.gravados,
+            "descartados": self.descartados,
+            "falhas": self.falhas,
+            "rejeitados": len(self.rejeitados),
+            "lotes": self.lotes,
+            "ultima_gravacao": self.ultima_gravacao,
+        }
+
+
+auditoria_login: AuditoriaLogin = AuditoriaLogin(
+    capacidade=settings.AUDITORIA_LOGIN_CAPACIDADE,
+    tamanho_lote=settings.AUDITORIA_LOGIN_TAMANHO_LOTE,
+    intervalo=settings.AUDITORIA_LOGIN_INTERVALO_SEGUNDOS,
+    excesso=settings.AUDITORIA_LOGIN_EXCESSO,
+    ativo=settings.AUDITORIA_LOGIN_ATIVO,
+    max_tentativas=settings.AUDITORIA_LOGIN_MAX_TENTATIVAS,
+)
+
+medidor_funcao(
+    "auditoria_login_na_fila", "Eventos da auditoria de login aguardando gravação.", (),
+    lambda: [((), len(auditoria_login))],
+)
@@ -1,66 +1,313 @@
-from pytz import timezone
+import asyncio
+import logging
+import time
 
-from typing import Optional, List
-from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Set, Tuple, Union
+from datetime import timedelta
+from uuid import uuid4
 
 from fastapi.security import OAuth2PasswordBearer
 
-from sqlalchemy.future import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from jose import jwt
+from jose import JWTError
 
 from models.usuario_model import UsuarioModel
+from models.refresh_token_model import RefreshTokenModel
+from core.cache import Principal, cache_principais
 from core.configs import settings
-from core.security import verificar_senha
+from core.consultas import Credencial, buscar_credencial, buscar_principal
+from core.admissao import SobrecargaError, controle_hash
+from core.auditoria import auditoria_login
+from core.filtro_emails import filtro_emails
+from core.revogacao import lista_revogacao
+from core.security import (
+    gerar_hash_senha_async,
+    precisa_rehash,
+    simular_verificacao,
+    verificar_senha_async,
+)
+from core.token import codec_jwt
 
 from pydantic import EmailStr
 
 
+logger = logging.getLogger(__name__)
+
 oauth2_schema = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/usuarios/login")
 
+# Referências das tarefas de rehash em andamento (evita coleta pelo GC)
+_tarefas_rehash: Set[asyncio.Task] = set()
+
 
 async def autenticar(
-    email: EmailStr, senha: str, db: AsyncSession
-) -> Optional[UsuarioModel]:
+    email: EmailStr,
+    senha: str,
+    db: AsyncSession,
+    db_escrita: Optional[AsyncSession] = None,
+    ip: Optional[str] = None,
+) -> Optional[Credencial]:
+    """
+    Busca o usuário em `db` (normalmente uma réplica de leitura). Se ele
+    não aparecer na réplica, confirma no writer (`db_escrita`), que também
+    recebe o rehash da senha. Toda tentativa vai para a auditoria de
+    login, gravada em background.
+    """
+    # Sob carga (bcrypt com fila), emails fora do filtro nem consultam o
+    # banco. Fora disso o banco decide: o filtro desta réplica pode ainda
+    # não ter um cadastro feito em outra
+    if filtro_emails.descartar_login(email, sob_carga=controle_hash.na_fila > 0):
+        auditoria_login.registrar(email, False, ip=ip)
+        await simular_verificacao()
+        return None
+
+    db_escrita = db_escrita or db
+
     async with db as session:
-        query = select(UsuarioModel).filter(UsuarioModel.email == email)
-        result = await session.execute(query)
-        usuario: UsuarioModel = result.scalars().unique().one_or_none()
+        usuario = await buscar_credencial(session, email)
 
-        if not usuario:
-            return None
+    # Cadastro recente que ainda não chegou à réplica
+    if not usuario and db_escrita is not db and db_escrita.bind is not db.bind:
+        async with db_escrita as session:
+            usuario = await buscar_credencial(session, email)
 
-        if not verificar_senha(senha, usuario.senha):
-            return None
+    if not usuario:
+        auditoria_login.registrar(email, False, ip=ip)
+        await simular_verificacao()
+        return None
 
-        return usuario
+    filtro_emails.confirmar_existente(usuario.email)
+
+    if not await verificar_senha_async(senha, usuario.senha):
+        auditoria_login.registrar(email, False, usuario_id=usuario.id, ip=ip)
+        return None
+
+    auditoria_login.registrar(email, True, usuario_id=usuario.id, ip=ip)
+
+    if precisa_rehash(usuario.senha):
+        _agendar_rehash(db_escrita, usuario.id, senha, usuario.senha)
+
+    return usuario
+
+
+def _agendar_rehash(session: AsyncSession, usuario_id: int, senha: str, hash_antigo: str) -> None:
+    """
+    Refaz o hash de uma senha gerada com parâmetros antigos em background,
+    fora do caminho da resposta do login.
+    """
+    tarefa = asyncio.create_task(_refazer_hash(session.bind, usuario_id, senha, hash_antigo))
+    _tarefas_rehash.add(tarefa)
+    tarefa.add_done_callback(_tarefas_rehash.discard)
 
 
-def _criar_token(tipo_token: str, tempo_vida: timedelta, sub: str) -> str:
+async def _refazer_hash(bind, usuario_id: int, senha: str, hash_antigo: str) -> None:
+    try:
+        novo_hash = await gerar_hash_senha_async(senha)
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            # Só substitui se o hash não mudou nesse meio tempo
+            await session.execute(
+                update(UsuarioModel)
+                .where(UsuarioModel.id == usuario_id, UsuarioModel.senha == hash_antigo)
+                .values(senha=novo_hash)
+                .execution_options(preserva_principal=True)
+            )
+            await session.commit()
+    except SobrecargaError:
+        # Sob carga o rehash fica para um próximo login
+        pass
+    except Exception:
+        logger.exception("Falha ao refazer o hash da senha do usuário %s", usuario_id)
+
+
+async def aguardar_rehash() -> None:
+    """Aguarda os rehash pendentes (usado no shutdown e nos testes)."""
+    if _tarefas_rehash:
+        await asyncio.gather(*_tarefas_rehash, return_exceptions=True)
+
+
+def _criar_token(
+    tipo_token: str,
+    tempo_vida: timedelta,
+    sub: str,
+    claims: Optional[Dict[str, Any]] = None,
+    jti: Optional[str] = None,
+) -> str:
     # https://datatracker.ietf.org/doc/html/rfc7519#section-4.1.3
     payload = {}
 
-    sp = timezone("America/Sao_Paulo")
-    expira = datetime.now(tz=sp) + tempo_vida
+    # Timestamps em segundos desde a época (NumericDate)
+    agora = int(time.time())
 
     payload["type"] = tipo_token
 
-    payload["exp"] = expira
+    payload["exp"] = agora + int(tempo_vida.total_seconds())
 
-    payload["iat"] = datetime.now(tz=sp)
+    payload["iat"] = agora
 
     payload["sub"] = str(sub)
 
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
+    # Identificador único, usado na revogação (logout)
+    payload["jti"] = jti or uuid4().hex
+
+    if claims:
+        payload.update(claims)
+
+    return codec_jwt.codificar(payload)
+
+
+def claims_usuario(usuario: Union[Credencial, Principal]) -> Dict[str, Any]:
+    """
+    Claims do modo stateless: os mesmos campos de UsuarioSchemaBase,
+    mais a versão dos claims ("cv").
+    """
+    return {
+        "nome": usuario.nome,
+        "sobrenome": usuario.sobrenome,
+        "email": usuario.email,
+        "eh_admin": bool(usuario.eh_admin),
+        "cv": settings.CLAIMS_VERSAO,
+    }
+
+
+def principal_stateless(payload: Dict[str, Any]) -> Optional[Principal]:
+    """
+    Monta o principal a partir dos claims do modo stateless, quando ativo
+    e com a versão de claims atual; caso contrário retorna None.
+    """
+    if not settings.AUTH_STATELESS or payload.get("cv") != settings.CLAIMS_VERSAO:
+        return None
+
+    return Principal(
+        id=int(payload["sub"]),
+        nome=payload.get("nome"),
+        sobrenome=payload.get("sobrenome"),
+        email=payload.get("email"),
+        eh_admin=bool(payload.get("eh_admin")),
+    )
 
 
-def criar_token_acesso(sub: str) -> str:
+def criar_token_acesso(
+    sub: str, usuario: Optional[Union[Credencial, Principal]] = None, sessao: Optional[str] = None
+) -> str:
     """
     https://jwt.io
+
+    Com AUTH_STATELESS ativo e o usuário informado, o token também
+    carrega os claims do usuário (ver claims_usuario). A sessão vai no
+    claim "sid", usado no logout.
     """
+    claims: Dict[str, Any] = {}
+    if settings.AUTH_STATELESS and usuario is not None:
+        claims.update(claims_usuario(usuario))
+    if sessao:
+        claims["sid"] = sessao
+
     return _criar_token(
         tipo_token="access_token",
         tempo_vida=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         sub=sub,
+        claims=claims,
+    )
+
+
+def criar_token_refresh(sub: str, sessao: Optional[str] = None) -> Tuple[str, str, int]:
+    """
+    Gera um refresh token com identificador único (jti) e, se informada,
+    a sessão no claim "sid". Retorna o token, o jti e o epoch de
+    expiração a ser gravado no banco.
+    """
+    jti = uuid4().hex
+    tempo_vida = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    expira_em = int(time.time()) + int(tempo_vida.total_seconds())
+
+    token = _criar_token(
+        tipo_token="refresh_token",
+        tempo_vida=tempo_vida,
+        sub=sub,
+        claims={"sid": sessao} if sessao else None,
+        jti=jti,
     )
+    return token, jti, expira_em
+
+
+async def emitir_tokens(
+    usuario_id: int,
+    db: AsyncSession,
+    usuario: Optional[Union[Credencial, Principal]] = None,
+    sessao: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Emite o par access/refresh token e registra o refresh token. O
+    usuário só é necessário para os claims do modo stateless. Sem
+    `sessao` (login), abre uma sessão nova; na renovação a sessão é
+    mantida.
+    """
+    sessao = sessao or uuid4().hex
+    token_refresh, jti, expira_em = criar_token_refresh(sub=str(usuario_id), sessao=sessao)
+
+    async with db as session:
+        session.add(
+            RefreshTokenModel(jti=jti, usuario_id=usuario_id, expira_em=expira_em, sessao=sessao)
+        )
+        await session.commit()
+
+    return {
+        "access_token": criar_token_acesso(sub=str(usuario_id), usuario=usuario, sessao=sessao),
+        "refresh_token": token_refresh,
+        "token_type": "bearer",
+    }
+
+
+async def renovar_tokens(token_refresh: str, db: AsyncSession) -> Optional[Dict[str, str]]:
+    """
+    Troca um refresh token válido por um novo par de tokens (rotação):
+    o refresh token apresentado é marcado como usado com um único UPDATE
+    condicional. A reutilização de um refresh token já usado revoga
+    todos os refresh tokens da mesma sessão.
+    """
+    try:
+        payload = codec_jwt.decodificar(token_refresh)
+    except JWTError:
+        return None
+
+    if payload.get("type") != "refresh_token" or not payload.get("jti"):
+        return None
+
+    # Revogado por um administrador (/revogar)
+    if lista_revogacao.revogado(payload["jti"]):
+        return None
+
+    usuario_id = int(payload["sub"])
+
+    async with db as session:
+        result = await session.execute(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.jti == payload["jti"],
+                RefreshTokenModel.usado.is_(False),
+                RefreshTokenModel.expira_em > int(time.time()),
+            )
+            .values(usado=True)
+        )
+
+        if result.rowcount != 1:
+            # A reutilização encerra a sessão do token (ou todas, sem "sid")
+            filtro = [RefreshTokenModel.usuario_id == usuario_id]
+            if payload.get("sid"):
+                filtro.append(RefreshTokenModel.sessao == payload["sid"])
+            await session.execute(update(RefreshTokenModel).where(*filtro).values(usado=True))
+            await session.commit()
+            return None
+
+        await session.commit()
+
+        usuario: Optional[Principal] = None
+        if settings.AUTH_STATELESS:
+            usuario = cache_principais.get(usuario_id)
+            if usuario is None:
+                usuario = await buscar_principal(session, usuario_id)
+                if usuario is None:
+                    return None
+
+    return await emitir_tokens(usuario_id, db, usuario=usuario, sessao=payload.get("sid"))
@@ -0,0 +1,175 @@
+"""
+Busca de usuários por trechos de nome, sobrenome e email.
+
+Cada termo (de 3+ caracteres) precisa aparecer em alguma das colunas,
+no início ou no meio. A busca usa o índice de texto do banco: FULLTEXT
+com parser ngram no MySQL e a tabela FTS5 com tokenizer trigram no
+SQLite (ver models.usuario_model); em outros bancos cai em LIKE.
+
+Ordem dos resultados: email igual ao texto buscado, depois colunas que
+começam com o primeiro termo, depois os demais; dentro de cada faixa,
+pela relevância do índice e pelo id.
+"""
+import logging
+import time
+
+from typing import Any, Dict, List
+
+from sqlalchemy import and_, case, func, literal_column, or_, select, table, column, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.consultas import COLUNAS_PRINCIPAL
+from core.paginacao import escapar_like
+from models.usuario_model import UsuarioModel
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO_TERMO = 3
+
+# Erro do MySQL quando o MAX_EXECUTION_TIME é atingido
+_MYSQL_TEMPO_EXCEDIDO = 3024
+# Instruções da VM do SQLite entre as verificações do prazo
+_SQLITE_PASSOS_VERIFICACAO = 1000
+
+_COLUNAS_BUSCA = (UsuarioModel.nome, UsuarioModel.sobrenome, UsuarioModel.email)
+_fts = table("usuarios_busca", column("rowid"))
+
+
+class BuscaExpiradaError(Exception):
+    """A busca passou do tempo limite e foi interrompida pelo banco."""
+
+
+def termos_da_busca(texto: str) -> List[str]:
+    """
+    Termos distintos do texto, na ordem em que aparecem (sem diferenciar
+    maiúsculas e sem aspas, que delimitam as frases da consulta ao índice).
+    """
+    termos: List[str] = []
+    for termo in texto.lower().replace('"', " ").split():
+        if termo not in termos:
+            termos.append(termo)
+    return termos
+
+
+def _contem(termo: str):
+    padrao = f"%{escapar_like(termo)}%"
+    return or_(*(coluna.like(padrao, escape="\\") for coluna in _COLUNAS_BUSCA))
+
+
+def _posto(texto: str, termos: List[str]):
+    prefixo = f"{escapar_like(termos[0])}%"
+    return case(
+        (func.lower(UsuarioModel.email) == texto.lower(), 0),
+        (or_(*(coluna.like(prefixo, escape="\\") for coluna in _COLUNAS_BUSCA)), 1),
+        else_=2,
+    )
+
+
+def _frase(termo: str) -> str:
+    # O MySQL não tem escape de aspas dentro da frase: elas saem do termo
+    return '"' + termo.replace('"', "") + '"'
+
+
+def _montar_consulta(dialeto: str, texto: str, termos: List[str], tempo_limite_ms: int):
+    indexados = [t for t in termos if len(t) >= TAMANHO_MINIMO_TERMO]
+    # Termos curtos não estão no índice: filtram os candidatos por LIKE
+    curtos = [_contem(t) for t in termos if len(t) < TAMANHO_MINIMO_TERMO]
+    query = select(*COLUNAS_PRINCIPAL)
+
+    if dialeto == "sqlite":
+        query = query.join_from(_fts, UsuarioModel, UsuarioModel.id == _fts.c.rowid).where(
+            literal_column("usuarios_busca").op("MATCH")(" AND ".join(map(_frase, indexados)))
+        )
+        relevancia = func.bm25(literal_column("usuarios_busca"))
+    elif dialeto == "mysql":
+        indice = match(
+            *_COLUNAS_BUSCA, against=" ".join("+" + _frase(t) for t in indexados)
+        ).in_boolean_mode()
+        query = query.where(indice).prefix_with(
+            f"/*+ MAX_EXECUTION_TIME({int(tempo_limite_ms)}) */", dialect="mysql"
+        )
+        relevancia = indice.desc()
+    else:
+        query = query.where(*(_contem(t) for t in indexados))
+        relevancia = None
+
+    if curtos:
+        query = query.where(and_(*curtos))
+
+    ordem = [_posto(texto, termos)]
+    if relevancia is not None:
+        ordem.append(relevancia)
+    return query.order_by(*ordem, UsuarioModel.id)
+
+
+async def _com_prazo_sqlite(session: AsyncSession, query, tempo_limite_ms: int):
+    """Executa `query` interrompendo o SQLite (progress handler) no prazo."""
+    prazo = time.perf_counter() + tempo_limite_ms / 1000
+    conexao = await (await session.connection()).get_raw_connection()
+    driver = conexao.driver_connection
+
+    await driver.set_progress_handler(
+        lambda: time.perf_counter() > prazo, _SQLITE_PASSOS_VERIFICACAO
+    )
+    try:
+        return (await session.execute(query)).all()
+    finally:
+        await driver.set_progress_handler(None, 0)
+
+
+async def buscar_usuarios(
+    session: AsyncSession, texto: str, limite: int, deslocamento: int, tempo_limite_ms: int
+) -> List[Dict[str, Any]]:
+    """
+    Retorna até `limite` usuários a partir da posição `deslocamento` do
+    ranking. Lança BuscaExpiradaError se a consulta passar de
+    `tempo_limite_ms`; lança ValueError se nenhum termo tiver o tamanho
+    mínimo.
+    """
+    termos = termos_da_busca(texto)
+    if not any(len(t) >= TAMANHO_MINIMO_TERMO for t in termos):
+        raise ValueError(f"Informe ao menos um termo com {TAMANHO_MINIMO_TERMO} caracteres.")
+
+    dialeto = session.bind.dialect.name
+    query = _montar_consulta(dialeto, texto.strip(), termos, tempo_limite_ms)
+    query = query.limit(limite).offset(deslocamento)
+
+    try:
+        if dialeto == "sqlite":
+            linhas = await _com_prazo_sqlite(session, query, tempo_limite_ms)
+        else:
+            linhas = (await session.execute(query)).all()
+    except OperationalError as exc:
+        codigo = exc.orig.args[0] if exc.orig is not None and exc.orig.args else None
+        if codigo == _MYSQL_TEMPO_EXCEDIDO or "interrupted" in str(exc.orig):
+            raise BuscaExpiradaError() from exc
+        raise
+
+    return [linha._asdict() for linha in linhas]
+
+
+async def verificar_stopwords(session: AsyncSession) -> bool:
+    """
+    No MySQL, confere se o servidor cria os índices FULLTEXT sem
+    stopwords (innodb_ft_enable_stopword=OFF ou uma tabela de stopwords
+    própria, que deve estar vazia). Com as stopwords ligadas, uma
+    recriação do ix_usuarios_busca (ALTER/OPTIMIZE) volta a descartar os
+    tokens que as contêm. Retorna False e registra um aviso nesse caso.
+    """
+    if session.bind.dialect.name != "mysql":
+        return True
+
+    ligadas, tabela = (
+        await session.execute(
+            text("SELECT @@GLOBAL.innodb_ft_enable_stopword, @@GLOBAL.innodb_ft_server_stopword_table")
+        )
+    ).one()
+    if ligadas and not tabela:
+        logger.warning(
+            "innodb_ft_enable_stopword está ligado: a busca de usuários deixa de "
+            "encontrar termos com stopwords se o índice ix_usuarios_busca for recriado"
+        )
+        return False
+    return True
@@ -0,0 +1,139 @@
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from core.configs import settings
+from models.usuario_model import UsuarioModel
+
+
+class Principal(NamedTuple):
+    """
+    Representação compacta e imutável do usuário autenticado. Expõe os
+    mesmos atributos de UsuarioSchemaBase, sem o hash da senha.
+    """
+
+    id: int
+    nome: Optional[str]
+    sobrenome: Optional[str]
+    email: str
+    eh_admin: bool
+
+    @classmethod
+    def de_usuario(cls, usuario: UsuarioModel) -> "Principal":
+        return cls(
+            id=usuario.id,
+            nome=usuario.nome,
+            sobrenome=usuario.sobrenome,
+            email=usuario.email,
+            eh_admin=bool(usuario.eh_admin),
+        )
+
+
+class CacheTTL:
+    """
+    Cache LRU em memória com tempo de vida (TTL) por item e limite de
+    tamanho. Não é thread-safe: deve ser usado a partir do event loop.
+    """
+
+    def __init__(self, max_itens: int, ttl_segundos: float) -> None:
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirados = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.max_itens > 0 and self.ttl_segundos > 0
+
+    def get(self, chave: Hashable) -> Optional[Any]:
+        item = self._itens.get(chave)
+        if item is None:
+            self.misses += 1
+            return None
+
+        valor, expira_em = item
+        if expira_em <= time.monotonic():
+            del self._itens[chave]
+            self.expirados += 1
+            self.misses += 1
+            return None
+
+        self._itens.move_to_end(chave)
+        self.hits += 1
+        return valor
+
+    def set(self, chave: Hashable, valor: Any, ttl_segundos: Optional[float] = None) -> None:
+        if not self.ativo:
+            return
+
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        self._itens[chave] = (valor, time.monotonic() + ttl)
+        self._itens.move_to_end(chave)
+
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.evictions += 1
+
+    def invalidar(self, chave: Hashable) -> None:
+        self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl_segundos": self.ttl_segundos,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirados": self.expirados,
+            "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Cache de usuários autenticados, indexado pelo id do usuário (sub do token)
+cache_principais: CacheTTL = CacheTTL(
+    max_itens=settings.CACHE_USUARIO_MAX_ITENS,
+    ttl_segundos=settings.CACHE_USUARIO_TTL_SEGUNDOS,
+)
+
+
+# Invalidação: só vale para o processo que fez a alteração. As outras
+# réplicas (e alterações feitas fora da aplicação) continuam servindo o
+# principal antigo por até CACHE_USUARIO_TTL_SEGUNDOS; quem precisa que uma
+# mudança valha na hora (ex.: tirar o eh_admin) deve revogar os tokens do
+# usuário.
+
+
+@event.listens_for(UsuarioModel, "after_update")
+@event.listens_for(UsuarioModel, "after_delete")
+def _invalidar_principal(mapper, connection, target: UsuarioModel) -> None:
+    """Remove do cache o usuário alterado/removido via ORM (flush)."""
+    cache_principais.invalidar(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidar_em_lote(estado: ORMExecuteState) -> None:
+    """
+    UPDATE/DELETE em lote (update(UsuarioModel)) não passa pelos eventos do
+    flush nem diz quais ids alterou: limpa o cache inteiro. Comandos que
+    não mexem nas colunas do Principal (contadores, hash da senha) passam
+    execution_options(preserva_principal=True).
+    """
+    if not (estado.is_update or estado.is_delete):
+        return
+    if estado.bind_mapper is not UsuarioModel.__mapper__:
+        return
+    if estado.execution_options.get("preserva_principal"):
+        return
+    cache_principais.limpar()
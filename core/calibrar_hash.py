@@ -0,0 +1,90 @@
+"""
+Calibra o custo do hash de senhas na máquina atual: mede o tempo de um
+hash para custos crescentes e sugere o maior custo dentro do orçamento
+de latência. Rode no ambiente alvo (ex.: dentro do pod, com o mesmo
+limite de CPU).
+
+Uso:
+    python -m core.calibrar_hash --esquema bcrypt --orcamento-ms 250
+"""
+import argparse
+import statistics
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+from passlib.hash import argon2, bcrypt, scrypt
+
+from core.configs import settings
+
+# esquema -> (configuração ajustada, custos testados, handler para o custo)
+CUSTOS: Dict[str, Tuple[str, range, Callable]] = {
+    "bcrypt": ("BCRYPT_ROUNDS", range(4, 17), lambda c: bcrypt.using(rounds=c)),
+    "scrypt": (
+        "SCRYPT_ROUNDS",
+        range(10, 21),
+        lambda c: scrypt.using(
+            rounds=c, block_size=settings.SCRYPT_BLOCK_SIZE, parallelism=settings.SCRYPT_PARALLELISM
+        ),
+    ),
+    "argon2": (
+        "ARGON2_TIME_COST",
+        range(1, 11),
+        lambda c: argon2.using(
+            type="ID",
+            time_cost=c,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    ),
+}
+
+
+def medir_ms(handler, amostras: int) -> float:
+    """Mediana, em ms, do tempo de um hash com o handler informado."""
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        handler.hash("calibracao-de-senha")
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def calibrar(esquema: str, orcamento_ms: float, amostras: int = 3) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Retorna o maior custo cujo hash cabe no orçamento (ou o menor custo,
+    se nenhum couber) e as medições feitas.
+    """
+    _, custos, handler = CUSTOS[esquema]
+    escolhido = custos[0]
+    medicoes = []
+
+    for custo in custos:
+        tempo_ms = medir_ms(handler(custo), amostras)
+        medicoes.append((custo, round(tempo_ms, 1)))
+        if tempo_ms > orcamento_ms:
+            # O tempo cresce com o custo: não há por que continuar
+            break
+        escolhido = custo
+
+    return escolhido, medicoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--esquema", default=settings.HASH_ESQUEMA, choices=sorted(CUSTOS))
+    parser.add_argument("--orcamento-ms", type=float, default=250.0)
+    parser.add_argument("--amostras", type=int, default=3)
+    args = parser.parse_args()
+
+    configuracao = CUSTOS[args.esquema][0]
+    custo, medicoes = calibrar(args.esquema, args.orcamento_ms, args.amostras)
+
+    for valor, tempo_ms in medicoes:
+        marcador = "<=" if valor == custo else "  "
+        print(f"{marcador} {configuracao}={valor}: {tempo_ms} ms")
+    print(f"\nexport HASH_ESQUEMA={args.esquema} {configuracao}={custo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import List, ClassVar
+from typing import List, ClassVar, Optional
 from urllib.parse import quote_plus
 
 from pydantic_settings import BaseSettings
@@ -14,10 +14,39 @@ class Settings(BaseSettings):
     DB_USERNAME: str = "urbanfood"
     DB_PASSWORD: str = "Urbanf00dFiap"
     DB_PORT: int = 3306
+    # Réplicas de leitura (mesmas credenciais, porta e banco do writer)
+    DB_LEITURA_HOSTS: List[str] = []
+    # URL completa do banco; quando informada substitui a configuração do
+    # MySQL acima (ex.: sqlite+aiosqlite:///./local.db para desenvolvimento)
+    DATABASE_URL: Optional[str] = None
+
+    # Pool de conexões (por engine: writer e cada réplica)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 300
+    # pre-ping custa uma ida ao banco por checkout; o recycle já descarta
+    # conexões antigas
+    DB_PRE_PING: bool = False
+    # Conexões abertas por engine no aquecimento da inicialização
+    DB_POOL_AQUECIMENTO: int = 2
+    # Intervalo entre tentativas de aquecimento (ex.: banco indisponível)
+    AQUECIMENTO_INTERVALO_SEGUNDOS: float = 2
     
+    def _mysql_url(self, host: str) -> str:
+        return f"mysql+aiomysql://{self.DB_USERNAME}:{quote_plus(self.DB_PASSWORD)}@{host}:{self.DB_PORT}/{self.DB_NAME}"
+
     @property
     def DB_URL(self) -> str:
-        return f"mysql+aiomysql://{self.DB_USERNAME}:{quote_plus(self.DB_PASSWORD)}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
+        return self._mysql_url(self.DB_HOST)
+
+    @property
+    def DB_LEITURA_URLS(self) -> List[str]:
+        if self.DATABASE_URL:
+            return []
+        return [self._mysql_url(host) for host in self.DB_LEITURA_HOSTS]
     
     DBBaseModel: ClassVar = declarative_base()
 
@@ -28,9 +57,137 @@ class Settings(BaseSettings):
 
     token: str = secrets.token_urlsafe(32)
     """
+    # HS256 (JWT_SECRET) ou assimétrico: RS256/RS384/RS512/ES256/ES384/ES512
     ALGORITHM: str = "HS256"
+    # Chave privada (PEM ou caminho do arquivo) para os algoritmos assimétricos
+    JWT_CHAVE_PRIVADA: Optional[str] = None
+    # Chaves públicas anteriores (PEM ou caminho) ainda aceitas durante a rotação
+    JWT_CHAVES_ANTERIORES: List[str] = []
+    # Cache-Control (max-age) do /.well-known/jwks.json
+    JWKS_MAX_AGE_SEGUNDOS: int = 300
+    # Segredo compartilhado com o gateway, enviado no header
+    # X-Gateway-Segredo do /usuarios/introspeccao. Vazio recusa toda chamada
+    INTROSPECCAO_SEGREDO: str = ""
     # 60 minutos * 24 horas * 7 dias => 1 semana
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # 60 minutos * 24 horas * 30 dias => 1 mês
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
+
+    # Cache de tokens já verificados (core.token); o TTL de cada item
+    # nunca passa do exp do token. 0 desativa o cache.
+    JWT_CACHE_MAX_ITENS: int = 10000
+    JWT_CACHE_TTL_SEGUNDOS: int = 300
+
+    # Máximo de tokens por chamada de introspecção em lote
+    INTROSPECCAO_MAX_TOKENS: int = 1000
+
+    # Filtro de Bloom dos emails cadastrados (descarta logins de emails
+    # inexistentes sem consultar o banco). A memória ocupada é de cerca de
+    # 1,2 byte por email com taxa de falsos positivos de 1%.
+    FILTRO_EMAILS_ATIVO: bool = False
+    FILTRO_EMAILS_CAPACIDADE: int = 1_000_000
+    FILTRO_EMAILS_TAXA_FP: float = 0.01
+    FILTRO_EMAILS_INTERVALO_SEGUNDOS: int = 5
+    FILTRO_EMAILS_RECONSTRUCAO_SEGUNDOS: int = 3600
+
+    # Auditoria de login (write-behind): os eventos ficam em memória e são
+    # gravados em lote a cada AUDITORIA_LOGIN_INTERVALO_SEGUNDOS ou quando
+    # a fila chega a AUDITORIA_LOGIN_TAMANHO_LOTE. Com a fila cheia
+    # (AUDITORIA_LOGIN_CAPACIDADE) descarta os eventos novos
+    # ("descartar_novos") ou os mais antigos ("descartar_antigos")
+    AUDITORIA_LOGIN_ATIVO: bool = True
+    AUDITORIA_LOGIN_CAPACIDADE: int = 50_000
+    AUDITORIA_LOGIN_TAMANHO_LOTE: int = 500
+    AUDITORIA_LOGIN_INTERVALO_SEGUNDOS: float = 1
+    AUDITORIA_LOGIN_EXCESSO: str = "descartar_novos"
+    # Falhas seguidas de um lote antes de gravar evento a evento (os que
+    # ainda falham vão para a lista de rejeitados)
+    AUDITORIA_LOGIN_MAX_TENTATIVAS: int = 3
+
+    # Intervalo de sincronização da lista de tokens revogados em cada réplica
+    REVOGACAO_INTERVALO_SEGUNDOS: int = 5
+    # Ids abaixo da marca d'água relidos a cada sincronização: um INSERT
+    # que pegou um id menor e fez commit depois da leitura não se perde
+    REVOGACAO_SOBREPOSICAO_IDS: int = 1000
+    # Intervalo da remoção das revogações expiradas e dos refresh tokens
+    # expirados ou usados
+    REVOGACAO_LIMPEZA_INTERVALO_SEGUNDOS: int = 3600
+
+    # Intervalo da medição do atraso (lag) do event loop exposto em /metrics
+    METRICAS_INTERVALO_LAG_SEGUNDOS: float = 0.5
+
+    # Diagnóstico: captura do detalhamento das requisições mais lentas que
+    # o limiar (pode ser ligada em tempo de execução) e duração máxima de
+    # uma amostragem do profiler
+    REQUISICOES_LENTAS_ATIVO: bool = False
+    REQUISICOES_LENTAS_LIMIAR_MS: float = 500
+    REQUISICOES_LENTAS_MAX_ITENS: int = 100
+    PERFIL_MAX_SEGUNDOS: int = 60
+
+    # Servidor (core.servidor). Workers: 1 por pod, escalando por réplicas
+    # (HPA); 0 => um por CPU da cota do container, mas métricas, lentas,
+    # saturação e caches passam a ser por processo. O keep-alive fica acima
+    # do idle timeout do load balancer (60s) e o shutdown gracioso abaixo do
+    # terminationGracePeriodSeconds do deployment (30s, menos o preStop)
+    SERVIDOR_HOST: str = "0.0.0.0"
+    SERVIDOR_PORTA: int = 8000
+    SERVIDOR_WORKERS: int = 1
+    SERVIDOR_BACKLOG: int = 2048
+    SERVIDOR_KEEPALIVE_SEGUNDOS: int = 75
+    SERVIDOR_TIMEOUT_GRACEFUL_SEGUNDOS: int = 20
+
+    # Modo stateless: o token de acesso carrega os dados do usuário
+    # (nome, sobrenome, email, eh_admin) e get_current_user não consulta
+    # o banco. Incrementar CLAIMS_VERSAO invalida os claims já emitidos.
+    AUTH_STATELESS: bool = False
+    CLAIMS_VERSAO: int = 1
+
+    # Paginação da listagem de usuários (keyset por id)
+    LISTAGEM_LIMITE_PADRAO: int = 100
+    LISTAGEM_LIMITE_MAXIMO: int = 500
+
+    # Busca de usuários (core.busca): resultados por página, posição
+    # máxima alcançável pela paginação e tempo limite de cada consulta
+    BUSCA_LIMITE_PADRAO: int = 20
+    BUSCA_LIMITE_MAXIMO: int = 100
+    BUSCA_MAX_RESULTADOS: int = 1000
+    BUSCA_TEMPO_LIMITE_MS: int = 500
+
+    # Importação em massa de usuários (linhas por INSERT multi-linha)
+    IMPORTACAO_TAMANHO_LOTE: int = 500
+    # Exportação em streaming (linhas lidas do cursor por vez)
+    EXPORTACAO_TAMANHO_LOTE: int = 1000
+
+    # Hash de senhas: "bcrypt", "argon2" (argon2id) ou "scrypt". Use
+    # `python -m core.calibrar_hash` para escolher o custo na máquina alvo.
+    # Hashes com esquema/custo diferentes são refeitos no próximo login.
+    HASH_ESQUEMA: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    SCRYPT_ROUNDS: int = 15  # log2(N)
+    SCRYPT_BLOCK_SIZE: int = 8
+    SCRYPT_PARALLELISM: int = 1
+
+    # Pool de workers para o bcrypt (hash/verificação fora do event loop)
+    # "thread" (o bcrypt libera o GIL) ou "process"
+    HASH_POOL_TIPO: str = "thread"
+    # 0 => CPUs da cota do container (core.servidor.nucleos_disponiveis)
+    HASH_POOL_WORKERS: int = 0
+
+    # Controle de admissão do bcrypt: execuções simultâneas (0 => tamanho
+    # do pool), tamanho da fila de espera e espera máxima antes do 503
+    ADMISSAO_HASH_MAX_CONCORRENTES: int = 0
+    ADMISSAO_HASH_MAX_FILA: int = 32
+    ADMISSAO_HASH_ESPERA_MAXIMA_SEGUNDOS: float = 2.0
+    ADMISSAO_RETRY_AFTER_SEGUNDOS: int = 1
+
+    # Cache em memória dos usuários autenticados (get_current_user)
+    # 0 em qualquer um dos dois desativa o cache. O TTL é o atraso máximo
+    # com que uma alteração do usuário feita em outra réplica aparece aqui
+    CACHE_USUARIO_TTL_SEGUNDOS: int = 60
+    CACHE_USUARIO_MAX_ITENS: int = 10000
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,76 @@
+"""
+Consultas do caminho quente da autenticação.
+
+Selecionam só as colunas necessárias direto da tabela (Core, sem
+identity map nem instrumentação de atributos) e devolvem tuplas leves.
+Os statements são montados uma única vez com bindparam, de modo que o
+SQLAlchemy reaproveita o SQL compilado do seu cache a cada execução.
+"""
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import Principal
+from models.usuario_model import UsuarioModel
+
+_usuarios = UsuarioModel.__table__
+
+# Colunas públicas do usuário (os campos de UsuarioSchemaBase)
+COLUNAS_PRINCIPAL = (
+    _usuarios.c.id,
+    _usuarios.c.nome,
+    _usuarios.c.sobrenome,
+    _usuarios.c.email,
+    _usuarios.c.eh_admin,
+)
+
+_SELECT_CREDENCIAL = select(*COLUNAS_PRINCIPAL, _usuarios.c.senha).where(
+    _usuarios.c.email == bindparam("email")
+)
+
+_SELECT_PRINCIPAL = select(*COLUNAS_PRINCIPAL).where(_usuarios.c.id == bindparam("id"))
+
+_SELECT_PRINCIPAIS = select(*COLUNAS_PRINCIPAL).where(
+    _usuarios.c.id.in_(bindparam("ids", expanding=True))
+)
+
+
+class Credencial(NamedTuple):
+    """Dados do usuário necessários para o login (inclui o hash da senha)."""
+
+    id: int
+    nome: Optional[str]
+    sobrenome: Optional[str]
+    email: str
+    eh_admin: bool
+    senha: str
+
+    @property
+    def principal(self) -> Principal:
+        return Principal(self.id, self.nome, self.sobrenome, self.email, bool(self.eh_admin))
+
+
+async def buscar_credencial(session: AsyncSession, email: str) -> Optional[Credencial]:
+    result = await session.execute(_SELECT_CREDENCIAL, {"email": email})
+    linha = result.first()
+    return Credencial._make(linha) if linha is not None else None
+
+
+async def buscar_principal(session: AsyncSession, usuario_id: int) -> Optional[Principal]:
+    result = await session.execute(_SELECT_PRINCIPAL, {"id": usuario_id})
+    linha = result.first()
+    return _principal(linha) if linha is not None else None
+
+
+async def buscar_principais(
+    session: AsyncSession, usuario_ids: Iterable[int]
+) -> Dict[int, Principal]:
+    """Principais de vários usuários com uma única consulta IN."""
+    result = await session.execute(_SELECT_PRINCIPAIS, {"ids": list(usuario_ids)})
+    return {linha[0]: _principal(linha) for linha in result}
+
+
+def _principal(linha) -> Principal:
+    id_, nome, sobrenome, email, eh_admin = linha
+    return Principal(id_, nome, sobrenome, email, bool(eh_admin))
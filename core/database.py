@@ -1,17 +1,103 @@
+import time
+
+from itertools import cycle
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 
 from core.configs import settings
+from core.metricas import POOL_ESPERA_SEGUNDOS, SQL_SEGUNDOS, medidor_funcao
+from core.perfil import registrar_etapa
 
 # Criar Base para os modelos
 Base = declarative_base()
 
-engine: AsyncEngine = create_async_engine(
-    settings.DB_URL, pool_pre_ping=True, pool_recycle=300
-)
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """
+    Pool de conexões que mede o tempo de checkout (espera por uma conexão
+    livre ou abertura de uma nova) e os timeouts.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total_segundos = 0.0
+        self.espera_maxima_segundos = 0.0
+        self.metrica_espera = POOL_ESPERA_SEGUNDOS.rotulado("escrita")
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            self.metrica_espera.observar(espera)
+            registrar_etapa("pool_espera", espera)
+            self.checkouts += 1
+            self.espera_total_segundos += espera
+            self.espera_maxima_segundos = max(self.espera_maxima_segundos, espera)
+
+    def recreate(self) -> "PoolMedido":
+        novo = super().recreate()
+        novo.metrica_espera = self.metrica_espera
+        return novo
+
+    def estatisticas(self) -> Dict[str, float]:
+        capacidade = self.size() + self._max_overflow
+        return {
+            "tamanho": self.size(),
+            "max_overflow": self._max_overflow,
+            "em_uso": self.checkedout(),
+            "livres": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "utilizacao": round(self.checkedout() / capacidade, 4) if capacidade else 0.0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "espera_media_ms": round(self.espera_total_segundos / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "espera_maxima_ms": round(self.espera_maxima_segundos * 1000, 3),
+        }
+
+
+def criar_engine(url: str, nome: str = "escrita") -> AsyncEngine:
+    """
+    Cria um engine com o pool configurado em Settings. O pre-ping (uma
+    ida ao banco a mais em cada checkout) é opcional: com DB_POOL_RECYCLE
+    abaixo do wait_timeout do MySQL as conexões velhas já são descartadas.
+    """
+    if url.startswith("sqlite"):
+        return create_async_engine(url)
+
+    novo_engine = create_async_engine(
+        url,
+        poolclass=PoolMedido,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_PRE_PING,
+    )
+    novo_engine.pool.metrica_espera = POOL_ESPERA_SEGUNDOS.rotulado(nome)
+    return novo_engine
+
+
+engine: AsyncEngine = criar_engine(settings.DB_URL)
+
+# Réplicas de leitura; sem réplicas, as leituras também vão para o writer
+engines_leitura: List[AsyncEngine] = [
+    criar_engine(url, f"leitura_{i}") for i, url in enumerate(settings.DB_LEITURA_URLS)
+]
 
 Session: AsyncSession = sessionmaker(
     autocommit=False,
@@ -20,3 +106,129 @@ Session: AsyncSession = sessionmaker(
     class_=AsyncSession,
     bind=engine,
 )
+
+_sessions_leitura = cycle(
+    [
+        sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            class_=AsyncSession,
+            bind=engine_leitura,
+        )
+        for engine_leitura in engines_leitura
+    ]
+    or [Session]
+)
+
+
+def SessionLeitura() -> AsyncSession:
+    """Nova sessão somente leitura, distribuída entre as réplicas (round-robin)."""
+    return next(_sessions_leitura)()
+
+
+class UnidadeTrabalho:
+    """
+    Sessões de uma requisição, compartilhadas entre as dependências e o
+    endpoint. Cada sessão só é criada no primeiro acesso e, como toda
+    AsyncSession, só pega uma conexão do pool no primeiro comando; a
+    conexão volta ao pool no commit ou no fim do `async with`.
+
+    Sem réplicas (`criar_leitura` None) a leitura usa a própria sessão de
+    escrita: a requisição ocupa no máximo uma conexão e lê o que escreveu.
+    """
+
+    __slots__ = ("_criar_escrita", "_criar_leitura", "_escrita", "_leitura")
+
+    def __init__(
+        self,
+        criar_escrita: Callable[[], AsyncSession],
+        criar_leitura: Optional[Callable[[], AsyncSession]] = None,
+    ) -> None:
+        self._criar_escrita = criar_escrita
+        self._criar_leitura = criar_leitura
+        self._escrita: Optional[AsyncSession] = None
+        self._leitura: Optional[AsyncSession] = None
+
+    @property
+    def escrita(self) -> AsyncSession:
+        if self._escrita is None:
+            self._escrita = self._criar_escrita()
+        return self._escrita
+
+    @property
+    def leitura(self) -> AsyncSession:
+        if self._criar_leitura is None:
+            return self.escrita
+        if self._leitura is None:
+            self._leitura = self._criar_leitura()
+        return self._leitura
+
+    def nova_sessao_leitura(self) -> AsyncSession:
+        """
+        Sessão de leitura avulsa, fora da unidade: o chamador a fecha. Para
+        o que roda depois que a unidade já foi fechada, como o gerador de
+        um StreamingResponse.
+        """
+        return (self._criar_leitura or self._criar_escrita)()
+
+    @property
+    def com_replica(self) -> bool:
+        """True quando a leitura vai para uma réplica (e pode estar atrasada)."""
+        return self._criar_leitura is not None
+
+    @property
+    def sessoes_abertas(self) -> int:
+        return (self._escrita is not None) + (self._leitura is not None)
+
+    async def fechar(self) -> None:
+        """Fecha as sessões criadas (desfaz o que não foi commitado)."""
+        for session in (self._leitura, self._escrita):
+            if session is not None:
+                await session.close()
+        self._escrita = self._leitura = None
+
+
+def nova_unidade_trabalho() -> UnidadeTrabalho:
+    return UnidadeTrabalho(Session, SessionLeitura if engines_leitura else None)
+
+
+def estatisticas_pools() -> Dict[str, Dict[str, float]]:
+    """Uso e tempo de checkout dos pools do writer e das réplicas."""
+    engines = {"escrita": engine}
+    engines.update({f"leitura_{i}": e for i, e in enumerate(engines_leitura)})
+    return {
+        nome: e.pool.estatisticas()
+        for nome, e in engines.items()
+        if isinstance(e.pool, PoolMedido)
+    }
+
+
+_metrica_sql = SQL_SEGUNDOS.rotulado()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_do_sql(conn, cursor, statement, parameters, context, executemany):
+    context._inicio_sql = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_do_sql(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_sql", None)
+    if inicio is not None:
+        duracao = time.perf_counter() - inicio
+        _metrica_sql.observar(duracao)
+        registrar_etapa("sql", duracao)
+
+
+def _metricas_pools(campo: str):
+    for nome, estatisticas in estatisticas_pools().items():
+        yield (nome,), estatisticas[campo]
+
+
+medidor_funcao(
+    "db_pool_em_uso", "Conexões em uso por pool.", ("engine",), lambda: _metricas_pools("em_uso")
+)
+medidor_funcao(
+    "db_pool_utilizacao", "Fração das conexões do pool em uso.", ("engine",), lambda: _metricas_pools("utilizacao")
+)
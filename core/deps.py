@@ -1,62 +1,133 @@
-from typing import AsyncGenerator, Optional
+import hmac
 
-from fastapi import Depends, HTTPException, status
-from jose import jwt, JWTError
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from jose import JWTError
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from pydantic import BaseModel
 
-from core.database import Session
-from core.auth import oauth2_schema
+from core.database import UnidadeTrabalho, nova_unidade_trabalho
+from core.auth import oauth2_schema, principal_stateless
+from core.cache import Principal, cache_principais
 from core.configs import settings
-from models.usuario_model import UsuarioModel
+from core.consultas import buscar_principal
+from core.revogacao import lista_revogacao
+from core.token import codec_jwt
 
 
 class TokenData(BaseModel):
     username: Optional[str] = None
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    session: AsyncSession = Session()
+async def get_unidade_trabalho() -> AsyncGenerator[UnidadeTrabalho, None]:
+    """
+    Unidade de trabalho da requisição: uma por requisição (o FastAPI
+    reaproveita o valor entre as dependências) e sem sessão nem conexão
+    até o primeiro uso.
+    """
+    unidade: UnidadeTrabalho = nova_unidade_trabalho()
 
     try:
-        yield session
+        yield unidade
     finally:
-        await session.close()
+        await unidade.fechar()
 
 
-async def get_current_user(
-    db: Session = Depends(get_session), token: str = Depends(oauth2_schema)
-) -> UsuarioModel:
-    credential_exception: HTTPException = HTTPException(
+async def get_session(unidade: UnidadeTrabalho = Depends(get_unidade_trabalho)) -> AsyncSession:
+    return unidade.escrita
+
+
+async def get_session_leitura(unidade: UnidadeTrabalho = Depends(get_unidade_trabalho)) -> AsyncSession:
+    """Sessão para consultas que toleram o atraso de replicação."""
+    return unidade.leitura
+
+
+def _erro_credencial() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível autenticar a credencial",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def get_token_payload(token: str = Depends(oauth2_schema)) -> Dict[str, Any]:
+    """
+    Verifica o token de acesso (assinatura, expiração, tipo e revogação)
+    e retorna os seus claims.
+    """
+    credential_exception: HTTPException = _erro_credencial()
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.ALGORITHM],
-            options={"verify_aud": False},
-        )
+        payload = codec_jwt.decodificar(token)
 
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type") != "access_token":
             raise credential_exception
-
-        token_data: TokenData = TokenData(username=username)
     except JWTError:
         raise credential_exception
 
-    async with db as session:
-        query = select(UsuarioModel).filter(UsuarioModel.id == int(token_data.username))
-        result = await session.execute(query)
-        usuario: UsuarioModel = result.scalars().unique().one_or_none()
+    if lista_revogacao.revogado(payload.get("jti")):
+        raise credential_exception
 
-        if usuario is None:
-            raise credential_exception
+    return payload
+
+
+async def get_current_user(
+    unidade: UnidadeTrabalho = Depends(get_unidade_trabalho),
+    payload: Dict[str, Any] = Depends(get_token_payload),
+) -> Principal:
+    credential_exception: HTTPException = _erro_credencial()
+
+    token_data: TokenData = TokenData(username=payload["sub"])
+
+    usuario_id = int(token_data.username)
+
+    # Modo stateless: o principal vem inteiro do token já verificado
+    principal: Optional[Principal] = principal_stateless(payload)
+    if principal is not None:
+        return principal
+
+    principal = cache_principais.get(usuario_id)
+    if principal is not None:
+        return principal
+
+    # A sessão só é criada aqui, quando o principal não está no token nem no cache
+    async with unidade.leitura as session:
+        principal = await buscar_principal(session, usuario_id)
+
+    # Usuário recém-criado pode ainda não ter chegado à réplica
+    if principal is None and unidade.com_replica:
+        async with unidade.escrita as session:
+            principal = await buscar_principal(session, usuario_id)
+
+    if principal is None:
+        raise credential_exception
+
+    cache_principais.set(usuario_id, principal)
+    return principal
+
+
+async def verificar_gateway(x_gateway_segredo: Optional[str] = Header(None)) -> None:
+    """Exige o segredo compartilhado com o gateway (settings.INTROSPECCAO_SEGREDO)."""
+    segredo = settings.INTROSPECCAO_SEGREDO
+    if not segredo or not x_gateway_segredo or not hmac.compare_digest(
+        x_gateway_segredo.encode(), segredo.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credencial do gateway inválida",
+        )
+
+
+async def get_current_admin(
+    usuario_logado: Principal = Depends(get_current_user),
+) -> Principal:
+    if not usuario_logado.eh_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso permitido apenas para administradores.",
+        )
 
-        return usuario
+    return usuario_logado
@@ -0,0 +1,79 @@
+import csv
+import io
+import zlib
+
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.consultas import COLUNAS_PRINCIPAL
+
+CAMPOS_EXPORTACAO = [coluna.name for coluna in COLUNAS_PRINCIPAL]
+
+TIPOS_EXPORTACAO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def aceita_gzip(accept_encoding: Optional[str]) -> bool:
+    """Indica se o header Accept-Encoding aceita gzip (com q > 0)."""
+    for item in (accept_encoding or "").split(","):
+        codificacao, _, parametros = item.strip().partition(";")
+        if codificacao.strip().lower() in ("gzip", "*"):
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _ndjson(linhas: Iterable) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(CAMPOS_EXPORTACAO, linha))) + b"\n" for linha in linhas)
+
+
+def _csv(linhas: Iterable, cabecalho: bool) -> bytes:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    if cabecalho:
+        escritor.writerow(CAMPOS_EXPORTACAO)
+    escritor.writerows(linhas)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def exportar_usuarios(
+    criar_sessao: Callable[[], AsyncSession], formato: str, tamanho_lote: int, gzip: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Gera a exportação dos usuários (sem o hash da senha) em pedaços de
+    `tamanho_lote` linhas, lidas com cursor no servidor: a memória usada
+    não depende do tamanho da tabela. A sessão é aberta aqui, e não na
+    dependência da rota, que é fechada antes de a resposta ser enviada.
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # 31 => formato gzip
+    query = (
+        select(*COLUNAS_PRINCIPAL)
+        .order_by(COLUNAS_PRINCIPAL[0])
+        .execution_options(yield_per=tamanho_lote)
+    )
+
+    async with criar_sessao() as session:
+        resultado = await session.stream(query)
+        primeiro = True
+        async for particao in resultado.partitions():
+            if formato == "csv":
+                pedaco = _csv(particao, cabecalho=primeiro)
+            else:
+                pedaco = _ndjson(particao)
+            primeiro = False
+
+            if compressor is not None:
+                pedaco = compressor.compress(pedaco)
+            if pedaco:
+                yield pedaco
+
+        if formato == "csv" and primeiro:
+            pedaco = _csv((), cabecalho=True)
+            yield compressor.compress(pedaco) if compressor is not None else pedaco
+
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.configs import settings
+from models.usuario_model import UsuarioModel
+
+logger = logging.getLogger(__name__)
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom: responde "talvez exista" ou "com certeza não existe".
+    Usa hashing duplo sobre um único blake2b por item.
+    """
+
+    def __init__(self, capacidade: int, taxa_fp: float) -> None:
+        self.capacidade = max(1, capacidade)
+        self.taxa_fp = taxa_fp
+        self.num_bits = max(8, math.ceil(-self.capacidade * math.log(taxa_fp) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacidade * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.itens = 0
+
+    def _posicoes(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def adicionar(self, item: str) -> None:
+        for posicao in self._posicoes(item):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.itens += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._posicoes(item))
+
+    def taxa_fp_estimada(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.itens / self.num_bits)) ** self.num_hashes
+
+    def estatisticas(self) -> Dict[str, float]:
+        return {
+            "itens": self.itens,
+            "capacidade": self.capacidade,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "memoria_bytes": len(self._bits),
+            "taxa_fp_configurada": self.taxa_fp,
+            "taxa_fp_estimada": round(self.taxa_fp_estimada(), 6),
+        }
+
+
+class FiltroEmails:
+    """
+    Conjunto probabilístico dos emails cadastrados. Construído na
+    inicialização a partir de uma leitura em streaming de usuarios.email
+    e atualizado no signup; cada réplica busca periodicamente os usuários
+    com id acima da marca d'água e reconstrói o filtro inteiro a cada
+    `reconstrucao_segundos` (ids do auto-increment podem ser commitados
+    fora de ordem e ficar abaixo da marca). Enquanto não estiver pronto,
+    todo email "pode existir".
+
+    Como o filtro de cada réplica pode estar atrasado, ele é só uma dica:
+    o login só é descartado sem consultar o banco sob sobrecarga.
+    """
+
+    def __init__(self, capacidade: int, taxa_fp: float, reconstrucao_segundos: float = 3600) -> None:
+        self.capacidade = capacidade
+        self.taxa_fp = taxa_fp
+        self.reconstrucao_segundos = reconstrucao_segundos
+        self._filtro: Optional[FiltroBloom] = None
+        self._construido_em = 0.0
+        self.marca_dagua = 0
+        self.descartes = 0
+        self.falsos_negativos = 0
+
+    @property
+    def pronto(self) -> bool:
+        return self._filtro is not None
+
+    @staticmethod
+    def _normalizar(email: str) -> str:
+        # O índice único do MySQL não diferencia maiúsculas/minúsculas
+        return email.strip().lower()
+
+    def pode_existir(self, email: str) -> bool:
+        if self._filtro is None:
+            return True
+        return self._normalizar(email) in self._filtro
+
+    def descartar_login(self, email: str, sob_carga: bool) -> bool:
+        """
+        Indica se o login pode ser recusado sem consultar o banco: só sob
+        carga e para emails ausentes do filtro (que pode estar atrasado).
+        """
+        if sob_carga and not self.pode_existir(email):
+            self.descartes += 1
+            return True
+        return False
+
+    def confirmar_existente(self, email: str) -> None:
+        """Inclui um email encontrado no banco que faltava no filtro (cadastro em outra réplica)."""
+        if not self.pode_existir(email):
+            self.falsos_negativos += 1
+            self.adicionar(email)
+
+    def adicionar(self, email: str) -> None:
+        if self._filtro is not None:
+            self._filtro.adicionar(self._normalizar(email))
+
+    def desativar(self) -> None:
+        self._filtro = None
+        self.marca_dagua = 0
+        self.descartes = 0
+        self.falsos_negativos = 0
+
+    async def construir(self, session: AsyncSession) -> None:
+        """Lê todos os emails em streaming e troca o filtro ao final."""
+        maior_id = await session.scalar(select(UsuarioModel.id).order_by(UsuarioModel.id.desc()).limit(1))
+        filtro = FiltroBloom(max(self.capacidade, 2 * (maior_id or 0)), self.taxa_fp)
+
+        query = select(UsuarioModel.id, UsuarioModel.email).execution_options(yield_per=10000)
+        marca = 0
+        resultado = await session.stream(query)
+        async for id_, email in resultado:
+            filtro.adicionar(self._normalizar(email))
+            marca = max(marca, id_)
+        await session.rollback()
+
+        self._filtro, self.marca_dagua = filtro, marca
+        self._construido_em = time.monotonic()
+
+    async def sincronizar(self, session: AsyncSession) -> int:
+        """Inclui os usuários criados (em qualquer réplica) desde a última leitura."""
+        if self._filtro is None:
+            await self.construir(session)
+            return self._filtro.itens
+
+        query = (
+            select(UsuarioModel.id, UsuarioModel.email)
+            .filter(UsuarioModel.id > self.marca_dagua)
+            .order_by(UsuarioModel.id)
+        )
+        linhas = (await session.execute(query)).all()
+        for id_, email in linhas:
+            self.adicionar(email)
+            self.marca_dagua = id_
+        await session.rollback()
+
+        # Acima da capacidade a taxa de falsos positivos sobe, e linhas
+        # commitadas abaixo da marca d'água ficaram de fora: reconstrói
+        if (
+            self._filtro.itens > self._filtro.capacidade
+            or time.monotonic() - self._construido_em >= self.reconstrucao_segundos
+        ):
+            await self.construir(session)
+        return len(linhas)
+
+    async def executar(self, session_maker, intervalo_segundos: float) -> None:
+        while True:
+            try:
+                async with session_maker() as session:
+                    await self.sincronizar(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha ao sincronizar o filtro de emails")
+            await asyncio.sleep(intervalo_segundos)
+
+    def estatisticas(self) -> Dict[str, float]:
+        dados = {
+            "pronto": self.pronto,
+            "descartes": self.descartes,
+            "falsos_negativos": self.falsos_negativos,
+            "marca_dagua": self.marca_dagua,
+        }
+        if self._filtro is not None:
+            dados.update(self._filtro.estatisticas())
+        return dados
+
+
+filtro_emails: FiltroEmails = FiltroEmails(
+    capacidade=settings.FILTRO_EMAILS_CAPACIDADE,
+    taxa_fp=settings.FILTRO_EMAILS_TAXA_FP,
+    reconstrucao_segundos=settings.FILTRO_EMAILS_RECONSTRUCAO_SEGUNDOS,
+)
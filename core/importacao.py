@@ -0,0 +1,198 @@
+import asyncio
+import csv
+import json
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.admissao import controle_hash
+from core.filtro_emails import filtro_emails
+from core.security import gerar_hash_senha_async, get_cripto
+from models.usuario_model import UsuarioModel
+from schemas.usuario_schema import UsuarioSchemaCreate
+
+CAMPOS_CSV = ["nome", "sobrenome", "email", "senha", "eh_admin"]
+
+# As importações (todas juntas) usam no máximo metade das vagas do
+# bcrypt, sem passar pela fila de admissão dos logins
+_vagas_hash = asyncio.Semaphore(max(1, controle_hash.max_concorrentes // 2))
+
+
+async def linhas_do_corpo(corpo: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Quebra o corpo da requisição (recebido em pedaços) em linhas de
+    texto, sem carregar o corpo inteiro em memória.
+    """
+    resto = b""
+    async for pedaco in corpo:
+        resto += pedaco
+        *linhas, resto = resto.split(b"\n")
+        for linha in linhas:
+            yield linha.decode("utf-8", errors="replace").rstrip("\r")
+    if resto:
+        yield resto.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _normalizar(email: str) -> str:
+    # Mesma regra de FiltroEmails._normalizar
+    return email.strip().lower()
+
+
+def _resultado(linha: int, email: Optional[str], status: str, detalhe: Optional[str] = None) -> Dict[str, Any]:
+    return {"linha": linha, "email": email, "status": status, "detalhe": detalhe}
+
+
+class ImportadorUsuarios:
+    """
+    Importa usuários em lotes: valida cada linha com UsuarioSchemaCreate,
+    descarta emails já existentes, gera os hashes em paralelo no pool de
+    workers e grava cada lote com um único INSERT multi-linha.
+    """
+
+    def __init__(self, session: AsyncSession, tamanho_lote: int, senhas_hash: bool = False) -> None:
+        self.session = session
+        self.tamanho_lote = tamanho_lote
+        self.senhas_hash = senhas_hash
+        self.resultados: List[Dict[str, Any]] = []
+        self._lote: List[tuple] = []
+
+    async def importar(self, linhas: AsyncIterator[str], formato: str) -> Dict[str, Any]:
+        cabecalho: Optional[List[str]] = None
+        numero = 0
+
+        async for linha in linhas:
+            numero += 1
+            if not linha.strip():
+                continue
+
+            try:
+                if formato == "csv":
+                    valores = next(csv.reader([linha]))
+                    if cabecalho is None:
+                        cabecalho = [campo.strip() for campo in valores]
+                        continue
+                    dados = dict(zip(cabecalho, valores))
+                else:
+                    dados = json.loads(linha)
+                    if not isinstance(dados, dict):
+                        raise ValueError("a linha deve ser um objeto JSON")
+            except ValueError as erro:
+                self.resultados.append(_resultado(numero, None, "erro", str(erro)))
+                continue
+
+            self._lote.append((numero, dados))
+            if len(self._lote) >= self.tamanho_lote:
+                await self._gravar_lote()
+
+        if self._lote:
+            await self._gravar_lote()
+
+        self.resultados.sort(key=lambda r: r["linha"])
+        contagem = {"criado": 0, "conflito": 0, "erro": 0}
+        for resultado in self.resultados:
+            contagem[resultado["status"]] += 1
+
+        return {
+            "criados": contagem["criado"],
+            "conflitos": contagem["conflito"],
+            "erros": contagem["erro"],
+            "resultados": self.resultados,
+        }
+
+    async def _gravar_lote(self) -> None:
+        lote, self._lote = self._lote, []
+
+        # 1. Validação com o mesmo schema do signup. A chave é o email
+        # normalizado: o índice único do MySQL não diferencia maiúsculas
+        validos: Dict[str, tuple] = {}
+        for numero, dados in lote:
+            try:
+                usuario = UsuarioSchemaCreate.model_validate(dados)
+            except ValidationError as erro:
+                self.resultados.append(
+                    _resultado(numero, dados.get("email"), "erro", erro.errors()[0]["msg"])
+                )
+                continue
+
+            if self.senhas_hash and get_cripto().identify(usuario.senha) is None:
+                self.resultados.append(
+                    _resultado(numero, usuario.email, "erro", "Hash de senha não reconhecido.")
+                )
+            elif _normalizar(usuario.email) in validos:
+                self.resultados.append(
+                    _resultado(numero, usuario.email, "conflito", "Email repetido no arquivo.")
+                )
+            else:
+                validos[_normalizar(usuario.email)] = (numero, usuario)
+
+        if not validos:
+            return
+
+        # 2. Emails já cadastrados (uma consulta por lote)
+        query = select(UsuarioModel.email).filter(func.lower(UsuarioModel.email).in_(list(validos)))
+        result = await self.session.execute(query)
+        for email in result.scalars().all():
+            # Onde o banco diferencia maiúsculas podem vir duas linhas para a mesma chave
+            encontrado = validos.pop(_normalizar(email), None)
+            if encontrado is None:
+                continue
+            numero, usuario = encontrado
+            self.resultados.append(
+                _resultado(
+                    numero, usuario.email, "conflito", "Já existe um usuário com este email cadastrado."
+                )
+            )
+
+        if not validos:
+            return
+
+        # 3. Hashes em paralelo no pool de workers
+        usuarios = list(validos.values())
+        if self.senhas_hash:
+            hashes = [usuario.senha for _, usuario in usuarios]
+        else:
+            hashes = await asyncio.gather(*(self._hash(usuario.senha) for _, usuario in usuarios))
+
+        linhas = [
+            {
+                "nome": usuario.nome,
+                "sobrenome": usuario.sobrenome,
+                "email": usuario.email,
+                "senha": hash_senha,
+                "eh_admin": usuario.eh_admin,
+            }
+            for (_, usuario), hash_senha in zip(usuarios, hashes)
+        ]
+
+        # 4. INSERT multi-linha; em caso de conflito concorrente, grava linha a linha
+        try:
+            await self.session.execute(insert(UsuarioModel).values(linhas))
+            await self.session.commit()
+            for numero, usuario in usuarios:
+                filtro_emails.adicionar(usuario.email)
+                self.resultados.append(_resultado(numero, usuario.email, "criado"))
+        except IntegrityError:
+            await self.session.rollback()
+            await self._gravar_individualmente(usuarios, linhas)
+
+    async def _hash(self, senha: str) -> str:
+        async with _vagas_hash:
+            return await gerar_hash_senha_async(senha, admissao=False)
+
+    async def _gravar_individualmente(self, usuarios: List[tuple], linhas: List[dict]) -> None:
+        for (numero, usuario), linha in zip(usuarios, linhas):
+            try:
+                await self.session.execute(insert(UsuarioModel).values(linha))
+                await self.session.commit()
+                filtro_emails.adicionar(usuario.email)
+                self.resultados.append(_resultado(numero, usuario.email, "criado"))
+            except IntegrityError:
+                await self.session.rollback()
+                self.resultados.append(
+                    _resultado(numero, usuario.email, "conflito", "Já existe um usuário com este email cadastrado.")
+                )
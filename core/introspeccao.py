@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional
+
+from jose import JWTError
+
+from core.auth import principal_stateless
+from core.cache import Principal, cache_principais
+from core.consultas import buscar_principais
+from core.database import UnidadeTrabalho
+from core.revogacao import lista_revogacao
+from core.token import codec_jwt
+
+INATIVO: Dict[str, Any] = {"active": False}
+
+
+def _verificar(token: str) -> Optional[Dict[str, Any]]:
+    try:
+        payload = codec_jwt.decodificar(token)
+    except JWTError:
+        return None
+
+    if payload.get("sub") is None or payload.get("type") != "access_token":
+        return None
+    if lista_revogacao.revogado(payload.get("jti")):
+        return None
+    return payload
+
+
+async def introspectar_tokens(tokens: List[str], unidade: UnidadeTrabalho) -> List[Dict[str, Any]]:
+    """
+    Introspecção em lote (no formato da RFC 7662): tokens repetidos são
+    verificados uma única vez e os usuários que não estão nos claims nem
+    no cache são carregados com um único WHERE id IN (...), na réplica e,
+    para os que ela ainda não tem, no writer.
+    """
+    payloads: Dict[str, Optional[Dict[str, Any]]] = {}
+    principais: Dict[int, Principal] = {}
+    pendentes = set()
+
+    for token in dict.fromkeys(tokens):
+        payload = payloads[token] = _verificar(token)
+        if payload is None:
+            continue
+
+        usuario_id = int(payload["sub"])
+        principal = principal_stateless(payload) or cache_principais.get(usuario_id)
+        if principal is None:
+            pendentes.add(usuario_id)
+        else:
+            principais.setdefault(usuario_id, principal)
+
+    sessoes = [unidade.leitura, unidade.escrita] if unidade.com_replica else [unidade.leitura]
+    for sessao in sessoes:
+        if not pendentes:
+            break
+        async with sessao as session:
+            encontrados = await buscar_principais(session, pendentes)
+        for usuario_id, principal in encontrados.items():
+            cache_principais.set(usuario_id, principal)
+            principais[usuario_id] = principal
+        pendentes -= encontrados.keys()
+
+    respostas: Dict[str, Dict[str, Any]] = {}
+    for token, payload in payloads.items():
+        principal = principais.get(int(payload["sub"])) if payload else None
+        if principal is None:
+            respostas[token] = INATIVO
+            continue
+
+        respostas[token] = {
+            "active": True,
+            "sub": payload["sub"],
+            "exp": payload.get("exp"),
+            "iat": payload.get("iat"),
+            "jti": payload.get("jti"),
+            "token_type": "access_token",
+            "usuario": principal._asdict(),
+        }
+
+    return [respostas[token] for token in tokens]
@@ -0,0 +1,241 @@
+"""
+Métricas no formato texto do Prometheus (exposition format 0.0.4).
+
+Registro mínimo e sem dependências: cada combinação de rótulos vira um
+objeto filho criado uma única vez (normalmente na importação ou na
+criação da rota) e o caminho quente só incrementa listas e floats. Não é
+thread-safe: as observações devem ser feitas a partir do event loop.
+"""
+import asyncio
+import time
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+PREFIXO = "spv_login_"
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_HASH = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+LIMITES_SQL = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+LIMITES_JWT = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica(ABC):
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> None:
+        self.nome = PREFIXO + nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._filhos: Dict[Tuple[str, ...], object] = {}
+
+    def rotulado(self, *valores: str):
+        """Filho da métrica para os valores de rótulo (criado uma vez e reaproveitado)."""
+        filho = self._filhos.get(valores)
+        if filho is None:
+            if len(valores) != len(self.rotulos):
+                raise ValueError(f"{self.nome} espera os rótulos {self.rotulos}")
+            filho = self._filhos[valores] = self._novo_filho()
+        return filho
+
+    @abstractmethod
+    def _novo_filho(self):
+        """Cria o objeto que guarda o valor de uma combinação de rótulos."""
+
+    @abstractmethod
+    def _amostras(self) -> Iterable[str]:
+        """Linhas de amostra no formato texto, uma por filho (ou série)."""
+
+    def exportar(self) -> str:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        linhas.extend(self._amostras())
+        return "\n".join(linhas)
+
+
+class _ValorContador:
+    __slots__ = ("valor",)
+
+    def __init__(self) -> None:
+        self.valor = 0.0
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        self.valor += quantidade
+
+
+class _ValorMedidor(_ValorContador):
+    __slots__ = ()
+
+    def dec(self, quantidade: float = 1.0) -> None:
+        self.valor -= quantidade
+
+    def set(self, valor: float) -> None:
+        self.valor = valor
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def _novo_filho(self) -> _ValorContador:
+        return _ValorContador()
+
+    def _amostras(self) -> Iterable[str]:
+        for valores, filho in list(self._filhos.items()):
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_numero(filho.valor)}"
+
+
+class Medidor(Contador):
+    tipo = "gauge"
+
+    def _novo_filho(self) -> _ValorMedidor:
+        return _ValorMedidor()
+
+
+class MedidorFuncao(_Metrica):
+    """Medidor calculado no momento da coleta a partir de `funcao`."""
+
+    tipo = "gauge"
+
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Sequence[str],
+        funcao: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+    ) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self.funcao = funcao
+
+    def _novo_filho(self):
+        raise TypeError(f"{self.nome} é calculado por função e não tem filhos rotulados")
+
+    def _amostras(self) -> Iterable[str]:
+        for valores, valor in self.funcao():
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_numero(valor)}"
+
+
+class _ValorHistograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Tuple[float, ...]) -> None:
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(
+        self, nome: str, ajuda: str, rotulos: Sequence[str] = (), limites: Sequence[float] = LIMITES_LATENCIA
+    ) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def _novo_filho(self) -> _ValorHistograma:
+        return _ValorHistograma(self.limites)
+
+    def _amostras(self) -> Iterable[str]:
+        for valores, filho in list(self._filhos.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), filho.contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, valores, f'le="{_numero(limite)}"')
+                yield f"{self.nome}_bucket{rotulos} {acumulado}"
+            rotulos = _formatar_rotulos(self.rotulos, valores)
+            yield f"{self.nome}_sum{rotulos} {_numero(filho.soma)}"
+            yield f"{self.nome}_count{rotulos} {filho.total}"
+
+
+class Registro:
+    def __init__(self) -> None:
+        self._metricas: Dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def exportar(self) -> str:
+        return "\n".join(m.exportar() for m in self._metricas.values()) + "\n"
+
+
+registro = Registro()
+
+# Requisições HTTP (rótulos pré-alocados por rota em core.rotas)
+REQUISICAO_SEGUNDOS: Histograma = registro.registrar(
+    Histograma("http_requisicao_segundos", "Latência das requisições por rota.", ("metodo", "rota"))
+)
+REQUISICOES: Contador = registro.registrar(
+    Contador("http_requisicoes_total", "Requisições por rota e status.", ("metodo", "rota", "status"))
+)
+EM_ANDAMENTO: Medidor = registro.registrar(
+    Medidor("http_requisicoes_em_andamento", "Requisições em andamento por rota.", ("metodo", "rota"))
+)
+
+# Caminho quente
+HASH_SEGUNDOS: Histograma = registro.registrar(
+    Histograma("hash_senha_segundos", "Tempo de execução do hash de senha no pool.", ("operacao",), LIMITES_HASH)
+)
+JWT_SEGUNDOS: Histograma = registro.registrar(
+    Histograma("jwt_segundos", "Tempo para assinar/verificar tokens JWT.", ("operacao",), LIMITES_JWT)
+)
+SQL_SEGUNDOS: Histograma = registro.registrar(
+    Histograma("sql_segundos", "Tempo de execução dos comandos SQL.", (), LIMITES_SQL)
+)
+POOL_ESPERA_SEGUNDOS: Histograma = registro.registrar(
+    Histograma("db_pool_espera_segundos", "Tempo de checkout de conexão do pool.", ("engine",), LIMITES_SQL)
+)
+LAG_EVENT_LOOP: Medidor = registro.registrar(
+    Medidor("event_loop_lag_segundos", "Atraso do event loop na última medição.")
+)
+LAG_EVENT_LOOP_MAXIMO: Medidor = registro.registrar(
+    Medidor("event_loop_lag_maximo_segundos", "Maior atraso do event loop desde o início.")
+)
+
+
+async def monitorar_event_loop(intervalo: float) -> None:
+    """
+    Mede o atraso do event loop: dorme `intervalo` segundos e compara com
+    o tempo que de fato passou. Um loop bloqueado aparece como lag alto.
+    """
+    lag = LAG_EVENT_LOOP.rotulado()
+    maximo = LAG_EVENT_LOOP_MAXIMO.rotulado()
+    while True:
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        atraso = max(0.0, time.perf_counter() - inicio - intervalo)
+        lag.set(atraso)
+        if atraso > maximo.valor:
+            maximo.set(atraso)
+
+
+def medidor_funcao(
+    nome: str, ajuda: str, rotulos: Sequence[str], funcao: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]
+) -> MedidorFuncao:
+    """Registra um medidor calculado na coleta (ex.: estatísticas dos pools)."""
+    return registro.registrar(MedidorFuncao(nome, ajuda, rotulos, funcao))
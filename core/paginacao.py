@@ -0,0 +1,41 @@
+import base64
+import json
+
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+
+def codificar_cursor(dados: Dict[str, Any]) -> str:
+    """
+    Gera um cursor opaco (base64 url-safe) a partir da posição da
+    última linha retornada.
+    """
+    bruto = json.dumps(dados, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica um cursor gerado por codificar_cursor. Cursores inválidos
+    resultam em HTTP 400.
+    """
+    if not cursor:
+        return None
+
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dados = json.loads(bruto)
+        if not isinstance(dados, dict):
+            raise ValueError(cursor)
+        return dados
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        )
+
+
+def escapar_like(valor: str) -> str:
+    """Escapa os curingas do LIKE (usar com escape="\\")."""
+    return valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
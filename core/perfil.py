@@ -0,0 +1,149 @@
+"""
+Diagnóstico em produção: profiler por amostragem de pilhas e captura do
+detalhamento de tempo das requisições lentas.
+"""
+import sys
+import threading
+import time
+
+from collections import Counter, deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from core.configs import settings
+
+_RAIZ = str(Path(__file__).resolve().parent.parent) + "/"
+
+
+def _rotulo_frame(frame) -> str:
+    codigo = frame.f_code
+    arquivo = codigo.co_filename
+    if arquivo.startswith(_RAIZ):
+        arquivo = arquivo[len(_RAIZ):]
+    else:
+        arquivo = Path(arquivo).name
+    return f"{codigo.co_name} ({arquivo}:{codigo.co_firstlineno})"
+
+
+def amostrar_pilhas(duracao: float, intervalo: float) -> str:
+    """
+    Amostra as pilhas de todas as threads (exceto a própria) a cada
+    `intervalo` segundos durante `duracao` segundos e retorna o resultado
+    no formato "collapsed" (uma pilha por linha, frames separados por ";"
+    e a contagem no fim), aceito por flamegraph.pl e speedscope.
+
+    Roda em uma thread própria: captura o event loop mesmo quando ele
+    está bloqueado.
+    """
+    propria = threading.get_ident()
+    nomes = {t.ident: t.name for t in threading.enumerate()}
+    pilhas: Counter = Counter()
+    fim = time.perf_counter() + duracao
+
+    while time.perf_counter() < fim:
+        for ident, frame in sys._current_frames().items():
+            if ident == propria:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(_rotulo_frame(frame))
+                frame = frame.f_back
+            frames.append(nomes.get(ident) or f"thread-{ident}")
+            pilhas[";".join(reversed(frames))] += 1
+        time.sleep(intervalo)
+
+    return "".join(f"{pilha} {contagem}\n" for pilha, contagem in pilhas.most_common())
+
+
+class Detalhamento:
+    """Tempo acumulado por etapa de uma requisição."""
+
+    __slots__ = ("inicio", "etapas", "contagens", "inicio_endpoint", "fim_endpoint")
+
+    def __init__(self) -> None:
+        self.inicio = time.perf_counter()
+        self.etapas: Dict[str, float] = {}
+        self.contagens: Dict[str, int] = {}
+        self.inicio_endpoint: Optional[float] = None
+        self.fim_endpoint: Optional[float] = None
+
+    def adicionar(self, etapa: str, segundos: float) -> None:
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + segundos
+        self.contagens[etapa] = self.contagens.get(etapa, 0) + 1
+
+
+# Detalhamento da requisição atual (None quando a captura está desligada)
+detalhamento_atual: ContextVar[Optional[Detalhamento]] = ContextVar(
+    "detalhamento_atual", default=None
+)
+
+
+def registrar_etapa(etapa: str, segundos: float) -> None:
+    """Soma `segundos` à etapa da requisição atual, se estiver sendo detalhada."""
+    detalhamento = detalhamento_atual.get()
+    if detalhamento is not None:
+        detalhamento.adicionar(etapa, segundos)
+
+
+class CapturaLentas:
+    """
+    Guarda, em um buffer circular, o detalhamento das requisições mais
+    lentas que `limiar_ms`: dependências (inclui leitura e validação do
+    corpo), endpoint, serialização da resposta e, dentro delas, fila e
+    execução do hash, SQL e JWT.
+    """
+
+    def __init__(self, ativo: bool, limiar_ms: float, max_itens: int) -> None:
+        self.ativo = ativo
+        self.limiar_ms = limiar_ms
+        self.requisicoes: Deque[Dict[str, Any]] = deque(maxlen=max_itens)
+
+    def iniciar(self) -> Optional[Detalhamento]:
+        return Detalhamento() if self.ativo else None
+
+    def finalizar(self, detalhamento: Detalhamento, metodo: str, rota: str, status: int) -> None:
+        fim = time.perf_counter()
+        total_ms = (fim - detalhamento.inicio) * 1000
+        if total_ms < self.limiar_ms:
+            return
+
+        etapas = {}
+        if detalhamento.inicio_endpoint is not None:
+            fim_endpoint = detalhamento.fim_endpoint or fim
+            etapas["dependencias"] = detalhamento.inicio_endpoint - detalhamento.inicio
+            etapas["endpoint"] = fim_endpoint - detalhamento.inicio_endpoint
+            etapas["serializacao"] = fim - fim_endpoint
+        etapas.update(detalhamento.etapas)
+
+        self.requisicoes.append(
+            {
+                "momento": time.time(),
+                "metodo": metodo,
+                "rota": rota,
+                "status": status,
+                "total_ms": round(total_ms, 3),
+                "etapas_ms": {nome: round(s * 1000, 3) for nome, s in etapas.items()},
+                "contagens": dict(detalhamento.contagens),
+            }
+        )
+
+    def configurar(self, ativo: Optional[bool] = None, limiar_ms: Optional[float] = None) -> None:
+        if ativo is not None:
+            self.ativo = ativo
+        if limiar_ms is not None:
+            self.limiar_ms = limiar_ms
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """Requisições capturadas, da mais recente para a mais antiga."""
+        return list(reversed(self.requisicoes))
+
+    def limpar(self) -> None:
+        self.requisicoes.clear()
+
+
+captura_lentas: CapturaLentas = CapturaLentas(
+    ativo=settings.REQUISICOES_LENTAS_ATIVO,
+    limiar_ms=settings.REQUISICOES_LENTAS_LIMIAR_MS,
+    max_itens=settings.REQUISICOES_LENTAS_MAX_ITENS,
+)
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.configs import settings
+from models.refresh_token_model import RefreshTokenModel
+from models.token_revogado_model import TokenRevogadoModel
+
+logger = logging.getLogger(__name__)
+
+
+class ListaRevogacao:
+    """
+    Lista em memória dos jti revogados (jti -> epoch de expiração).
+    A verificação por requisição é uma busca em dict; cada réplica
+    sincroniza periodicamente as linhas com id acima da marca d'água já
+    lida, menos `sobreposicao` ids: o autoincremento é atribuído no
+    INSERT e não no commit, então um id menor pode aparecer depois.
+    """
+
+    def __init__(
+        self,
+        tamanho_pagina: int = 10000,
+        intervalo_poda: int = 60,
+        sobreposicao: int = 1000,
+        intervalo_limpeza: int = 3600,
+    ) -> None:
+        self.tamanho_pagina = tamanho_pagina
+        self.intervalo_poda = intervalo_poda
+        self.sobreposicao = max(0, sobreposicao)
+        self.intervalo_limpeza = intervalo_limpeza
+        self._jtis: Dict[str, int] = {}
+        self.marca_dagua = 0
+        # O /ready espera a primeira sincronização completa
+        self.sincronizada = False
+        self._ultima_poda = time.monotonic()
+        self._ultima_limpeza: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._jtis)
+
+    def revogado(self, jti: Optional[str]) -> bool:
+        return jti in self._jtis
+
+    def adicionar(self, jti: str, expira_em: int) -> None:
+        self._jtis[jti] = expira_em
+
+    def limpar(self) -> None:
+        self._jtis.clear()
+        self.marca_dagua = 0
+        self.sincronizada = False
+
+    def podar(self) -> int:
+        """Remove da memória os jti cujos tokens já expiraram."""
+        agora = int(time.time())
+        expirados = [jti for jti, expira_em in self._jtis.items() if expira_em <= agora]
+        for jti in expirados:
+            del self._jtis[jti]
+        self._ultima_poda = time.monotonic()
+        return len(expirados)
+
+    async def sincronizar(self, session: AsyncSession) -> int:
+        """Carrega as revogações novas. Retorna quantos jti entraram na lista."""
+        novos = 0
+        inicio = max(0, self.marca_dagua - self.sobreposicao)
+        while True:
+            query = (
+                select(TokenRevogadoModel.id, TokenRevogadoModel.jti, TokenRevogadoModel.expira_em)
+                .filter(TokenRevogadoModel.id > inicio)
+                .order_by(TokenRevogadoModel.id)
+                .limit(self.tamanho_pagina)
+            )
+            linhas = (await session.execute(query)).all()
+            for id_, jti, expira_em in linhas:
+                if jti not in self._jtis:
+                    self._jtis[jti] = expira_em
+                    novos += 1
+                inicio = id_
+            self.marca_dagua = max(self.marca_dagua, inicio)
+            if len(linhas) < self.tamanho_pagina:
+                break
+
+        # Libera a conexão entre as sincronizações
+        await session.rollback()
+        self.sincronizada = True
+
+        if time.monotonic() - self._ultima_poda >= self.intervalo_poda:
+            self.podar()
+        return novos
+
+    async def remover_expirados(self, session: AsyncSession) -> int:
+        """
+        Apaga do banco as revogações de tokens que já expiraram e os
+        refresh tokens expirados ou usados. Um refresh token usado
+        reapresentado continua revogando os do usuário: o UPDATE da
+        rotação não encontra a linha. Retorna o total de linhas apagadas.
+        """
+        agora = int(time.time())
+        revogacoes = await session.execute(
+            delete(TokenRevogadoModel).where(TokenRevogadoModel.expira_em <= agora)
+        )
+        refresh = await session.execute(
+            delete(RefreshTokenModel).where(
+                or_(RefreshTokenModel.expira_em <= agora, RefreshTokenModel.usado.is_(True))
+            )
+        )
+        await session.commit()
+        self._ultima_limpeza = time.monotonic()
+        return revogacoes.rowcount + refresh.rowcount
+
+    async def executar(self, session_maker, intervalo_segundos: float) -> None:
+        """Laço de sincronização executado em background em cada réplica."""
+        while True:
+            try:
+                async with session_maker() as session:
+                    await self.sincronizar(session)
+                    if (
+                        self._ultima_limpeza is None
+                        or time.monotonic() - self._ultima_limpeza >= self.intervalo_limpeza
+                    ):
+                        await self.remover_expirados(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha ao sincronizar a lista de tokens revogados")
+            await asyncio.sleep(intervalo_segundos)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "revogados": len(self._jtis),
+            "marca_dagua": self.marca_dagua,
+            "sincronizada": self.sincronizada,
+        }
+
+
+lista_revogacao: ListaRevogacao = ListaRevogacao(
+    sobreposicao=settings.REVOGACAO_SOBREPOSICAO_IDS,
+    intervalo_limpeza=settings.REVOGACAO_LIMPEZA_INTERVALO_SEGUNDOS,
+)
+
+
+async def revogar_token(session: AsyncSession, jti: str, expira_em: Optional[int] = None) -> None:
+    """
+    Registra a revogação de um jti no banco e na lista local. Sem a
+    expiração, assume a vida máxima de um refresh token (o jti pode ser
+    de qualquer um dos dois tipos). Se o jti for de um refresh token, ele
+    também é marcado como usado, o que vale para todas as réplicas.
+    """
+    if expira_em is None:
+        expira_em = int(time.time()) + settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+
+    try:
+        await session.execute(insert(TokenRevogadoModel).values(jti=jti, expira_em=expira_em))
+        await session.commit()
+    except IntegrityError:
+        # Já revogado
+        await session.rollback()
+
+    await session.execute(
+        update(RefreshTokenModel).where(RefreshTokenModel.jti == jti).values(usado=True)
+    )
+    await session.commit()
+
+    lista_revogacao.adicionar(jti, expira_em)
+
+
+async def encerrar_sessao(session: AsyncSession, usuario_id: int, sessao: str) -> None:
+    """Marca como usados os refresh tokens de uma sessão do usuário (logout)."""
+    await session.execute(
+        update(RefreshTokenModel)
+        .where(
+            RefreshTokenModel.usuario_id == usuario_id,
+            RefreshTokenModel.sessao == sessao,
+            RefreshTokenModel.usado.is_(False),
+        )
+        .values(usado=True)
+    )
+    await session.commit()
+
+
+async def encerrar_sessoes(session: AsyncSession, usuario_id: int) -> None:
+    """Marca como usados todos os refresh tokens do usuário (logout de todos os dispositivos)."""
+    await session.execute(
+        update(RefreshTokenModel)
+        .where(RefreshTokenModel.usuario_id == usuario_id, RefreshTokenModel.usado.is_(False))
+        .values(usado=True)
+    )
+    await session.commit()
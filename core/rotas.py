@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from functools import wraps
+from typing import Any, Callable, Coroutine, Dict, List
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+from core.admissao import SobrecargaError
+from core.metricas import EM_ANDAMENTO, REQUISICAO_SEGUNDOS, REQUISICOES
+from core.perfil import captura_lentas, detalhamento_atual
+
+
+def _status_da_excecao(exc: Exception) -> int:
+    if isinstance(exc, HTTPException):
+        return exc.status_code
+    if isinstance(exc, RequestValidationError):
+        return 422
+    if isinstance(exc, SobrecargaError):
+        return 503
+    return 500
+
+
+def _marcar_endpoint(chamada: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envolve a função do endpoint para marcar, no detalhamento da
+    requisição, o fim das dependências e o início da serialização.
+    """
+    if asyncio.iscoroutinefunction(chamada):
+
+        @wraps(chamada)
+        async def chamada_marcada(*args, **kwargs):
+            detalhamento = detalhamento_atual.get()
+            if detalhamento is None:
+                return await chamada(*args, **kwargs)
+            detalhamento.inicio_endpoint = time.perf_counter()
+            try:
+                return await chamada(*args, **kwargs)
+            finally:
+                detalhamento.fim_endpoint = time.perf_counter()
+
+        return chamada_marcada
+
+    @wraps(chamada)
+    def chamada_marcada_sync(*args, **kwargs):
+        detalhamento = detalhamento_atual.get()
+        if detalhamento is None:
+            return chamada(*args, **kwargs)
+        detalhamento.inicio_endpoint = time.perf_counter()
+        try:
+            return chamada(*args, **kwargs)
+        finally:
+            detalhamento.fim_endpoint = time.perf_counter()
+
+    return chamada_marcada_sync
+
+
+class RotaMedida(APIRoute):
+    """
+    Rota que mede a latência, as requisições em andamento e o status de
+    cada requisição. Os filhos das métricas (rótulos método e rota) são
+    criados uma vez, na primeira requisição da rota: as cópias
+    intermediárias criadas pelo include_router não geram séries. Em
+    respostas em streaming a latência vai até o início do envio do corpo.
+
+    Com a captura de requisições lentas ligada (core.perfil), também
+    registra o detalhamento de tempo por etapa de cada requisição.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        self.dependant.call = _marcar_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        metodo = ",".join(sorted(self.methods or ()))
+        filhos: List = []
+        por_status: Dict[int, object] = {}
+
+        async def handler_medido(request: Request) -> Response:
+            if not filhos:
+                filhos.append(REQUISICAO_SEGUNDOS.rotulado(metodo, self.path_format))
+                filhos.append(EM_ANDAMENTO.rotulado(metodo, self.path_format))
+            latencia, em_andamento = filhos
+
+            detalhamento = captura_lentas.iniciar()
+            token = detalhamento_atual.set(detalhamento) if detalhamento is not None else None
+
+            em_andamento.inc()
+            inicio = time.perf_counter()
+            codigo = 500
+            try:
+                resposta = await handler(request)
+                codigo = resposta.status_code
+                return resposta
+            except Exception as exc:
+                codigo = _status_da_excecao(exc)
+                raise
+            finally:
+                latencia.observar(time.perf_counter() - inicio)
+                em_andamento.dec()
+                contador = por_status.get(codigo)
+                if contador is None:
+                    contador = por_status[codigo] = REQUISICOES.rotulado(
+                        metodo, self.path_format, str(codigo)
+                    )
+                contador.inc()
+
+                if token is not None:
+                    captura_lentas.finalizar(detalhamento, metodo, self.path_format, codigo)
+                    detalhamento_atual.reset(token)
+
+        return handler_medido
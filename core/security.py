@@ -1,7 +1,77 @@
-from passlib.context import CryptContext
+import asyncio
+import time
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
-CRIPTO = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from core.admissao import controle_hash, prazo_requisicao
+from core.configs import settings
+from core.metricas import HASH_SEGUNDOS
+from core.perfil import registrar_etapa
+from core.servidor import nucleos_disponiveis
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+ESQUEMAS_SUPORTADOS = ("bcrypt", "argon2", "scrypt")
+
+
+def criar_contexto(esquema: str = settings.HASH_ESQUEMA) -> "CryptContext":
+    """
+    Monta o CryptContext com o esquema configurado como padrão. Os demais
+    esquemas continuam aceitos na verificação, mas ficam obsoletos e os
+    hashes com custo diferente do configurado (min = max = padrão)
+    precisam ser refeitos (ver precisa_rehash).
+    """
+    from passlib.context import CryptContext
+
+    if esquema not in ESQUEMAS_SUPORTADOS:
+        raise ValueError(f"Esquema de hash não suportado: {esquema}")
+
+    return CryptContext(
+        schemes=[esquema] + [e for e in ESQUEMAS_SUPORTADOS if e != esquema],
+        default=esquema,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+        argon2__type="ID",
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+        scrypt__rounds=settings.SCRYPT_ROUNDS,
+        scrypt__min_rounds=settings.SCRYPT_ROUNDS,
+        scrypt__max_rounds=settings.SCRYPT_ROUNDS,
+        scrypt__block_size=settings.SCRYPT_BLOCK_SIZE,
+        scrypt__parallelism=settings.SCRYPT_PARALLELISM,
+    )
+
+
+_cripto: Optional["CryptContext"] = None
+
+
+def get_cripto() -> "CryptContext":
+    """
+    Contexto de hash configurado, criado no primeiro uso: o passlib só é
+    importado no aquecimento ou no primeiro login, fora do import da
+    aplicação (e em cada processo do pool, quando HASH_POOL_TIPO=process).
+    """
+    global _cripto
+
+    if _cripto is None:
+        _cripto = criar_contexto()
+    return _cripto
+
+
+_pool_hash: Optional[Executor] = None
+
+# Média móvel do tempo de uma verificação de senha, usada para igualar o
+# tempo de resposta dos logins recusados sem verificação
+_verificacao_media_segundos: float = 0.25
+
+_metrica_verificar = HASH_SEGUNDOS.rotulado("verificar")
+_metrica_gerar = HASH_SEGUNDOS.rotulado("gerar")
 
 
 def verificar_senha(senha: str, hash_senha: str) -> bool:
@@ -11,11 +81,110 @@ def verificar_senha(senha: str, hash_senha: str) -> bool:
     senha que estará salvo no banco de dados durante a criação
     da conta.
     """
-    return CRIPTO.verify(senha, hash_senha)
+    return get_cripto().verify(senha, hash_senha)
 
 
 def gerar_hash_senha(senha: str) -> str:
     """
     Função que gera e retorna o hash da senha
     """
-    return CRIPTO.hash(senha)
+    return get_cripto().hash(senha)
+
+
+def precisa_rehash(hash_senha: str) -> bool:
+    """
+    Indica se o hash foi gerado com esquema ou parâmetros diferentes
+    dos configurados atualmente.
+    """
+    return get_cripto().needs_update(hash_senha)
+
+
+def tamanho_pool_hash() -> int:
+    return settings.HASH_POOL_WORKERS or nucleos_disponiveis()
+
+
+def get_pool_hash() -> Executor:
+    """
+    Retorna o pool de workers usado para o bcrypt, criando-o na
+    primeira chamada conforme HASH_POOL_TIPO e HASH_POOL_WORKERS.
+    """
+    global _pool_hash
+
+    if _pool_hash is None:
+        workers = tamanho_pool_hash()
+        if settings.HASH_POOL_TIPO == "process":
+            _pool_hash = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _pool_hash = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="hash-senha"
+            )
+
+    return _pool_hash
+
+
+def encerrar_pool_hash() -> None:
+    """
+    Encerra o pool de hash (usado no shutdown da aplicação).
+    """
+    global _pool_hash
+
+    if _pool_hash is not None:
+        _pool_hash.shutdown(wait=True)
+        _pool_hash = None
+
+
+async def verificar_senha_async(senha: str, hash_senha: str) -> bool:
+    """
+    Versão assíncrona de verificar_senha: o bcrypt roda no pool de
+    workers e o event loop fica livre para atender outras requisições.
+    Passa pelo controle de admissão (pode lançar SobrecargaError).
+    """
+    global _verificacao_media_segundos
+
+    loop = asyncio.get_running_loop()
+    async with controle_hash.slot(prazo_requisicao.get()):
+        inicio = time.perf_counter()
+        valida = await loop.run_in_executor(
+            get_pool_hash(), verificar_senha, senha, hash_senha
+        )
+        duracao = time.perf_counter() - inicio
+        _metrica_verificar.observar(duracao)
+        registrar_etapa("hash", duracao)
+        _verificacao_media_segundos += 0.1 * (duracao - _verificacao_media_segundos)
+        return valida
+
+
+async def simular_verificacao() -> None:
+    """
+    Espera o tempo médio de uma verificação de senha sem gastar CPU,
+    para que logins recusados sem bcrypt não se distingam pelo tempo.
+    Ocupa uma vaga do controle de admissão como a verificação real: sob
+    carga espera a mesma fila e é recusada nos mesmos casos.
+    """
+    async with controle_hash.slot(prazo_requisicao.get()):
+        await asyncio.sleep(_verificacao_media_segundos)
+
+
+async def gerar_hash_senha_async(senha: str, admissao: bool = True) -> str:
+    """
+    Versão assíncrona de gerar_hash_senha, executada no pool de workers.
+    Com admissao=False não passa pelo controle de admissão; quem chama
+    deve limitar a própria concorrência (ex.: importação em massa).
+    """
+    if not admissao:
+        return await _gerar_hash_no_pool(senha)
+
+    async with controle_hash.slot(prazo_requisicao.get()):
+        return await _gerar_hash_no_pool(senha)
+
+
+async def _gerar_hash_no_pool(senha: str) -> str:
+    inicio = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_pool_hash(), gerar_hash_senha, senha
+        )
+    finally:
+        duracao = time.perf_counter() - inicio
+        _metrica_gerar.observar(duracao)
+        registrar_etapa("hash", duracao)
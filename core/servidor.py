@@ -0,0 +1,119 @@
+"""
+Inicialização do servidor (uvicorn) para produção e desenvolvimento.
+
+Por padrão cada pod roda um único worker e a escala é feita por réplicas:
+o /metrics, as requisições lentas, a saturação e os caches ficam em
+memória no processo, e com vários workers cada scrape ou consulta veria
+só o worker que a atendeu. Com SERVIDOR_WORKERS=0 o número de workers vem
+da cota de CPU do container (cgroup v2 ou v1), e não do número de CPUs do
+nó, que o os.cpu_count() retorna.
+"""
+import argparse
+import importlib.util
+import logging
+import math
+import os
+
+from pathlib import Path
+from typing import List, Optional
+
+from core.configs import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP = Path("/sys/fs/cgroup")
+
+
+def _cpus_da_maquina() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def cpus_disponiveis(raiz: Path = CGROUP) -> float:
+    """
+    CPUs disponíveis para o processo: a cota do cgroup (ex.: limits.cpu
+    de 1500m => 1.5) ou, sem cota, as CPUs em que o processo pode rodar.
+    """
+    maquina = _cpus_da_maquina()
+    try:
+        # cgroup v2: "<quota> <período>" ou "max <período>"
+        quota, periodo = (raiz / "cpu.max").read_text().split()
+        if quota != "max":
+            return min(maquina, int(quota) / int(periodo))
+        return float(maquina)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1: quota -1 => sem limite
+        quota = int((raiz / "cpu" / "cpu.cfs_quota_us").read_text())
+        periodo = int((raiz / "cpu" / "cpu.cfs_period_us").read_text())
+        if quota > 0 and periodo > 0:
+            return min(maquina, quota / periodo)
+    except (OSError, ValueError):
+        pass
+
+    return float(maquina)
+
+
+def nucleos_disponiveis() -> int:
+    """CPUs disponíveis arredondadas para cima (tamanho padrão dos pools de CPU)."""
+    return max(1, math.ceil(cpus_disponiveis()))
+
+
+def calcular_workers(cpus: float) -> int:
+    """SERVIDOR_WORKERS ou, se 0, um worker por CPU inteira da cota (no mínimo um)."""
+    if settings.SERVIDOR_WORKERS > 0:
+        return settings.SERVIDOR_WORKERS
+    return max(1, math.floor(cpus))
+
+
+def _disponivel(modulo: str) -> bool:
+    return importlib.util.find_spec(modulo) is not None
+
+
+def executar(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Sobe o microserviço de login.")
+    parser.add_argument("--reload", action="store_true", help="desenvolvimento: recarrega ao salvar (1 worker)")
+    parser.add_argument("--workers", type=int, help="padrão: SERVIDOR_WORKERS ou a cota de CPU")
+    parser.add_argument("--porta", type=int, default=settings.SERVIDOR_PORTA)
+    args = parser.parse_args(argv)
+
+    if args.reload:
+        uvicorn.run("main:app", host=settings.SERVIDOR_HOST, port=args.porta, log_level="info", reload=True)
+        return
+
+    cpus = cpus_disponiveis()
+    workers = args.workers or calcular_workers(cpus)
+
+    # Cada worker tem o próprio pool de hash: divide a cota entre eles
+    if workers > 1 and "HASH_POOL_WORKERS" not in os.environ:
+        os.environ["HASH_POOL_WORKERS"] = str(max(1, math.ceil(cpus / workers)))
+
+    loop = "uvloop" if _disponivel("uvloop") else "asyncio"
+    http = "httptools" if _disponivel("httptools") else "h11"
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    logger.info("Iniciando %s worker(s) (cota de %.2f CPU), loop=%s, http=%s", workers, cpus, loop, http)
+    if workers > 1:
+        logger.warning(
+            "Com %s workers, /metrics, /saturacao, as requisições lentas e os caches "
+            "são por processo: cada resposta mostra só o worker que a atendeu",
+            workers,
+        )
+
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVIDOR_HOST,
+        port=args.porta,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVIDOR_BACKLOG,
+        timeout_keep_alive=settings.SERVIDOR_KEEPALIVE_SEGUNDOS,
+        timeout_graceful_shutdown=settings.SERVIDOR_TIMEOUT_GRACEFUL_SEGUNDOS,
+        log_level="info",
+    )
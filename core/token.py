@@ -0,0 +1,220 @@
+import base64
+import hashlib
+import json
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence
+
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from core.cache import CacheTTL
+from core.configs import settings
+from core.metricas import JWT_SEGUNDOS
+from core.perfil import registrar_etapa
+
+if TYPE_CHECKING:
+    from jose.backends.base import Key
+
+
+# Membros obrigatórios de cada tipo de chave no thumbprint (RFC 7638)
+_MEMBROS_THUMBPRINT = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+_metrica_codificar = JWT_SEGUNDOS.rotulado("codificar")
+_metrica_decodificar = JWT_SEGUNDOS.rotulado("decodificar")
+
+
+def base64url_encode(dados: bytes) -> bytes:
+    return base64.urlsafe_b64encode(dados).rstrip(b"=")
+
+
+def base64url_decode(dados: bytes) -> bytes:
+    return base64.urlsafe_b64decode(dados + b"=" * (-len(dados) % 4))
+
+
+def thumbprint(chave_publica: "Key") -> str:
+    """Thumbprint RFC 7638 da chave pública, usado como kid."""
+    dados = chave_publica.to_dict()
+    membros = {m: dados[m] for m in _MEMBROS_THUMBPRINT[dados["kty"]]}
+    digest = hashlib.sha256(json.dumps(membros, separators=(",", ":"), sort_keys=True).encode())
+    return base64url_encode(digest.digest()).decode()
+
+
+def carregar_chave(valor: str) -> str:
+    """Aceita a chave em PEM ou o caminho de um arquivo PEM."""
+    if valor.lstrip().startswith("-----BEGIN"):
+        return valor
+    return Path(valor).read_text()
+
+
+class CodecJWT:
+    """
+    Codificação/decodificação de JWT com a chave e o cabeçalho já
+    preparados na inicialização (o python-jose refaz isso a cada
+    chamada) e com cache dos tokens já verificados.
+
+    Com algoritmos assimétricos (RS*/ES*) o cabeçalho leva o kid da chave
+    de assinatura e a verificação também aceita as chaves públicas
+    anteriores, o que permite rotacionar chaves com sobreposição. As
+    chaves públicas são publicadas em jwks.
+
+    Os claims devolvidos por decodificar() são compartilhados com o
+    cache e não devem ser alterados.
+    """
+
+    def __init__(
+        self,
+        segredo: str,
+        algoritmo: str,
+        cache_max_itens: int,
+        cache_ttl_segundos: int,
+        chaves_anteriores: Sequence[str] = (),
+    ) -> None:
+        self.algoritmo = algoritmo
+        # Importado aqui: os backends de criptografia do python-jose pesam
+        # no import da aplicação
+        from jose import jwk
+
+        self.simetrico = algoritmo.startswith("HS")
+        self._chave = jwk.construct(segredo, algoritmo)
+        self._chaves_verificacao: Dict[Optional[str], "Key"] = {}
+
+        dados_cabecalho = {"alg": algoritmo, "typ": "JWT"}
+        if self.simetrico:
+            self.kid = None
+            self._chaves_verificacao[None] = self._chave
+        else:
+            publica = self._chave.public_key()
+            self.kid = thumbprint(publica)
+            dados_cabecalho["kid"] = self.kid
+            self._chaves_verificacao[self.kid] = publica
+            for pem in chaves_anteriores:
+                anterior = jwk.construct(pem, algoritmo).public_key()
+                self._chaves_verificacao.setdefault(thumbprint(anterior), anterior)
+
+        cabecalho = json.dumps(dados_cabecalho, separators=(",", ":"))
+        self._cabecalho = base64url_encode(cabecalho.encode())
+        self.cache = CacheTTL(max_itens=cache_max_itens, ttl_segundos=cache_ttl_segundos)
+
+        # JWKS pré-serializado (nunca inclui segredos simétricos)
+        chaves_publicas = [
+            {**chave.to_dict(), "kid": kid, "use": "sig"}
+            for kid, chave in self._chaves_verificacao.items()
+            if not self.simetrico
+        ]
+        self.jwks_json: bytes = json.dumps({"keys": chaves_publicas}, separators=(",", ":")).encode()
+        self.jwks_etag: str = '"%s"' % hashlib.sha256(self.jwks_json).hexdigest()[:32]
+
+    def codificar(self, claims: Dict[str, Any]) -> str:
+        inicio = time.perf_counter()
+        corpo = base64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        entrada = self._cabecalho + b"." + corpo
+        assinatura = base64url_encode(self._chave.sign(entrada))
+        token = (entrada + b"." + assinatura).decode()
+        duracao = time.perf_counter() - inicio
+        _metrica_codificar.observar(duracao)
+        registrar_etapa("jwt", duracao)
+        return token
+
+    def decodificar(self, token: str) -> Dict[str, Any]:
+        """
+        Verifica a assinatura e a expiração do token e retorna os claims.
+        Lança JWTError (ou ExpiredSignatureError) se o token for inválido.
+        """
+        inicio = time.perf_counter()
+        try:
+            return self._decodificar(token)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _metrica_decodificar.observar(duracao)
+            registrar_etapa("jwt", duracao)
+
+    def _decodificar(self, token: str) -> Dict[str, Any]:
+        agora = time.time()
+
+        claims = self.cache.get(token)
+        if claims is not None:
+            if claims.get("exp", agora + 1) <= agora:
+                self.cache.invalidar(token)
+                raise ExpiredSignatureError("Signature has expired.")
+            return claims
+
+        try:
+            entrada, assinatura = token.encode().rsplit(b".", 1)
+            cabecalho, corpo = entrada.split(b".", 1)
+            dados_cabecalho = json.loads(base64url_decode(cabecalho))
+            assinatura = base64url_decode(assinatura)
+            claims = json.loads(base64url_decode(corpo))
+        except (ValueError, TypeError):
+            raise JWTError("Token mal formado.")
+
+        if not isinstance(dados_cabecalho, dict) or dados_cabecalho.get("alg") != self.algoritmo:
+            raise JWTError("Algoritmo não permitido.")
+        chave = self._chaves_verificacao.get(dados_cabecalho.get("kid"))
+        if chave is None:
+            raise JWTError("Chave de assinatura desconhecida (kid).")
+        if not chave.verify(entrada, assinatura):
+            raise JWTError("Assinatura inválida.")
+        if not isinstance(claims, dict):
+            raise JWTClaimsError("Claims inválidos.")
+
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise JWTClaimsError("Claim exp inválido.")
+            if exp <= agora:
+                raise ExpiredSignatureError("Signature has expired.")
+        nbf = claims.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf > agora:
+            raise JWTClaimsError("O token ainda não é válido (nbf).")
+
+        self.cache.set(token, claims, None if exp is None else exp - agora)
+        return claims
+
+
+def criar_codec() -> CodecJWT:
+    """Cria o codec a partir das configurações (segredo HS* ou chave PEM)."""
+    if settings.ALGORITHM.startswith("HS"):
+        segredo = settings.JWT_SECRET
+    elif settings.JWT_CHAVE_PRIVADA:
+        segredo = carregar_chave(settings.JWT_CHAVE_PRIVADA)
+    else:
+        raise ValueError(f"JWT_CHAVE_PRIVADA é obrigatória para {settings.ALGORITHM}")
+
+    return CodecJWT(
+        segredo=segredo,
+        algoritmo=settings.ALGORITHM,
+        cache_max_itens=settings.JWT_CACHE_MAX_ITENS,
+        cache_ttl_segundos=settings.JWT_CACHE_TTL_SEGUNDOS,
+        chaves_anteriores=[carregar_chave(c) for c in settings.JWT_CHAVES_ANTERIORES],
+    )
+
+
+class CodecSobDemanda:
+    """
+    Proxy do CodecJWT: cria o codec na primeira utilização (no
+    aquecimento, em main.py) e repassa a ele a leitura e a escrita dos
+    atributos. `codec` retorna o próprio CodecJWT.
+    """
+
+    __slots__ = ("_fabrica", "_codec")
+
+    def __init__(self, fabrica: Callable[[], CodecJWT]) -> None:
+        object.__setattr__(self, "_fabrica", fabrica)
+        object.__setattr__(self, "_codec", None)
+
+    @property
+    def codec(self) -> CodecJWT:
+        if self._codec is None:
+            object.__setattr__(self, "_codec", self._fabrica())
+        return self._codec
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self.codec, nome)
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        # Sem isso o atributo ficaria no proxy e o codec não o veria
+        setattr(self.codec, nome, valor)
+
+
+codec_jwt: CodecSobDemanda = CodecSobDemanda(criar_codec)
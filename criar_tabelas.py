@@ -1,25 +1,98 @@
+"""
+Cria e atualiza as tabelas do banco.
+
+Sem argumentos, não apaga nada: cria as tabelas que faltam e, nas que já
+existem, adiciona as colunas e os índices novos dos modelos (ex.:
+ultimo_login_em/total_logins/falhas_login e o índice da busca em
+usuarios). Com --recriar, apaga e recria todas as tabelas (perde os dados).
+
+Uso:
+    python criar_tabelas.py
+    python criar_tabelas.py --recriar
+
+No MySQL, o primeiro índice FULLTEXT de uma tabela grande a reconstrói
+(coluna FTS_DOC_ID): rode fora do horário de pico.
+"""
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
 from core.database import engine, Base
+from models.usuario_model import BUSCA_SQLITE, SEM_STOPWORDS_MYSQL
 
 
-async def create_tables() -> None:
-    import models.__all_models
+def atualizar_esquema(conn: Connection) -> List[str]:
+    """
+    Adiciona às tabelas existentes as colunas e os índices que faltam.
+    Retorna a descrição de cada alteração feita.
+    """
+    inspetor = inspect(conn)
+    existentes = set(inspetor.get_table_names())
+    alteracoes: List[str] = []
+
+    if conn.dialect.name == "mysql":
+        # O índice da busca é criado sem stopwords (ver models.usuario_model)
+        conn.execute(text(SEM_STOPWORDS_MYSQL))
 
-    print("Criando as tabelas no banco de dados")
+    for tabela in Base.metadata.sorted_tables:
+        if tabela.name not in existentes:
+            continue
+
+        colunas = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+        for coluna in tabela.columns:
+            if coluna.name not in colunas:
+                especificacao = CreateColumn(coluna).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {tabela.name} ADD COLUMN {especificacao}"))
+                alteracoes.append(f"coluna {tabela.name}.{coluna.name}")
+
+        indices = {indice["name"] for indice in inspetor.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in indices:
+                # Respeita o ddl_if: o FULLTEXT só é criado no MySQL
+                indice.create(conn, checkfirst=False)
+                if conn.dialect.has_index(conn, tabela.name, indice.name):
+                    alteracoes.append(f"índice {indice.name}")
+
+    if conn.dialect.name == "sqlite" and "usuarios" in existentes and "usuarios_busca" not in existentes:
+        for comando in BUSCA_SQLITE:
+            conn.execute(text(comando))
+        # Indexa os usuários que já existem
+        conn.execute(text("INSERT INTO usuarios_busca(usuarios_busca) VALUES ('rebuild')"))
+        alteracoes.append("índice usuarios_busca (FTS5)")
+
+    return alteracoes
+
+
+async def create_tables(recriar: bool = False) -> None:
+    import models.__all_models
 
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        if recriar:
+            print("Recriando as tabelas no banco de dados")
+            await conn.run_sync(Base.metadata.drop_all)
+        else:
+            print("Criando e atualizando as tabelas no banco de dados")
+            for alteracao in await conn.run_sync(atualizar_esquema):
+                print(f"  + {alteracao}")
         await conn.run_sync(Base.metadata.create_all)
     print("Tabelas criadas com sucesso...")
 
 
-async def main():
+async def main(recriar: bool = False):
     try:
-        await create_tables()
+        await create_tables(recriar)
     finally:
         await engine.dispose()
 
 
 if __name__ == "__main__":
+    import argparse
     import asyncio
 
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Cria e atualiza as tabelas do banco.")
+    parser.add_argument(
+        "--recriar", action="store_true", help="apaga e recria todas as tabelas (perde os dados)"
+    )
+    asyncio.run(main(parser.parse_args().recriar))
@@ -0,0 +1,37 @@
+"""
+Gera uma chave privada (PEM) para assinatura assimétrica dos tokens.
+
+Uso:
+    python gerar_chaves_jwt.py --algoritmo ES256 > jwt_es256.pem
+    export ALGORITHM=ES256 JWT_CHAVE_PRIVADA=./jwt_es256.pem
+
+Na rotação, a chave antiga vai para JWT_CHAVES_ANTERIORES até que os
+tokens assinados com ela expirem.
+"""
+import argparse
+
+import ecdsa
+import rsa
+
+CURVAS = {"ES256": ecdsa.NIST256p, "ES384": ecdsa.NIST384p, "ES512": ecdsa.NIST521p}
+
+
+def gerar_chave_privada(algoritmo: str, bits: int = 2048) -> str:
+    if algoritmo in CURVAS:
+        return ecdsa.SigningKey.generate(curve=CURVAS[algoritmo]).to_pem().decode()
+    if algoritmo.startswith("RS"):
+        _, privada = rsa.newkeys(bits)
+        return privada.save_pkcs1().decode()
+    raise ValueError(f"Algoritmo não suportado: {algoritmo}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algoritmo", default="ES256", choices=sorted(CURVAS) + ["RS256", "RS384", "RS512"])
+    parser.add_argument("--bits", type=int, default=2048, help="tamanho da chave RSA")
+    args = parser.parse_args()
+    print(gerar_chave_privada(args.algoritmo, args.bits), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,88 @@
-from fastapi import FastAPI, status
+import asyncio
+import logging
+
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from core.configs import settings
+from core.admissao import SobrecargaError, controle_hash
+from core.aquecimento import aquecer_ate_conseguir, prontidao
+from core.auditoria import auditoria_login
+from core.auth import aguardar_rehash
+from core.database import Session, engine, engines_leitura, estatisticas_pools
+from core.filtro_emails import filtro_emails
+from core.metricas import monitorar_event_loop, registro
+from core.rotas import RotaMedida
+from core.revogacao import lista_revogacao
+from core.security import encerrar_pool_hash
+from core.token import codec_jwt
 from api.v1.api import api_router
-import uvicorn
 
-app = FastAPI(title="Sistema de Processamento de Vídeo (Microserviço de Login)")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização e encerramento dos recursos da aplicação."""
+    # Sincronização periódica da lista de tokens revogados
+    tarefas = [
+        # Aquecimento: o /ready só fica verde quando ele terminar
+        asyncio.create_task(
+            aquecer_ate_conseguir(
+                [engine, *engines_leitura],
+                Session,
+                conexoes=min(settings.DB_POOL_AQUECIMENTO, settings.DB_POOL_SIZE),
+                intervalo=settings.AQUECIMENTO_INTERVALO_SEGUNDOS,
+            )
+        ),
+        asyncio.create_task(
+            lista_revogacao.executar(Session, settings.REVOGACAO_INTERVALO_SEGUNDOS)
+        ),
+        asyncio.create_task(monitorar_event_loop(settings.METRICAS_INTERVALO_LAG_SEGUNDOS)),
+        # Gravação em lote da auditoria de login
+        asyncio.create_task(auditoria_login.executar(Session)),
+    ]
+    # Filtro de emails: construído na primeira sincronização
+    if settings.FILTRO_EMAILS_ATIVO:
+        tarefas.append(
+            asyncio.create_task(
+                filtro_emails.executar(Session, settings.FILTRO_EMAILS_INTERVALO_SEGUNDOS)
+            )
+        )
+    yield
+    for tarefa in tarefas:
+        tarefa.cancel()
+        with suppress(asyncio.CancelledError):
+            await tarefa
+    await aguardar_rehash()
+    # Grava os eventos de login que ainda estão na fila
+    try:
+        await auditoria_login.descarregar(Session)
+    except Exception:
+        logging.getLogger(__name__).exception("Auditoria de login não gravada no shutdown")
+    # Libera o pool de workers do bcrypt
+    encerrar_pool_hash()
+
+
+app = FastAPI(
+    title="Sistema de Processamento de Vídeo (Microserviço de Login)",
+    lifespan=lifespan,
+)
+# Todas as rotas registram latência, em andamento e status em /metrics
+app.router.route_class = RotaMedida
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+
+@app.exception_handler(SobrecargaError)
+async def sobrecarga_handler(request: Request, exc: SobrecargaError) -> JSONResponse:
+    """Resposta rápida para requisições recusadas pelo controle de admissão."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.motivo},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 class HealthCheck(BaseModel):
     """Response model to validate and return when performing a health check."""
     status: str = "OK"
@@ -32,11 +108,84 @@ def get_health() -> HealthCheck:
     return HealthCheck(status="OK")
 
 
+@app.get("/ready", tags=["healthcheck"], summary="Readiness (aquecimento concluído)")
+def get_ready() -> JSONResponse:
+    """
+    Readiness probe: 503 até o fim do aquecimento (conexões do pool, hash
+    de senha, chaves JWT e consultas) e da primeira sincronização da
+    lista de tokens revogados, sem a qual um token revogado passaria. O
+    /health continua sendo o liveness probe e responde desde a subida do
+    processo.
+    """
+    pronto = prontidao.pronto and lista_revogacao.sincronizada
+    estado = prontidao.estado()
+    estado["status"] = "pronto" if pronto else "aquecendo"
+    estado["revogacao_sincronizada"] = lista_revogacao.sincronizada
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if pronto else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=estado,
+    )
+
+
+@app.get("/saturacao", tags=["healthcheck"], summary="Saturação do bcrypt")
+def get_saturacao() -> dict:
+    """
+    Sinal de saturação para o autoscaler: execuções em andamento, fila
+    de espera e tempo médio de espera do controle de admissão do bcrypt.
+    """
+    return controle_hash.estatisticas()
+
+
+@app.get("/saturacao/banco", tags=["healthcheck"], summary="Uso dos pools de conexão")
+def get_saturacao_banco() -> dict:
+    """
+    Utilização e tempo de checkout dos pools de conexão do writer e das
+    réplicas de leitura (vazio com SQLite).
+    """
+    return estatisticas_pools()
+
+
+@app.get("/saturacao/auditoria", tags=["healthcheck"], summary="Fila da auditoria de login")
+def get_saturacao_auditoria() -> dict:
+    """
+    Eventos de login aguardando gravação, descartados por fila cheia e
+    falhas de gravação da auditoria em write-behind.
+    """
+    return auditoria_login.estatisticas()
+
+
+@app.get("/metrics", tags=["healthcheck"], summary="Métricas (Prometheus)", include_in_schema=False)
+def get_metricas() -> PlainTextResponse:
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/.well-known/jwks.json", tags=["jwks"], summary="Chaves públicas (JWKS)")
+def get_jwks(request: Request) -> Response:
+    """
+    Publica as chaves públicas de verificação dos tokens (RS*/ES*), para
+    que outros serviços validem os tokens localmente. Responde 304 quando
+    o ETag informado em If-None-Match ainda é o atual.
+    """
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SEGUNDOS}",
+        "ETag": codec_jwt.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == codec_jwt.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=codec_jwt.jwks_json, media_type="application/json", headers=headers)
+
+
 def main() -> None:
-    """Entrypoint to invoke when this module is invoked on the remote server."""
+    """
+    Entrypoint to invoke when this module is invoked on the remote server.
+    Production mode by default; use `python main.py --reload` for development.
+    """
     # See the official documentations on how "0.0.0.0" makes the service available on
     # the local network - https://www.uvicorn.org/settings/#socket-binding
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, log_level='info', reload=True)
+    from core.servidor import executar
+
+    executar()
 
 if __name__ == "__main__":
     main()
@@ -1 +1,4 @@
 from models.usuario_model import UsuarioModel
+from models.refresh_token_model import RefreshTokenModel
+from models.token_revogado_model import TokenRevogadoModel
+from models.auditoria_login_model import AuditoriaLoginModel
@@ -0,0 +1,18 @@
+from sqlalchemy import Integer, String, Column, Boolean
+
+from core.database import Base
+
+
+class AuditoriaLoginModel(Base):
+    __tablename__ = "auditoria_login"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Nulo quando o email não corresponde a nenhum usuário. Sem chave
+    # estrangeira: a trilha continua depois que o usuário é removido e um
+    # usuário removido não trava a gravação do lote
+    usuario_id = Column(Integer, index=True, nullable=True)
+    email = Column(String(256), nullable=False)
+    sucesso = Column(Boolean, nullable=False)
+    ip = Column(String(45), nullable=True)
+    # Epoch (segundos) da tentativa
+    momento = Column(Integer, nullable=False, index=True)
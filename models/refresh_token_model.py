@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, String, Column, Boolean, ForeignKey
+
+from core.database import Base
+
+
+class RefreshTokenModel(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    usuario_id = Column(
+        Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    # Epoch (segundos) em que o refresh token expira; as linhas expiradas
+    # ou usadas são apagadas periodicamente (core.revogacao)
+    expira_em = Column(Integer, nullable=False, index=True)
+    usado = Column(Boolean, default=False, nullable=False)
+    # Sessão (login) a que o token pertence; mantida na rotação e usada
+    # no logout para encerrar só a sessão do dispositivo
+    sessao = Column(String(32), index=True)
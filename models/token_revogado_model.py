@@ -0,0 +1,13 @@
+from sqlalchemy import Integer, String, Column
+
+from core.database import Base
+
+
+class TokenRevogadoModel(Base):
+    __tablename__ = "tokens_revogados"
+
+    # id crescente: as réplicas sincronizam a lista a partir do último id lido
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(32), nullable=False, unique=True)
+    # Epoch (segundos) a partir do qual o token já expirou de qualquer forma
+    expira_em = Column(Integer, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Column, Boolean
+from sqlalchemy import DDL, Index, Integer, String, Column, Boolean, event, text
 from sqlalchemy.orm import relationship
 
 from core.database import Base
@@ -6,6 +6,19 @@ from core.database import Base
 
 class UsuarioModel(Base):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # Busca de usuários (core.busca) no MySQL: FULLTEXT com o parser
+        # ngram, que também encontra trechos no meio das palavras. Criado
+        # sem stopwords (ver SEM_STOPWORDS_MYSQL abaixo)
+        Index(
+            "ix_usuarios_busca",
+            "nome",
+            "sobrenome",
+            "email",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(256), nullable=True)
@@ -13,3 +26,42 @@ class UsuarioModel(Base):
     email = Column(String(256), index=True, nullable=False, unique=True)
     senha = Column(String(256), nullable=False)
     eh_admin = Column(Boolean, default=False)
+    # Atualizados em lote pela auditoria de login (core.auditoria)
+    # Epoch (segundos) do último login com sucesso
+    ultimo_login_em = Column(Integer, nullable=True)
+    total_logins = Column(Integer, default=0, server_default=text("0"), nullable=False)
+    falhas_login = Column(Integer, default=0, server_default=text("0"), nullable=False)
+
+
+# Com stopwords, o ngram descarta todo token que contém uma delas (ex.:
+# "an", "de"), e "ana" ou "andrade" não são encontrados. A variável vale
+# para os índices criados na sessão; core.busca.verificar_stopwords avisa
+# se o servidor está com elas ligadas (usadas ao recriar o índice)
+SEM_STOPWORDS_MYSQL = "SET SESSION innodb_ft_enable_stopword = OFF"
+event.listen(UsuarioModel.__table__, "before_create", DDL(SEM_STOPWORDS_MYSQL).execute_if(dialect="mysql"))
+
+# Equivalente no SQLite: índice FTS5 com tokenizer trigram (substrings de
+# 3+ caracteres) sobre a própria tabela, mantido por triggers
+_COLUNAS_BUSCA = "nome, sobrenome, email"
+_NOVOS = "new.id, new.nome, new.sobrenome, new.email"
+_ANTIGOS = "'delete', old.id, old.nome, old.sobrenome, old.email"
+
+BUSCA_SQLITE = (
+    f"CREATE VIRTUAL TABLE usuarios_busca USING fts5({_COLUNAS_BUSCA}, "
+    "content='usuarios', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER usuarios_busca_ai AFTER INSERT ON usuarios BEGIN "
+    f"INSERT INTO usuarios_busca(rowid, {_COLUNAS_BUSCA}) VALUES ({_NOVOS}); END",
+    "CREATE TRIGGER usuarios_busca_ad AFTER DELETE ON usuarios BEGIN "
+    f"INSERT INTO usuarios_busca(usuarios_busca, rowid, {_COLUNAS_BUSCA}) VALUES ({_ANTIGOS}); END",
+    f"CREATE TRIGGER usuarios_busca_au AFTER UPDATE OF {_COLUNAS_BUSCA} ON usuarios BEGIN "
+    f"INSERT INTO usuarios_busca(usuarios_busca, rowid, {_COLUNAS_BUSCA}) VALUES ({_ANTIGOS}); "
+    f"INSERT INTO usuarios_busca(rowid, {_COLUNAS_BUSCA}) VALUES ({_NOVOS}); END",
+)
+for _comando in BUSCA_SQLITE:
+    event.listen(UsuarioModel.__table__, "after_create", DDL(_comando).execute_if(dialect="sqlite"))
+
+event.listen(
+    UsuarioModel.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS usuarios_busca").execute_if(dialect="sqlite"),
+)
@@ -1,141 +1,257 @@
+"""
+Gera e grava usuários sintéticos determinísticos para desenvolvimento,
+testes de carga e reprodução de planos de consulta.
+
+Exemplos:
+    # 10 usuários (padrão) no banco configurado em core.configs
+    python popular_usuarios.py
+
+    # 1M de usuários em SQLite, reaproveitando 16 hashes (modo rápido)
+    python popular_usuarios.py -n 1000000 --rapido --criar-tabelas \\
+        --db-url sqlite+aiosqlite:///./bench.db
+
+    # Gera uma fixture pronta (hashes já calculados) e recarrega depois
+    python popular_usuarios.py -n 1000000 --rapido --exportar usuarios.ndjson.gz
+    python popular_usuarios.py --importar usuarios.ndjson.gz --criar-tabelas
+
+A senha do usuário de índice i é "senha{i}" (ou "senha{i % hashes}" no
+modo rápido). O mesmo --semente gera sempre os mesmos usuários.
+"""
+import argparse
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
+import gzip
+import json
+import os
+import random
+import re
+import time
+import unicodedata
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
 
-from core.database import Session, engine
+from core.database import Base, engine
 from core.security import gerar_hash_senha
 from models.usuario_model import UsuarioModel
 
-# Lista de usuários para popular o banco
-usuarios_exemplo = [
-    {
-        "nome": "João",
-        "sobrenome": "Silva",
-        "email": "joao.silva@exemplo.com",
-        "senha": "senha123",
-        "eh_admin": True
-    },
-    {
-        "nome": "Maria",
-        "sobrenome": "Santos",
-        "email": "maria.santos@exemplo.com",
-        "senha": "senha456",
-        "eh_admin": False
-    },
-    {
-        "nome": "Pedro",
-        "sobrenome": "Oliveira",
-        "email": "pedro.oliveira@exemplo.com",
-        "senha": "senha789",
-        "eh_admin": False
-    },
-    {
-        "nome": "Ana",
-        "sobrenome": "Costa",
-        "email": "ana.costa@exemplo.com",
-        "senha": "senha101",
-        "eh_admin": True
-    },
-    {
-        "nome": "Carlos",
-        "sobrenome": "Pereira",
-        "email": "carlos.pereira@exemplo.com",
-        "senha": "senha202",
-        "eh_admin": False
-    },
-    {
-        "nome": "Lucia",
-        "sobrenome": "Ferreira",
-        "email": "lucia.ferreira@exemplo.com",
-        "senha": "senha303",
-        "eh_admin": False
-    },
-    {
-        "nome": "Roberto",
-        "sobrenome": "Almeida",
-        "email": "roberto.almeida@exemplo.com",
-        "senha": "senha404",
-        "eh_admin": False
-    },
-    {
-        "nome": "Fernanda",
-        "sobrenome": "Lima",
-        "email": "fernanda.lima@exemplo.com",
-        "senha": "senha505",
-        "eh_admin": True
-    },
-    {
-        "nome": "Ricardo",
-        "sobrenome": "Gomes",
-        "email": "ricardo.gomes@exemplo.com",
-        "senha": "senha606",
-        "eh_admin": False
-    },
-    {
-        "nome": "Patricia",
-        "sobrenome": "Ribeiro",
-        "email": "patricia.ribeiro@exemplo.com",
-        "senha": "senha707",
-        "eh_admin": False
-    }
+NOMES = [
+    "João", "Maria", "Pedro", "Ana", "Carlos", "Lucia", "Roberto", "Fernanda",
+    "Ricardo", "Patricia", "Bruno", "Juliana", "Marcos", "Camila", "Rafael",
+    "Beatriz", "Gustavo", "Larissa", "Felipe", "Aline",
 ]
 
-async def popular_usuarios():
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Costa", "Pereira", "Ferreira", "Almeida",
+    "Lima", "Gomes", "Ribeiro", "Carvalho", "Rodrigues", "Martins", "Rocha",
+    "Souza", "Barbosa", "Araujo", "Melo", "Cardoso", "Teixeira",
+]
+
+
+def _sem_acentos(texto: str) -> str:
+    normalizado = unicodedata.normalize("NFKD", texto)
+    return normalizado.encode("ascii", "ignore").decode().lower()
+
+
+def gerar_usuarios(
+    quantidade: int,
+    semente: int,
+    hashes_distintos: int = 0,
+    proporcao_admin: float = 0.05,
+    inicio: int = 0,
+) -> Iterator[Dict]:
+    """
+    Gera `quantidade` usuários determinísticos (senha em texto puro).
+    Com `hashes_distintos` > 0 as senhas se repetem a cada N usuários.
+    A numeração dos emails começa em `inicio`, para não repetir os
+    emails de uma execução anterior.
+    """
+    rng = random.Random(semente)
+    for i in range(inicio, inicio + quantidade):
+        nome = rng.choice(NOMES)
+        sobrenome = rng.choice(SOBRENOMES)
+        indice_senha = i % hashes_distintos if hashes_distintos else i
+        yield {
+            "nome": nome,
+            "sobrenome": sobrenome,
+            "email": f"{_sem_acentos(nome)}.{_sem_acentos(sobrenome)}.{i}@exemplo.com",
+            "senha": f"senha{indice_senha}",
+            "eh_admin": rng.random() < proporcao_admin,
+        }
+
+
+# Sufixo numérico dos emails gerados por gerar_usuarios
+_EMAIL_GERADO = re.compile(r"\.(\d+)@exemplo\.com$")
+
+
+async def proximo_indice(session: AsyncSession) -> int:
+    """
+    Primeiro índice livre para gerar_usuarios: um a mais que o maior
+    índice entre os emails gerados que já estão no banco. Não depende
+    da contagem de linhas, que diminui quando há usuários apagados.
+    """
+    maior = -1
+    query = select(UsuarioModel.email).filter(UsuarioModel.email.like("%@exemplo.com"))
+    async for email in await session.stream_scalars(query.execution_options(yield_per=10000)):
+        if encontrado := _EMAIL_GERADO.search(email):
+            maior = max(maior, int(encontrado.group(1)))
+    return maior + 1
+
+
+def _em_lotes(itens: Iterable[Dict], tamanho: int) -> Iterator[List[Dict]]:
+    iterador = iter(itens)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def com_hashes(
+    usuarios: Iterable[Dict], pool: ProcessPoolExecutor, processos: int, lote: int, rapido: bool
+) -> Iterator[Dict]:
+    """
+    Substitui a senha em texto puro pelo hash bcrypt, distribuindo o
+    cálculo entre os processos do pool. No modo rápido cada senha
+    distinta é hasheada uma única vez.
+    """
+    cache: Dict[str, str] = {}
+
+    for usuarios_lote in _em_lotes(usuarios, lote):
+        pendentes = sorted({u["senha"] for u in usuarios_lote} - cache.keys())
+        if pendentes:
+            chunksize = max(1, len(pendentes) // (processos * 4))
+            cache.update(zip(pendentes, pool.map(gerar_hash_senha, pendentes, chunksize=chunksize)))
+
+        for usuario in usuarios_lote:
+            yield {**usuario, "senha": cache[usuario["senha"]]}
+
+        if not rapido:
+            cache.clear()
+
+
+async def inserir_em_lotes(
+    session_maker: sessionmaker, usuarios: Iterable[Dict], lote: int = 5000
+) -> int:
+    """Grava os usuários (senha já em hash) com INSERTs em lote."""
+    total = 0
+    async with session_maker() as session:
+        for usuarios_lote in _em_lotes(usuarios, lote):
+            await session.execute(insert(UsuarioModel), usuarios_lote)
+            await session.commit()
+            total += len(usuarios_lote)
+            print(f"\r{total} usuários gravados...", end="", flush=True)
+    print()
+    return total
+
+
+def _abrir(caminho: str, modo: str):
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, modo + "t", encoding="utf-8")
+    return open(caminho, modo, encoding="utf-8")
+
+
+def exportar_fixture(caminho: str, usuarios: Iterable[Dict]) -> int:
+    """
+    Grava uma fixture NDJSON (gzip se terminar em .gz) com as senhas
+    já em hash. O formato é o mesmo aceito por POST /usuarios/importar
+    com senhas_hash=true.
+    """
+    total = 0
+    with _abrir(caminho, "w") as arquivo:
+        for usuario in usuarios:
+            arquivo.write(json.dumps(usuario, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def ler_fixture(caminho: str) -> Iterator[Dict]:
+    with _abrir(caminho, "r") as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+async def popular(args: argparse.Namespace) -> None:
+    inicio = time.perf_counter()
+
+    processos = args.processos or os.cpu_count() or 1
+
+    if args.exportar:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            usuarios = gerar_usuarios(
+                args.quantidade, args.semente, args.hashes if args.rapido else 0
+            )
+            total = exportar_fixture(
+                args.exportar, com_hashes(usuarios, pool, processos, args.lote, args.rapido)
+            )
+        print(f"✅ {total} usuários exportados para {args.exportar} em {time.perf_counter() - inicio:.1f}s")
+        return
+
+    db_engine = create_async_engine(args.db_url) if args.db_url else engine
+    session_maker = sessionmaker(
+        class_=AsyncSession, bind=db_engine, expire_on_commit=False, autoflush=False
+    )
+
     try:
-        session = Session()
-        async with session as db:
-            # Verificar se já existem usuários
-            query = select(UsuarioModel)
-            result = await db.execute(query)
-            usuarios_existentes = result.scalars().unique().all()
-            
-            if usuarios_existentes:
-                print(f"Já existem {len(usuarios_existentes)} usuários no banco.")
-                print("Deseja continuar mesmo assim? (s/n): ", end="")
-                resposta = input().lower()
-                if resposta != 's':
-                    print("Operação cancelada.")
-                    return
-            
-            print("Iniciando população do banco de dados...")
-            
-            for i, dados_usuario in enumerate(usuarios_exemplo, 1):
-                # Criar hash da senha
-                senha_hash = gerar_hash_senha(dados_usuario["senha"])
-                
-                # Criar usuário
-                novo_usuario = UsuarioModel(
-                    nome=dados_usuario["nome"],
-                    sobrenome=dados_usuario["sobrenome"],
-                    email=dados_usuario["email"],
-                    senha=senha_hash,
-                    eh_admin=dados_usuario["eh_admin"]
+        if args.criar_tabelas:
+            import models.__all_models  # noqa: F401
+
+            async with db_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        async with session_maker() as session:
+            existentes = await session.scalar(select(func.count()).select_from(UsuarioModel))
+            if existentes:
+                print(f"Já existem {existentes} usuários no banco.")
+            if not args.importar and args.inicio is None:
+                args.inicio = await proximo_indice(session)
+
+        if args.importar:
+            total = await inserir_em_lotes(session_maker, ler_fixture(args.importar), args.lote)
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as pool:
+                # Continua a numeração depois do maior índice já gravado
+                usuarios = gerar_usuarios(
+                    args.quantidade, args.semente, args.hashes if args.rapido else 0, inicio=args.inicio
                 )
-                
-                db.add(novo_usuario)
-                print(f"Usuário {i}: {dados_usuario['nome']} {dados_usuario['sobrenome']} - {dados_usuario['email']}")
-            
-            await db.commit()
-            print(f"\n✅ {len(usuarios_exemplo)} usuários criados com sucesso!")
-            print("\nCredenciais para teste:")
-            print("=" * 50)
-            for dados in usuarios_exemplo:
-                print(f"Email: {dados['email']}")
-                print(f"Senha: {dados['senha']}")
-                print(f"Admin: {'Sim' if dados['eh_admin'] else 'Não'}")
-                print("-" * 30)
-                
-    except Exception as e:
-        print(f"❌ Erro ao popular usuários: {e}")
-        if 'db' in locals():
-            await db.rollback()
-
-async def main():
-    try:
-        await popular_usuarios()
+                total = await inserir_em_lotes(
+                    session_maker, com_hashes(usuarios, pool, processos, args.lote, args.rapido), args.lote
+                )
+
+        print(f"✅ {total} usuários criados em {time.perf_counter() - inicio:.1f}s")
     finally:
-        await engine.dispose()
+        await db_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-n", "--quantidade", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument(
+        "--rapido", action="store_true",
+        help="reaproveita um pequeno conjunto de hashes (ver --hashes)",
+    )
+    parser.add_argument("--hashes", type=int, default=16, help="senhas distintas no modo rápido")
+    parser.add_argument("--processos", type=int, default=0, help="0 => todos os núcleos")
+    parser.add_argument("--lote", type=int, default=5000, help="linhas por INSERT em lote")
+    parser.add_argument(
+        "--inicio", type=int,
+        help="primeiro índice dos emails (padrão: depois do maior já gravado)",
+    )
+    parser.add_argument("--db-url", help="URL do banco (padrão: core.configs)")
+    parser.add_argument("--criar-tabelas", action="store_true")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--exportar", metavar="ARQUIVO", help="grava uma fixture em vez do banco")
+    grupo.add_argument("--importar", metavar="ARQUIVO", help="carrega uma fixture no banco")
+    args = parser.parse_args(argv)
+
+    asyncio.run(popular(args))
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    main()
@@ -0,0 +1,8 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class CapturaLentasSchema(BaseModel):
+    ativo: Optional[bool] = None
+    limiar_ms: Optional[float] = Field(None, ge=0)
@@ -1,7 +1,9 @@
 from typing import Optional
 from typing import List
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
+
+from core.configs import settings
 
 
 class UsuarioSchemaBase(BaseModel):
@@ -25,3 +27,16 @@ class UsuarioSchemaUp(UsuarioSchemaBase):
     email: Optional[EmailStr]
     senha: Optional[str]
     eh_admin: Optional[bool]
+
+
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
+
+
+class RevogacaoSchema(BaseModel):
+    # Tamanho da coluna tokens_revogados.jti
+    jti: str = Field(..., min_length=1, max_length=32)
+
+
+class IntrospeccaoSchema(BaseModel):
+    tokens: List[str] = Field(min_length=1, max_length=settings.INTROSPECCAO_MAX_TOKENS)
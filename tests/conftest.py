@@ -16,6 +16,12 @@ from sqlalchemy.pool import StaticPool
 
 from main import app
 from core.database import Base
+from core.auditoria import auditoria_login
+from core.cache import cache_principais
+from core.filtro_emails import filtro_emails
+from core.perfil import captura_lentas
+from core.revogacao import lista_revogacao
+from core.token import codec_jwt
 from tests.override_dependencies import override_dependencies
 
 # Configuração do banco de dados de teste
@@ -47,6 +53,13 @@ async def setup_database(engine: AsyncEngine):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
+    cache_principais.limpar()
+    codec_jwt.cache.limpar()
+    lista_revogacao.limpar()
+    auditoria_login.limpar()
+    filtro_emails.desativar()
+    captura_lentas.configurar(ativo=False)
+    captura_lentas.limpar()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
@@ -94,4 +107,15 @@ def usuario_teste() -> dict:
         "email": "teste@example.com",
         "senha": "senha123",
         "eh_admin": False
-    } 
\ No newline at end of file
+    } 
+
+@pytest.fixture
+async def headers_admin(client: AsyncClient, usuario_teste: dict) -> dict:
+    """Headers de autenticação de um administrador (admin@example.com)"""
+    admin = {**usuario_teste, "email": "admin@example.com", "eh_admin": True}
+    await client.post("/api/v1/usuarios/signup", json=admin)
+    login = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": admin["email"], "password": admin["senha"]},
+    )
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
@@ -2,14 +2,15 @@ from typing import AsyncGenerator, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from main import app
-from core.deps import get_session
+from core.database import UnidadeTrabalho
+from core.deps import get_unidade_trabalho
 
-def get_test_session(session: AsyncSession) -> Callable:
-    """Sobrescreve a dependência de sessão do banco de dados para os testes"""
-    async def override_session() -> AsyncGenerator[AsyncSession, None]:
-        yield session
-    return override_session
+def get_test_unidade(session: AsyncSession) -> Callable:
+    """Sobrescreve a unidade de trabalho para usar a sessão dos testes"""
+    async def override_unidade() -> AsyncGenerator[UnidadeTrabalho, None]:
+        yield UnidadeTrabalho(lambda: session)
+    return override_unidade
 
 def override_dependencies(session: AsyncSession) -> None:
     """Configura as dependências para os testes"""
-    app.dependency_overrides[get_session] = get_test_session(session) 
\ No newline at end of file
+    app.dependency_overrides[get_unidade_trabalho] = get_test_unidade(session)
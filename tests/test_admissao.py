@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from core import security
+from core.admissao import ControleAdmissao, SobrecargaError
+from core.security import simular_verificacao
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_fila_limitada_recusa_excedente():
+    controle = ControleAdmissao(max_concorrentes=1, max_fila=1, espera_maxima_segundos=5, retry_after=1)
+    liberar = asyncio.Event()
+
+    async def _ocupar():
+        async with controle.slot():
+            await liberar.wait()
+
+    primeiro = asyncio.create_task(_ocupar())
+    await asyncio.sleep(0)
+    segundo = asyncio.create_task(_ocupar())
+    await asyncio.sleep(0)
+    assert (controle.em_execucao, controle.na_fila) == (1, 1)
+
+    with pytest.raises(SobrecargaError):
+        async with controle.slot():
+            pass
+
+    liberar.set()
+    await asyncio.gather(primeiro, segundo)
+    assert controle.estatisticas()["rejeitados"] == 1
+    assert controle.estatisticas()["admitidos"] == 2
+
+
+async def test_espera_limitada_pelo_prazo():
+    controle = ControleAdmissao(max_concorrentes=1, max_fila=10, espera_maxima_segundos=5, retry_after=1)
+    async with controle.slot():
+        inicio = time.perf_counter()
+        with pytest.raises(SobrecargaError):
+            async with controle.slot(prazo=time.time() + 0.05):
+                pass
+        assert time.perf_counter() - inicio < 1
+
+
+async def test_simulacao_espera_a_fila_da_verificacao(monkeypatch):
+    controle = ControleAdmissao(max_concorrentes=1, max_fila=1, espera_maxima_segundos=5, retry_after=1)
+    monkeypatch.setattr(security, "controle_hash", controle)
+    monkeypatch.setattr(security, "_verificacao_media_segundos", 0.01)
+    liberar = asyncio.Event()
+
+    async def _ocupar():
+        async with controle.slot():
+            await liberar.wait()
+
+    ocupante = asyncio.create_task(_ocupar())
+    await asyncio.sleep(0)
+
+    # Com uma vaga livre na fila, espera a verificação em andamento
+    inicio = time.perf_counter()
+    simulacao = asyncio.create_task(simular_verificacao())
+    await asyncio.sleep(0)
+    assert controle.na_fila == 1
+
+    # Com a fila cheia, é recusada como uma verificação real
+    with pytest.raises(SobrecargaError):
+        await simular_verificacao()
+
+    await asyncio.sleep(0.1)
+    liberar.set()
+    await asyncio.gather(ocupante, simulacao)
+    assert time.perf_counter() - inicio >= 0.1
+    assert controle.estatisticas()["admitidos"] == 2
+
+
+async def test_login_com_prazo_expirado(client: AsyncClient, usuario_teste: dict):
+    login_data = {"username": usuario_teste["email"], "password": usuario_teste["senha"]}
+    response = await client.post(
+        "/api/v1/usuarios/login",
+        data=login_data,
+        headers={"X-Request-Deadline": str(time.time() - 1)},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    response = await client.get("/saturacao")
+    assert response.status_code == 200
+    assert response.json()["rejeitados"] >= 1
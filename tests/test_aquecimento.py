@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from core.aquecimento import Prontidao, _abrir_conexoes, aquecer, aquecer_ate_conseguir, prontidao
+from core.revogacao import lista_revogacao
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_aquecer_executa_todas_as_etapas(engine: AsyncEngine, async_session_maker):
+    estado = Prontidao()
+    await aquecer([engine], async_session_maker, conexoes=1, estado=estado)
+
+    assert estado.pronto
+    assert set(estado.etapas_ms) == {"jwt", "conexoes", "hash", "consultas"}
+    assert estado.estado()["status"] == "pronto"
+
+
+async def test_aquecer_repete_ate_conseguir(engine: AsyncEngine, async_session_maker, tmp_path):
+    # Banco inexistente na primeira tentativa
+    indisponivel = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'nao' / 'existe.db'}")
+    engines = [indisponivel]
+    estado = Prontidao()
+
+    async def _trocar_engine(_):
+        assert not estado.pronto
+        assert estado.erro
+        engines[0] = engine
+
+    with patch("core.aquecimento.asyncio.sleep", _trocar_engine):
+        await aquecer_ate_conseguir(engines, async_session_maker, 1, intervalo=0, estado=estado)
+
+    await indisponivel.dispose()
+    assert estado.pronto
+    assert estado.tentativas == 2
+    assert estado.erro is None
+
+
+async def test_abrir_conexoes_fecha_as_abertas_quando_uma_falha():
+    fechadas = []
+
+    class _Conexao:
+        async def execute(self, _):
+            pass
+
+        async def close(self):
+            fechadas.append(self)
+
+    class _Engine:
+        tentativas = 0
+
+        async def connect(self):
+            self.tentativas += 1
+            if self.tentativas == 2:
+                raise ConnectionError("pool esgotado")
+            return _Conexao()
+
+    with pytest.raises(ConnectionError):
+        await _abrir_conexoes(_Engine(), 3)
+    assert len(fechadas) == 2
+
+
+async def test_ready_so_responde_depois_do_aquecimento(client: AsyncClient, db_session):
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "aquecendo"
+
+    # O liveness não depende do aquecimento
+    assert (await client.get("/health")).status_code == 200
+
+    prontidao.pronto = True
+    try:
+        # Aquecido, mas sem a lista de tokens revogados
+        response = await client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["revogacao_sincronizada"] is False
+
+        await lista_revogacao.sincronizar(db_session)
+        response = await client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "pronto"
+    finally:
+        prontidao.pronto = False
@@ -0,0 +1,185 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.future import select
+
+from core.auditoria import AuditoriaLogin, auditoria_login
+from models.auditoria_login_model import AuditoriaLoginModel
+from models.usuario_model import UsuarioModel
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _criar_usuarios(db_session, quantidade: int) -> list:
+    result = await db_session.execute(
+        insert(UsuarioModel).returning(UsuarioModel.id),
+        [
+            {"nome": "N", "sobrenome": "S", "email": f"u{i}@example.com", "senha": "x"}
+            for i in range(quantidade)
+        ],
+    )
+    ids = list(result.scalars())
+    await db_session.commit()
+    return ids
+
+
+async def test_descarregar_agrupa_logins_por_usuario(
+    engine: AsyncEngine, async_session_maker, db_session
+):
+    a, b = await _criar_usuarios(db_session, 2)
+    auditoria = AuditoriaLogin(capacidade=100, tamanho_lote=100, intervalo=60)
+    auditoria.registrar("u0@example.com", True, usuario_id=a, ip="10.0.0.1", momento=1000)
+    auditoria.registrar("u0@example.com", False, usuario_id=a, momento=1001)
+    auditoria.registrar("u0@example.com", True, usuario_id=a, momento=1002)
+    auditoria.registrar("u1@example.com", False, usuario_id=b, momento=1003)
+    auditoria.registrar("ninguem@example.com", False, momento=1004)
+
+    comandos = []
+
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement.split()[0].upper())
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _contar)
+    try:
+        assert await auditoria.descarregar(async_session_maker) == 5
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _contar)
+
+    # Um INSERT multi-linha da trilha e um único UPDATE para os dois usuários
+    assert comandos.count("INSERT") == 1
+    assert comandos.count("UPDATE") == 1
+
+    linhas = (
+        await db_session.execute(
+            select(
+                UsuarioModel.id, UsuarioModel.total_logins, UsuarioModel.falhas_login, UsuarioModel.ultimo_login_em
+            ).order_by(UsuarioModel.id)
+        )
+    ).all()
+    assert [tuple(linha) for linha in linhas] == [(a, 2, 1, 1002), (b, 0, 1, None)]
+
+    trilha = (await db_session.execute(select(AuditoriaLoginModel).order_by(AuditoriaLoginModel.id))).scalars().all()
+    assert [(t.usuario_id, t.sucesso, t.momento) for t in trilha] == [
+        (a, True, 1000), (a, False, 1001), (a, True, 1002), (b, False, 1003), (None, False, 1004)
+    ]
+    assert trilha[0].ip == "10.0.0.1"
+    assert len(auditoria) == 0
+    assert auditoria.estatisticas()["gravados"] == 5
+
+
+async def test_fila_cheia_segue_a_politica_de_excesso():
+    novos = AuditoriaLogin(capacidade=2, tamanho_lote=10, intervalo=60, excesso="descartar_novos")
+    antigos = AuditoriaLogin(capacidade=2, tamanho_lote=10, intervalo=60, excesso="descartar_antigos")
+    for i in range(3):
+        novos.registrar(f"{i}@example.com", True, momento=i + 1)
+        antigos.registrar(f"{i}@example.com", True, momento=i + 1)
+
+    assert [e["email"] for e in novos._eventos] == ["0@example.com", "1@example.com"]
+    assert [e["email"] for e in antigos._eventos] == ["1@example.com", "2@example.com"]
+    assert novos.estatisticas()["descartados"] == antigos.estatisticas()["descartados"] == 1
+
+    with pytest.raises(ValueError):
+        AuditoriaLogin(capacidade=2, tamanho_lote=10, intervalo=60, excesso="bloquear")
+
+
+async def test_falha_na_gravacao_devolve_o_lote(async_session_maker, db_session):
+    (a,) = await _criar_usuarios(db_session, 1)
+    auditoria = AuditoriaLogin(capacidade=100, tamanho_lote=100, intervalo=60)
+    auditoria.registrar("u0@example.com", True, usuario_id=a, momento=1000)
+
+    def _indisponivel():
+        raise ConnectionError("banco indisponível")
+
+    with pytest.raises(ConnectionError):
+        await auditoria.descarregar(_indisponivel)
+    assert len(auditoria) == 1
+    assert auditoria.estatisticas()["falhas"] == 1
+
+    auditoria.registrar("u0@example.com", True, usuario_id=a, momento=1001)
+    assert await auditoria.descarregar(async_session_maker) == 2
+
+    total, ultimo = (
+        await db_session.execute(select(UsuarioModel.total_logins, UsuarioModel.ultimo_login_em))
+    ).one()
+    assert (total, ultimo) == (2, 1001)
+
+
+async def test_registrar_corta_email_e_ip_no_tamanho_das_colunas():
+    auditoria = AuditoriaLogin(capacidade=10, tamanho_lote=10, intervalo=60)
+    auditoria.registrar("a" * 300 + "@example.com", False, ip="f" * 60)
+
+    (evento,) = auditoria._eventos
+    assert len(evento["email"]) == 256
+    assert len(evento["ip"]) == 45
+
+
+async def test_lote_que_sempre_falha_vai_para_os_rejeitados(async_session_maker, db_session):
+    (a,) = await _criar_usuarios(db_session, 1)
+    auditoria = AuditoriaLogin(capacidade=100, tamanho_lote=100, intervalo=60, max_tentativas=2)
+    auditoria.registrar("u0@example.com", True, usuario_id=a, momento=1000)
+    # sucesso nulo viola o NOT NULL e derruba o INSERT do lote
+    auditoria.registrar("ruim@example.com", None, momento=1000)
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            await auditoria.descarregar(async_session_maker)
+        assert len(auditoria) == 2
+
+    assert await auditoria.descarregar(async_session_maker) == 1
+    assert len(auditoria) == 0
+    assert [e["email"] for e in auditoria.rejeitados] == ["ruim@example.com"]
+    assert auditoria.estatisticas()["rejeitados"] == 1
+
+    emails = (await db_session.execute(select(AuditoriaLoginModel.email))).scalars().all()
+    assert emails == ["u0@example.com"]
+    total = await db_session.scalar(select(UsuarioModel.total_logins))
+    assert total == 1
+
+
+async def test_lote_cheio_dispara_a_gravacao(async_session_maker):
+    auditoria = AuditoriaLogin(capacidade=100, tamanho_lote=2, intervalo=60)
+    tarefa = asyncio.create_task(auditoria.executar(async_session_maker))
+    try:
+        auditoria.registrar("a@example.com", False)
+        auditoria.registrar("b@example.com", False)
+        for _ in range(100):
+            if auditoria.lotes:
+                break
+            await asyncio.sleep(0.01)
+        assert auditoria.lotes == 1
+        assert auditoria.gravados == 2
+    finally:
+        tarefa.cancel()
+
+
+async def test_login_registra_tentativas_sem_gravar_na_resposta(
+    client: AsyncClient, usuario_teste: dict, db_session
+):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    ok = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    falha = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": "errada"},
+    )
+    assert ok.status_code == 200
+    assert falha.status_code == 400
+
+    # Nada gravado ainda: os eventos estão na fila do write-behind
+    assert (await db_session.execute(select(AuditoriaLoginModel))).first() is None
+    assert [e["sucesso"] for e in auditoria_login._eventos] == [True, False]
+    assert auditoria_login._eventos[0]["ip"] == "127.0.0.1"
+
+    response = await client.get("/saturacao/auditoria")
+    assert response.json()["na_fila"] == 2
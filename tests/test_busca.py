@@ -0,0 +1,144 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_mock_engine, delete, insert, update
+from sqlalchemy.dialects import mysql
+
+from core.busca import _montar_consulta, termos_da_busca
+from models.usuario_model import UsuarioModel
+
+pytestmark = pytest.mark.asyncio
+
+USUARIOS = [
+    ("Mariana", "Souza", "mari@example.com"),
+    ("Ana", "Silva", "ana.silva@example.com"),
+    ("Joana", "Anastacio", "joana@example.com"),
+    ("Pedro", "Costa", "ana@example.com"),
+    ("Carlos", "Lima", "carlos@example.com"),
+]
+
+
+@pytest.fixture
+async def headers_busca(headers_admin: dict, db_session) -> dict:
+    """Headers do administrador, com os USUARIOS gravados depois dele."""
+    await db_session.execute(
+        insert(UsuarioModel),
+        [{"nome": n, "sobrenome": s, "email": e, "senha": "x"} for n, s, e in USUARIOS],
+    )
+    await db_session.commit()
+    return headers_admin
+
+
+async def _buscar(client: AsyncClient, headers: dict, **params):
+    return await client.get("/api/v1/usuarios/busca", params=params, headers=headers)
+
+
+async def test_busca_por_prefixo_e_trecho_ordenada(client: AsyncClient, headers_busca: dict):
+    response = await _buscar(client, headers_busca, q="ana")
+    assert response.status_code == 200
+    emails = [u["email"] for u in response.json()]
+    # Colunas que começam com o termo antes dos trechos no meio (Mariana)
+    assert set(emails[:3]) == {"ana@example.com", "ana.silva@example.com", "joana@example.com"}
+    assert emails[3:] == ["mari@example.com"]
+    assert "senha" not in response.json()[0]
+
+    # Email exato em primeiro
+    response = await _buscar(client, headers_busca, q="ana@example.com")
+    assert [u["email"] for u in response.json()] == ["ana@example.com", "joana@example.com"]
+
+
+async def test_busca_exige_todos_os_termos(client: AsyncClient, headers_busca: dict):
+    response = await _buscar(client, headers_busca, q="SILVA ana")
+    assert [u["email"] for u in response.json()] == ["ana.silva@example.com"]
+
+    # Termos curtos filtram os candidatos do índice
+    response = await _buscar(client, headers_busca, q="ana pe")
+    assert [u["email"] for u in response.json()] == ["ana@example.com"]
+
+    response = await _buscar(client, headers_busca, q="an pe")
+    assert response.status_code == 400
+
+
+async def test_busca_paginada(client: AsyncClient, headers_busca: dict):
+    vistos = []
+    params = {"q": "ana", "limite": 2}
+    while True:
+        response = await _buscar(client, headers_busca, **params)
+        vistos += [u["email"] for u in response.json()]
+        cursor = response.headers.get("X-Proximo-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    assert len(vistos) == len(set(vistos)) == 4
+
+    with patch("api.v1.endpoints.usuario.settings.BUSCA_MAX_RESULTADOS", 3):
+        response = await _buscar(client, headers_busca, q="ana", limite=2, cursor=params["cursor"])
+        assert len(response.json()) == 1
+        assert "X-Proximo-Cursor" not in response.headers
+
+
+async def test_indice_acompanha_alteracoes(client: AsyncClient, headers_busca: dict, db_session):
+    await db_session.execute(
+        update(UsuarioModel).where(UsuarioModel.email == "carlos@example.com").values(nome="Cassiano")
+    )
+    await db_session.execute(delete(UsuarioModel).where(UsuarioModel.email == "mari@example.com"))
+    await db_session.commit()
+
+    response = await _buscar(client, headers_busca, q="ssia")
+    assert [u["email"] for u in response.json()] == ["carlos@example.com"]
+    response = await _buscar(client, headers_busca, q="ana")
+    assert "mari@example.com" not in [u["email"] for u in response.json()]
+
+
+async def test_busca_interrompida_no_tempo_limite(client: AsyncClient, headers_busca: dict):
+    with patch("api.v1.endpoints.usuario.settings.BUSCA_TEMPO_LIMITE_MS", 0), patch(
+        "core.busca._SQLITE_PASSOS_VERIFICACAO", 1
+    ):
+        response = await _buscar(client, headers_busca, q="ana")
+    assert response.status_code == 503
+
+    # A sessão continua utilizável depois da interrupção
+    assert (await _buscar(client, headers_busca, q="ana")).status_code == 200
+
+
+async def test_busca_exige_admin(client: AsyncClient):
+    assert (await client.get("/api/v1/usuarios/busca", params={"q": "ana"})).status_code == 401
+
+
+async def test_consulta_mysql_usa_fulltext_e_tempo_limite():
+    sql = str(
+        _montar_consulta("mysql", "ana silva", ["ana", "silva"], 250).compile(dialect=mysql.dialect())
+    )
+    assert "/*+ MAX_EXECUTION_TIME(250) */" in sql
+    assert "MATCH (usuarios.nome, usuarios.sobrenome, usuarios.email) AGAINST" in sql
+    assert "IN BOOLEAN MODE" in sql
+
+
+async def test_aspas_saem_dos_termos():
+    assert termos_da_busca('"ana" sil"va') == ["ana", "sil", "va"]
+
+    sql = str(
+        _montar_consulta("mysql", 'ana"', ['ana"'], 250).compile(
+            dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert "'+\"ana\"'" in sql
+
+
+async def test_indice_mysql_criado_sem_stopwords():
+    comandos = []
+    engine = create_mock_engine(
+        "mysql+pymysql://", lambda sql, *args, **kwargs: comandos.append(str(sql.compile(dialect=engine.dialect)))
+    )
+    UsuarioModel.__table__.create(engine)
+
+    desligar = next(i for i, c in enumerate(comandos) if "innodb_ft_enable_stopword = OFF" in c)
+    indice = next(i for i, c in enumerate(comandos) if "CREATE FULLTEXT INDEX ix_usuarios_busca" in c)
+    assert desligar < indice
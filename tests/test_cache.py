@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from core.cache import CacheTTL, cache_principais
+from models.usuario_model import UsuarioModel
+
+
+def test_cache_ttl_eviction_por_tamanho():
+    cache = CacheTTL(max_itens=2, ttl_segundos=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.estatisticas()["evictions"] == 1
+
+
+def test_cache_ttl_expiracao(monkeypatch):
+    cache = CacheTTL(max_itens=10, ttl_segundos=5)
+    cache.set("x", 1)
+    agora = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: agora + 10)
+
+    assert cache.get("x") is None
+    assert cache.estatisticas()["expirados"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_usa_cache_e_invalida(
+    client: AsyncClient, usuario_teste: dict, db_session
+):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    await client.get("/api/v1/usuarios/logado", headers=headers)
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.status_code == 200
+    assert cache_principais.hits >= 1
+
+    # Alterar o usuário via ORM invalida a entrada do cache
+    result = await db_session.execute(select(UsuarioModel))
+    usuario = result.scalars().one()
+    usuario.nome = "Alterado"
+    await db_session.commit()
+
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.json()["nome"] == "Alterado"
+
+
+@pytest.mark.asyncio
+async def test_update_em_lote_limpa_o_cache(db_session):
+    cache_principais.set(1, "principal")
+
+    # Contadores (preserva_principal) não mexem no cache
+    await db_session.execute(
+        update(UsuarioModel).values(total_logins=1).execution_options(preserva_principal=True)
+    )
+    assert cache_principais.get(1) == "principal"
+
+    await db_session.execute(update(UsuarioModel).values(eh_admin=True))
+    assert cache_principais.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_estatisticas_cache_apenas_admin(client: AsyncClient, usuario_teste: dict):
+    for eh_admin, email in ((False, "comum@example.com"), (True, "admin@example.com")):
+        dados = {**usuario_teste, "email": email, "eh_admin": eh_admin}
+        await client.post("/api/v1/usuarios/signup", json=dados)
+
+    async def _headers(email: str) -> dict:
+        login = await client.post(
+            "/api/v1/usuarios/login",
+            data={"username": email, "password": usuario_teste["senha"]},
+        )
+        return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = await client.get("/api/v1/usuarios/cache", headers=await _headers("comum@example.com"))
+    assert response.status_code == 403
+
+    response = await client.get("/api/v1/usuarios/cache", headers=await _headers("admin@example.com"))
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= response.json().keys()
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import event, insert
+
+from core.cache import Principal
+from core.consultas import buscar_credencial, buscar_principais, buscar_principal
+from models.usuario_model import UsuarioModel
+
+
+async def _inserir(db_session, quantidade: int) -> None:
+    await db_session.execute(
+        insert(UsuarioModel),
+        [
+            {
+                "nome": f"Nome{i}",
+                "sobrenome": f"Sobrenome{i}",
+                "email": f"usuario{i}@example.com",
+                "senha": f"hash{i}",
+                "eh_admin": i == 0,
+            }
+            for i in range(quantidade)
+        ],
+    )
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_consultas_projetadas_nao_usam_identity_map(db_session, engine):
+    await _inserir(db_session, 3)
+
+    sqls = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        sqls.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _registrar)
+    try:
+        credencial = await buscar_credencial(db_session, "usuario0@example.com")
+        principal = await buscar_principal(db_session, credencial.id)
+        principais = await buscar_principais(db_session, [1, 2, 99])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _registrar)
+
+    assert credencial.senha == "hash0"
+    assert credencial.principal == principal
+    assert principal == Principal(1, "Nome0", "Sobrenome0", "usuario0@example.com", True)
+    assert sorted(principais) == [1, 2]
+    assert principais[2].eh_admin is False
+
+    # Só a consulta do login lê o hash da senha
+    assert "senha" in sqls[0]
+    assert all("senha" not in sql for sql in sqls[1:])
+    assert len(db_session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_consultas_projetadas_sem_resultado(db_session):
+    assert await buscar_credencial(db_session, "ninguem@example.com") is None
+    assert await buscar_principal(db_session, 42) is None
+    assert await buscar_principais(db_session, [42]) == {}
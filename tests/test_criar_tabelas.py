@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.database import Base
+from criar_tabelas import atualizar_esquema
+
+pytestmark = pytest.mark.asyncio
+
+# Esquema anterior à auditoria de login e à busca
+ESQUEMA_ANTIGO = (
+    "CREATE TABLE usuarios (id INTEGER PRIMARY KEY AUTOINCREMENT, nome VARCHAR(256), "
+    "sobrenome VARCHAR(256), email VARCHAR(256) NOT NULL UNIQUE, senha VARCHAR(256) NOT NULL, "
+    "eh_admin BOOLEAN)",
+    "CREATE TABLE refresh_tokens (jti VARCHAR(32) PRIMARY KEY, usuario_id INTEGER NOT NULL "
+    "REFERENCES usuarios (id) ON DELETE CASCADE, expira_em INTEGER NOT NULL, usado BOOLEAN NOT NULL)",
+    "INSERT INTO usuarios (nome, sobrenome, email, senha, eh_admin) "
+    "VALUES ('Mariana', 'Souza', 'mari@example.com', 'x', 0)",
+)
+
+
+async def test_atualizar_esquema_adiciona_colunas_e_indices_sem_apagar_dados(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'antigo.db'}")
+    try:
+        async with engine.begin() as conn:
+            for comando in ESQUEMA_ANTIGO:
+                await conn.execute(text(comando))
+
+            alteracoes = await conn.run_sync(atualizar_esquema)
+            await conn.run_sync(Base.metadata.create_all)
+
+            assert "coluna usuarios.total_logins" in alteracoes
+            assert "coluna refresh_tokens.sessao" in alteracoes
+            assert "índice ix_refresh_tokens_expira_em" in alteracoes
+            assert "índice usuarios_busca (FTS5)" in alteracoes
+
+            colunas = await conn.run_sync(
+                lambda c: {coluna["name"] for coluna in inspect(c).get_columns("usuarios")}
+            )
+            assert {"ultimo_login_em", "total_logins", "falhas_login"} <= colunas
+            assert await conn.run_sync(lambda c: inspect(c).has_table("auditoria_login"))
+
+            # O usuário que já existia continua lá e entra no índice da busca
+            linha = (
+                await conn.execute(
+                    text(
+                        "SELECT u.email, u.total_logins FROM usuarios_busca "
+                        "JOIN usuarios u ON u.id = usuarios_busca.rowid WHERE usuarios_busca MATCH 'rian'"
+                    )
+                )
+            ).one()
+            assert tuple(linha) == ("mari@example.com", 0)
+
+            # Sem nada a fazer na segunda execução
+            assert await conn.run_sync(atualizar_esquema) == []
+    finally:
+        await engine.dispose()
@@ -0,0 +1,201 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from core.auth import autenticar, criar_token_acesso
+from core.cache import cache_principais
+from core.database import Base, PoolMedido, UnidadeTrabalho
+from core.deps import get_current_user, get_unidade_trabalho
+from core.introspeccao import introspectar_tokens
+from core.security import gerar_hash_senha
+from main import app
+from models.usuario_model import UsuarioModel
+
+
+@pytest.mark.asyncio
+async def test_pool_medido_registra_checkouts_e_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=PoolMedido,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            estatisticas = engine.pool.estatisticas()
+            assert estatisticas["em_uso"] == 1
+            assert estatisticas["utilizacao"] == 1.0
+
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        estatisticas = engine.pool.estatisticas()
+        assert estatisticas["checkouts"] == 2
+        assert estatisticas["timeouts"] == 1
+        assert estatisticas["em_uso"] == 0
+        assert estatisticas["espera_maxima_ms"] >= 40
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_autenticar_confirma_no_writer_quando_replica_atrasada(db_session, usuario_teste):
+    await db_session.execute(
+        insert(UsuarioModel).values(
+            nome=usuario_teste["nome"],
+            sobrenome=usuario_teste["sobrenome"],
+            email=usuario_teste["email"],
+            senha=gerar_hash_senha(usuario_teste["senha"]),
+            eh_admin=False,
+        )
+    )
+    await db_session.commit()
+
+    # Réplica vazia: o cadastro ainda não foi replicado
+    replica = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    try:
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        usuario = await autenticar(
+            usuario_teste["email"],
+            usuario_teste["senha"],
+            db=AsyncSession(replica),
+            db_escrita=db_session,
+        )
+        assert usuario is not None
+        assert usuario.email == usuario_teste["email"]
+
+        assert await autenticar(
+            usuario_teste["email"], usuario_teste["senha"], db=AsyncSession(replica)
+        ) is None
+    finally:
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_principal_fora_da_replica_vem_do_writer(db_session):
+    usuario = UsuarioModel(nome="Novo", sobrenome="Usuario", email="novo@example.com", senha="x")
+    db_session.add(usuario)
+    await db_session.commit()
+
+    # Réplica vazia: o cadastro ainda não foi replicado
+    replica = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    try:
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        unidade = UnidadeTrabalho(lambda: db_session, lambda: AsyncSession(replica))
+        assert unidade.com_replica
+
+        principal = await get_current_user(unidade, {"sub": str(usuario.id), "type": "access_token"})
+        assert principal.email == "novo@example.com"
+
+        cache_principais.limpar()
+        token = criar_token_acesso(sub=str(usuario.id))
+        (resultado,) = await introspectar_tokens([token], unidade)
+        assert resultado["active"] is True
+        assert resultado["usuario"]["email"] == "novo@example.com"
+    finally:
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unidade_trabalho_cria_sessoes_sob_demanda(async_session_maker):
+    unidade = UnidadeTrabalho(async_session_maker)
+    assert unidade.sessoes_abertas == 0
+
+    # Sem réplicas a leitura usa a sessão de escrita
+    assert unidade.leitura is unidade.escrita
+    assert unidade.sessoes_abertas == 1
+    await unidade.fechar()
+    assert unidade.sessoes_abertas == 0
+
+    unidade = UnidadeTrabalho(async_session_maker, async_session_maker)
+    assert unidade.leitura is not unidade.escrita
+    assert unidade.sessoes_abertas == 2
+    await unidade.fechar()
+
+    # Sessão avulsa (ex.: StreamingResponse): não conta nem é fechada pela unidade
+    avulsa = unidade.nova_sessao_leitura()
+    assert unidade.sessoes_abertas == 0
+    await avulsa.close()
+
+
+@pytest.mark.asyncio
+async def test_requisicao_autenticada_ocupa_uma_conexao(tmp_path, usuario_teste):
+    # Pool de uma conexão: duas conexões simultâneas na mesma requisição
+    # estourariam o timeout
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}",
+        poolclass=PoolMedido,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    sessoes = []
+
+    def _nova_sessao() -> AsyncSession:
+        sessoes.append(AsyncSession(engine, expire_on_commit=False))
+        return sessoes[-1]
+
+    async def override_unidade():
+        unidade = UnidadeTrabalho(_nova_sessao)
+        try:
+            yield unidade
+        finally:
+            await unidade.fechar()
+
+    app.dependency_overrides[get_unidade_trabalho] = override_unidade
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        admin = {**usuario_teste, "eh_admin": True}
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            assert (await ac.post("/api/v1/usuarios/signup", json=admin)).status_code == 201
+            login = await ac.post(
+                "/api/v1/usuarios/login",
+                data={"username": admin["email"], "password": admin["senha"]},
+            )
+            assert login.status_code == 200
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            # Principal fora do cache: leitura e escrita na mesma sessão
+            cache_principais.limpar()
+            sessoes.clear()
+            response = await ac.post(
+                "/api/v1/usuarios/revogar", json={"jti": "x" * 32}, headers=headers
+            )
+            assert response.status_code == 204
+            assert len(sessoes) == 1
+
+            # Principal em cache e sem SQL: nenhuma sessão é criada
+            sessoes.clear()
+            assert (await ac.get("/api/v1/usuarios/logado", headers=headers)).status_code == 200
+            assert sessoes == []
+
+        estatisticas = engine.pool.estatisticas()
+        assert estatisticas["timeouts"] == 0
+        assert estatisticas["em_uso"] == 0
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
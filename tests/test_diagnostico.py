@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_perfil_retorna_pilhas_collapsed(client: AsyncClient, headers_admin: dict):
+    response = await client.get(
+        "/api/v1/diagnostico/perfil",
+        params={"segundos": 0.2, "intervalo_ms": 5},
+        headers=headers_admin,
+    )
+    assert response.status_code == 200
+    linhas = response.text.splitlines()
+    assert linhas
+    pilha, contagem = linhas[0].rsplit(" ", 1)
+    assert int(contagem) > 0
+    # O event loop (MainThread) aparece esperando a amostragem terminar
+    assert any(linha.startswith("MainThread;") for linha in linhas)
+
+
+async def test_perfil_exige_admin(client: AsyncClient):
+    response = await client.get("/api/v1/diagnostico/perfil")
+    assert response.status_code == 401
+
+
+async def test_captura_requisicoes_lentas(client: AsyncClient, usuario_teste: dict, headers_admin: dict):
+    response = await client.get("/api/v1/diagnostico/lentas", headers=headers_admin)
+    assert response.json() == {"ativo": False, "limiar_ms": 500, "requisicoes": []}
+
+    response = await client.put(
+        "/api/v1/diagnostico/lentas", json={"ativo": True, "limiar_ms": 0}, headers=headers_admin
+    )
+    assert response.json()["ativo"] is True
+
+    await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": "admin@example.com", "password": usuario_teste["senha"]},
+    )
+
+    response = await client.get("/api/v1/diagnostico/lentas", headers=headers_admin)
+    capturadas = response.json()["requisicoes"]
+    login = next(r for r in capturadas if r["rota"] == "/api/v1/usuarios/login")
+    assert login["status"] == 200
+    for etapa in ("dependencias", "endpoint", "serializacao", "hash", "fila_hash", "sql", "jwt"):
+        assert etapa in login["etapas_ms"]
+    assert login["etapas_ms"]["hash"] <= login["total_ms"]
+    assert login["contagens"]["sql"] >= 1
+
+    response = await client.delete("/api/v1/diagnostico/lentas", headers=headers_admin)
+    assert response.status_code == 204
+    response = await client.get("/api/v1/diagnostico/lentas", headers=headers_admin)
+    # Só a própria consulta anterior (DELETE) ficou registrada
+    assert [r["metodo"] for r in response.json()["requisicoes"]] == ["DELETE"]
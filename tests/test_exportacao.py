@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import gzip
+import json
+
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_exportar_ndjson_e_csv(client: AsyncClient, usuario_teste: dict, headers_admin: dict):
+    await client.post(
+        "/api/v1/usuarios/signup", json={**usuario_teste, "email": "comum@example.com"}
+    )
+
+    response = await client.get(
+        "/api/v1/usuarios/exportar",
+        headers={**headers_admin, "Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [linha["email"] for linha in linhas] == ["admin@example.com", "comum@example.com"]
+    assert all("senha" not in linha for linha in linhas)
+
+    async with client.stream(
+        "GET",
+        "/api/v1/usuarios/exportar",
+        params={"formato": "csv"},
+        headers={**headers_admin, "Accept-Encoding": "gzip"},
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        bruto = b"".join([pedaco async for pedaco in response.aiter_raw()])
+    linhas = gzip.decompress(bruto).decode().splitlines()
+    assert linhas[0] == "id,nome,sobrenome,email,eh_admin"
+    assert len(linhas) == 3
+
+
+async def test_exportar_exige_admin(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    response = await client.get(
+        "/api/v1/usuarios/exportar",
+        headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+    )
+    assert response.status_code == 403
@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from core.admissao import controle_hash
+from core.filtro_emails import FiltroBloom, filtro_emails
+
+
+def test_bloom_sem_falsos_negativos_e_taxa_fp():
+    filtro = FiltroBloom(capacidade=10000, taxa_fp=0.01)
+    for i in range(10000):
+        filtro.adicionar(f"usuario{i}@example.com")
+
+    assert all(f"usuario{i}@example.com" in filtro for i in range(10000))
+    falsos_positivos = sum(f"outro{i}@example.com" in filtro for i in range(10000))
+    assert falsos_positivos / 10000 < 0.02
+    assert filtro.estatisticas()["memoria_bytes"] < 10000 * 1.3
+
+
+@pytest.mark.asyncio
+async def test_login_de_email_inexistente_sob_carga_nao_consulta_banco(
+    client: AsyncClient, usuario_teste: dict, db_session, engine
+):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    await filtro_emails.construir(db_session)
+    assert filtro_emails.pode_existir(usuario_teste["email"].upper())
+
+    consultas = []
+
+    def _contar(conn, cursor, statement, *args):
+        consultas.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _contar)
+    try:
+        with patch.object(controle_hash, "na_fila", 1):
+            response = await client.post(
+                "/api/v1/usuarios/login",
+                data={"username": "naoexiste@example.com", "password": "x"},
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _contar)
+
+    assert response.status_code == 400
+    assert consultas == []
+    assert filtro_emails.descartes == 1
+
+    # Signup atualiza o filtro; duplicado é recusado antes do bcrypt
+    novo = {**usuario_teste, "email": "novo@example.com"}
+    assert (await client.post("/api/v1/usuarios/signup", json=novo)).status_code == 201
+    assert filtro_emails.pode_existir("novo@example.com")
+    response = await client.post("/api/v1/usuarios/signup", json=novo)
+    assert response.status_code == 406
+    # A conferência do signup não conta como descarte de login
+    assert filtro_emails.descartes == 1
+
+
+@pytest.mark.asyncio
+async def test_login_confirma_no_banco_email_ausente_do_filtro(
+    client: AsyncClient, usuario_teste: dict, db_session
+):
+    # Filtro sem o cadastro, feito "em outra réplica"
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    await filtro_emails.construir(db_session)
+    filtro_emails._filtro = FiltroBloom(filtro_emails.capacidade, filtro_emails.taxa_fp)
+    assert not filtro_emails.pode_existir(usuario_teste["email"])
+
+    response = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    assert response.status_code == 200
+    assert filtro_emails.falsos_negativos == 1
+    assert filtro_emails.descartes == 0
+    assert filtro_emails.pode_existir(usuario_teste["email"])
+
+
+@pytest.mark.asyncio
+async def test_sincronizacao_incremental(client: AsyncClient, usuario_teste: dict, db_session):
+    await filtro_emails.construir(db_session)
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+
+    # Simula o usuário criado em outra réplica
+    filtro_emails.desativar()
+    await filtro_emails.construir(db_session)
+    marca = filtro_emails.marca_dagua
+    await client.post("/api/v1/usuarios/signup", json={**usuario_teste, "email": "outro@example.com"})
+    assert await filtro_emails.sincronizar(db_session) == 1
+    assert filtro_emails.marca_dagua > marca
+
+
+@pytest.mark.asyncio
+async def test_reconstrucao_periodica(client: AsyncClient, usuario_teste: dict, db_session):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    await filtro_emails.construir(db_session)
+
+    # Linha commitada abaixo da marca d'água: a sincronização incremental não a vê
+    filtro_emails._filtro = FiltroBloom(filtro_emails.capacidade, filtro_emails.taxa_fp)
+    assert await filtro_emails.sincronizar(db_session) == 0
+    assert not filtro_emails.pode_existir(usuario_teste["email"])
+
+    with patch.object(filtro_emails, "reconstrucao_segundos", 0):
+        await filtro_emails.sincronizar(db_session)
+    assert filtro_emails.pode_existir(usuario_teste["email"])
@@ -0,0 +1,133 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from core.admissao import controle_hash
+from core.importacao import ImportadorUsuarios
+from core.security import gerar_hash_senha
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_importar_ndjson(client: AsyncClient, usuario_teste: dict, headers_admin: dict):
+    linhas = [
+        {**usuario_teste, "email": "novo1@example.com"},
+        {**usuario_teste, "email": "admin@example.com"},
+        {**usuario_teste, "email": "novo1@example.com"},
+        {**usuario_teste, "email": "invalido"},
+        {**usuario_teste, "email": "novo2@example.com"},
+    ]
+    corpo = "\n".join(json.dumps(linha) for linha in linhas) + "\nnao-e-json\n"
+
+    response = await client.post(
+        "/api/v1/usuarios/importar",
+        params={"tamanho_lote": 2},
+        content=corpo,
+        headers={**headers_admin, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["criados"], data["conflitos"], data["erros"]) == (2, 2, 2)
+    assert [r["status"] for r in data["resultados"]] == [
+        "criado", "conflito", "conflito", "erro", "criado", "erro"
+    ]
+
+    # Os usuários importados conseguem fazer login
+    response = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": "novo2@example.com", "password": usuario_teste["senha"]},
+    )
+    assert response.status_code == 200
+
+
+async def test_importar_email_existente_com_outras_maiusculas(
+    client: AsyncClient, usuario_teste: dict, headers_admin: dict
+):
+    linhas = [
+        {**usuario_teste, "email": "Admin@Example.com"},
+        {**usuario_teste, "email": "novo@example.com"},
+        {**usuario_teste, "email": "NOVO@example.com"},
+    ]
+    response = await client.post(
+        "/api/v1/usuarios/importar",
+        content="\n".join(json.dumps(linha) for linha in linhas),
+        headers={**headers_admin, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["criados"], data["conflitos"], data["erros"]) == (1, 2, 0)
+    assert [(r["email"], r["status"]) for r in data["resultados"]] == [
+        ("Admin@example.com", "conflito"),
+        ("novo@example.com", "criado"),
+        ("NOVO@example.com", "conflito"),
+    ]
+
+
+async def test_importar_csv_com_hash(client: AsyncClient, headers_admin: dict):
+    hash_senha = gerar_hash_senha("segredo")
+    corpo = (
+        "nome,sobrenome,email,senha,eh_admin\n"
+        f"Ana,Costa,ana@example.com,{hash_senha},false\n"
+        "Bia,Lima,bia@example.com,nao-e-hash,false\n"
+    )
+    response = await client.post(
+        "/api/v1/usuarios/importar",
+        params={"senhas_hash": True},
+        content=corpo,
+        headers={**headers_admin, "Content-Type": "text/csv"},
+    )
+    data = response.json()
+    assert (data["criados"], data["erros"]) == (1, 1)
+
+    response = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": "ana@example.com", "password": "segredo"},
+    )
+    assert response.status_code == 200
+
+
+async def test_importacoes_simultaneas_dividem_as_vagas_do_hash():
+    limite = max(1, controle_hash.max_concorrentes // 2)
+    em_execucao, maximo = 0, 0
+
+    async def _hash_lento(senha: str, admissao: bool = True) -> str:
+        nonlocal em_execucao, maximo
+        em_execucao += 1
+        maximo = max(maximo, em_execucao)
+        await asyncio.sleep(0.01)
+        em_execucao -= 1
+        return senha
+
+    importadores = [ImportadorUsuarios(None, tamanho_lote=10) for _ in range(2)]
+    with patch("core.importacao.gerar_hash_senha_async", _hash_lento):
+        await asyncio.gather(*(imp._hash("x") for imp in importadores for _ in range(limite * 2)))
+
+    assert maximo == limite
+
+
+async def test_importar_exige_admin(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    response = await client.post(
+        "/api/v1/usuarios/importar",
+        content="{}",
+        headers={
+            "Authorization": f"Bearer {login.json()['access_token']}",
+            "Content-Type": "application/x-ndjson",
+        },
+    )
+    assert response.status_code == 403
+
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from core.auth import criar_token_acesso, criar_token_refresh
+from core.cache import cache_principais
+from core.configs import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def headers_gateway(monkeypatch):
+    monkeypatch.setattr(settings, "INTROSPECCAO_SEGREDO", "segredo-do-gateway")
+    return {"X-Gateway-Segredo": "segredo-do-gateway"}
+
+
+async def test_introspeccao_em_lote(client: AsyncClient, usuario_teste: dict, engine, headers_gateway):
+    for i in range(3):
+        await client.post("/api/v1/usuarios/signup", json={**usuario_teste, "email": f"u{i}@example.com"})
+
+    tokens = [criar_token_acesso(sub=str(i)) for i in (1, 2, 3)]
+    token_refresh, _, _ = criar_token_refresh(sub="1")
+    lote = [tokens[0], tokens[1], tokens[0], "invalido", token_refresh, criar_token_acesso(sub="99"), tokens[2]]
+
+    consultas = []
+
+    def _contar(conn, cursor, statement, *args):
+        consultas.append(statement)
+
+    cache_principais.limpar()
+    event.listen(engine.sync_engine, "before_cursor_execute", _contar)
+    try:
+        response = await client.post("/api/v1/usuarios/introspeccao", json={"tokens": lote}, headers=headers_gateway)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _contar)
+
+    assert response.status_code == 200
+    resultados = response.json()["resultados"]
+    assert [r["active"] for r in resultados] == [True, True, True, False, False, False, True]
+    assert resultados[0] == resultados[2]
+    assert resultados[1]["usuario"]["email"] == "u1@example.com"
+
+    # Todos os usuários em uma única consulta
+    assert len(consultas) == 1
+    assert " IN " in consultas[0]
+
+
+async def test_introspeccao_limite_de_tokens(client: AsyncClient, headers_gateway):
+    response = await client.post("/api/v1/usuarios/introspeccao", json={"tokens": []}, headers=headers_gateway)
+    assert response.status_code == 422
+
+
+async def test_introspeccao_exige_o_segredo_do_gateway(client: AsyncClient, headers_gateway):
+    corpo = {"tokens": [criar_token_acesso(sub="1")]}
+
+    response = await client.post("/api/v1/usuarios/introspeccao", json=corpo)
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/api/v1/usuarios/introspeccao", json=corpo, headers={"X-Gateway-Segredo": "outro"}
+    )
+    assert response.status_code == 401
+
+
+async def test_introspeccao_sem_segredo_configurado_recusa_tudo(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/usuarios/introspeccao", json={"tokens": ["x"]}, headers={"X-Gateway-Segredo": ""}
+    )
+    assert response.status_code == 401
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from httpx import AsyncClient
+
+from core.metricas import Histograma, Registro
+
+
+def test_histograma_formato_prometheus():
+    registro = Registro()
+    histograma = registro.registrar(Histograma("teste_segundos", "Ajuda.", ("rota",), (0.1, 1.0)))
+    filho = histograma.rotulado("/x")
+    assert histograma.rotulado("/x") is filho
+
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        filho.observar(valor)
+
+    linhas = registro.exportar().splitlines()
+    assert linhas[:2] == [
+        "# HELP spv_login_teste_segundos Ajuda.",
+        "# TYPE spv_login_teste_segundos histogram",
+    ]
+    assert 'spv_login_teste_segundos_bucket{rota="/x",le="0.1"} 2' in linhas
+    assert 'spv_login_teste_segundos_bucket{rota="/x",le="1.0"} 3' in linhas
+    assert 'spv_login_teste_segundos_bucket{rota="/x",le="+Inf"} 4' in linhas
+    assert 'spv_login_teste_segundos_count{rota="/x"} 4' in linhas
+
+    with pytest.raises(ValueError):
+        histograma.rotulado()
+
+
+@pytest.mark.asyncio
+async def test_metrics_instrumenta_rotas_hash_jwt_e_sql(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+    )
+    token = login.json()["access_token"]
+    await client.get("/api/v1/usuarios/logado", headers={"Authorization": f"Bearer {token}"})
+    await client.get("/api/v1/usuarios/logado")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    texto = response.text
+
+    assert 'spv_login_http_requisicoes_total{metodo="GET",rota="/api/v1/usuarios/logado",status="401"}' in texto
+    assert 'spv_login_http_requisicoes_total{metodo="POST",rota="/api/v1/usuarios/login",status="200"}' in texto
+    assert 'spv_login_http_requisicoes_em_andamento{metodo="GET",rota="/metrics"} 1.0' in texto
+    # Só as rotas completas geram séries
+    assert 'rota="/logado"' not in texto
+    for serie in (
+        'spv_login_hash_senha_segundos_count{operacao="verificar"}',
+        'spv_login_hash_senha_segundos_count{operacao="gerar"}',
+        'spv_login_jwt_segundos_count{operacao="codificar"}',
+        'spv_login_jwt_segundos_count{operacao="decodificar"}',
+        "spv_login_sql_segundos_count",
+        "spv_login_event_loop_lag_segundos",
+        "spv_login_hash_em_execucao 0",
+    ):
+        assert serie in texto
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from models.usuario_model import UsuarioModel
+from popular_usuarios import (
+    exportar_fixture,
+    gerar_usuarios,
+    inserir_em_lotes,
+    ler_fixture,
+    proximo_indice,
+)
+
+
+def test_gerar_usuarios_deterministico():
+    primeira = list(gerar_usuarios(50, semente=7))
+    segunda = list(gerar_usuarios(50, semente=7))
+    assert primeira == segunda
+    assert len({u["email"] for u in primeira}) == 50
+    assert list(gerar_usuarios(5, semente=8)) != primeira[:5]
+
+    rapido = list(gerar_usuarios(50, semente=7, hashes_distintos=4))
+    assert len({u["senha"] for u in rapido}) == 4
+
+
+def test_gerar_usuarios_continua_a_numeracao():
+    primeira = list(gerar_usuarios(10, semente=7))
+    segunda = list(gerar_usuarios(10, semente=7, inicio=10))
+    assert not {u["email"] for u in primeira} & {u["email"] for u in segunda}
+    assert segunda[0]["email"].endswith(".10@exemplo.com")
+
+
+@pytest.mark.asyncio
+async def test_fixture_recarregada_em_lotes(tmp_path, async_session_maker):
+    usuarios = [{**u, "senha": "hash"} for u in gerar_usuarios(25, semente=1)]
+    caminho = str(tmp_path / "usuarios.ndjson.gz")
+    assert exportar_fixture(caminho, usuarios) == 25
+
+    assert await inserir_em_lotes(async_session_maker, ler_fixture(caminho), lote=10) == 25
+
+    async with async_session_maker() as session:
+        total = await session.scalar(select(func.count()).select_from(UsuarioModel))
+    assert total == 25
+
+
+@pytest.mark.asyncio
+async def test_proximo_indice_depois_do_maior_gravado(async_session_maker):
+    async with async_session_maker() as session:
+        assert await proximo_indice(session) == 0
+
+    usuarios = [{**u, "senha": "hash"} for u in gerar_usuarios(5, semente=3)]
+    await inserir_em_lotes(async_session_maker, usuarios)
+
+    async with async_session_maker() as session:
+        # Apagar um usuário do meio não faz a numeração repetir um email
+        await session.delete(
+            await session.scalar(select(UsuarioModel).filter(UsuarioModel.email == usuarios[1]["email"]))
+        )
+        await session.commit()
+        assert await proximo_indice(session) == 5
+
+    seguintes = list(gerar_usuarios(1, semente=3, inicio=5))
+    assert seguintes[0]["email"] not in {u["email"] for u in usuarios}
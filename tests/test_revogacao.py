@@ -0,0 +1,210 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, insert, select
+
+from core.revogacao import ListaRevogacao, lista_revogacao, revogar_token
+from core.token import codec_jwt
+from models.refresh_token_model import RefreshTokenModel
+from models.token_revogado_model import TokenRevogadoModel
+from models.usuario_model import UsuarioModel
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _login(client: AsyncClient, dados: dict) -> str:
+    await client.post("/api/v1/usuarios/signup", json=dados)
+    response = await client.post(
+        "/api/v1/usuarios/login",
+        data={"username": dados["email"], "password": dados["senha"]},
+    )
+    return response.json()["access_token"]
+
+
+async def test_logout_revoga_token(client: AsyncClient, usuario_teste: dict):
+    token = await _login(client, usuario_teste)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post("/api/v1/usuarios/logout", headers=headers)
+    assert response.status_code == 204
+
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.status_code == 401
+
+
+async def test_admin_revoga_token(client: AsyncClient, usuario_teste: dict):
+    token = await _login(client, usuario_teste)
+    token_admin = await _login(client, {**usuario_teste, "email": "admin@example.com", "eh_admin": True})
+
+    jti = codec_jwt.decodificar(token)["jti"]
+    response = await client.post(
+        "/api/v1/usuarios/revogar",
+        json={"jti": jti},
+        headers={"Authorization": f"Bearer {token_admin}"},
+    )
+    assert response.status_code == 204
+
+    response = await client.get("/api/v1/usuarios/logado", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+async def test_revogar_recusa_jti_maior_que_a_coluna(client: AsyncClient, usuario_teste: dict):
+    token_admin = await _login(client, {**usuario_teste, "eh_admin": True})
+
+    response = await client.post(
+        "/api/v1/usuarios/revogar",
+        json={"jti": "x" * 33},
+        headers={"Authorization": f"Bearer {token_admin}"},
+    )
+    assert response.status_code == 422
+
+
+async def test_sincronizacao_incremental(db_session):
+    agora = int(time.time())
+    await revogar_token(db_session, "a" * 32, agora + 60)
+    await revogar_token(db_session, "b" * 32, agora - 1)
+
+    # Outra réplica: carrega tudo e depois apenas o que for novo
+    replica = ListaRevogacao(tamanho_pagina=1)
+    assert await replica.sincronizar(db_session) == 2
+    assert replica.revogado("a" * 32)
+
+    await revogar_token(db_session, "c" * 32, agora + 60)
+    assert await replica.sincronizar(db_session) == 1
+    assert replica.revogado("c" * 32)
+
+    # Tokens já expirados saem da memória na poda
+    assert replica.podar() == 1
+    assert not replica.revogado("b" * 32)
+
+
+async def test_sincronizacao_rele_ids_abaixo_da_marca_dagua(db_session):
+    agora = int(time.time())
+    for jti in ("a", "b", "c"):
+        await revogar_token(db_session, jti * 32, agora + 60)
+
+    # O id 2 ainda não fez commit quando a réplica lê o 3
+    await db_session.execute(delete(TokenRevogadoModel).where(TokenRevogadoModel.id == 2))
+    await db_session.commit()
+    replica = ListaRevogacao(sobreposicao=2)
+    assert await replica.sincronizar(db_session) == 2
+    assert replica.marca_dagua == 3
+
+    await db_session.execute(insert(TokenRevogadoModel).values(id=2, jti="d" * 32, expira_em=agora + 60))
+    await db_session.commit()
+    assert await replica.sincronizar(db_session) == 1
+    assert replica.revogado("d" * 32)
+
+
+async def test_remover_expirados_apaga_as_revogacoes_vencidas(db_session):
+    agora = int(time.time())
+    await revogar_token(db_session, "a" * 32, agora + 60)
+    await revogar_token(db_session, "b" * 32, agora - 1)
+
+    assert await lista_revogacao.remover_expirados(db_session) == 1
+    jtis = (await db_session.execute(select(TokenRevogadoModel.jti))).scalars().all()
+    assert jtis == ["a" * 32]
+
+
+async def test_remover_expirados_apaga_refresh_tokens_expirados_e_usados(db_session):
+    usuario = UsuarioModel(nome="Ana", sobrenome="Silva", email="ana@example.com", senha="x")
+    db_session.add(usuario)
+    await db_session.commit()
+
+    agora = int(time.time())
+    db_session.add_all(
+        [
+            RefreshTokenModel(jti="valido", usuario_id=usuario.id, expira_em=agora + 60),
+            RefreshTokenModel(jti="usado", usuario_id=usuario.id, expira_em=agora + 60, usado=True),
+            RefreshTokenModel(jti="expirado", usuario_id=usuario.id, expira_em=agora - 1),
+        ]
+    )
+    await db_session.commit()
+
+    assert await lista_revogacao.remover_expirados(db_session) == 2
+    jtis = (await db_session.execute(select(RefreshTokenModel.jti))).scalars().all()
+    assert jtis == ["valido"]
+
+
+async def test_refresh_falha_depois_do_logout(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    tokens = (
+        await client.post(
+            "/api/v1/usuarios/login",
+            data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+        )
+    ).json()
+
+    response = await client.post(
+        "/api/v1/usuarios/logout", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert response.status_code == 204
+
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+async def test_logout_encerra_so_a_sessao_do_dispositivo(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login_data = {"username": usuario_teste["email"], "password": usuario_teste["senha"]}
+    celular = (await client.post("/api/v1/usuarios/login", data=login_data)).json()
+    notebook = (await client.post("/api/v1/usuarios/login", data=login_data)).json()
+
+    # A rotação mantém a sessão do celular
+    celular = (
+        await client.post("/api/v1/usuarios/refresh", json={"refresh_token": celular["refresh_token"]})
+    ).json()
+
+    response = await client.post(
+        "/api/v1/usuarios/logout", headers={"Authorization": f"Bearer {celular['access_token']}"}
+    )
+    assert response.status_code == 204
+
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": celular["refresh_token"]})
+    assert response.status_code == 401
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": notebook["refresh_token"]})
+    assert response.status_code == 200
+
+
+async def test_logout_de_todos_os_dispositivos(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login_data = {"username": usuario_teste["email"], "password": usuario_teste["senha"]}
+    celular = (await client.post("/api/v1/usuarios/login", data=login_data)).json()
+    notebook = (await client.post("/api/v1/usuarios/login", data=login_data)).json()
+
+    response = await client.post(
+        "/api/v1/usuarios/logout/todos", headers={"Authorization": f"Bearer {celular['access_token']}"}
+    )
+    assert response.status_code == 204
+
+    for tokens in (celular, notebook):
+        response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+
+async def test_admin_revoga_refresh_token(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    tokens = (
+        await client.post(
+            "/api/v1/usuarios/login",
+            data={"username": usuario_teste["email"], "password": usuario_teste["senha"]},
+        )
+    ).json()
+    token_admin = await _login(client, {**usuario_teste, "email": "admin@example.com", "eh_admin": True})
+
+    response = await client.post(
+        "/api/v1/usuarios/revogar",
+        json={"jti": codec_jwt.decodificar(tokens["refresh_token"])["jti"]},
+        headers={"Authorization": f"Bearer {token_admin}"},
+    )
+    assert response.status_code == 204
+
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
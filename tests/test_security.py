@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from passlib.hash import bcrypt, scrypt
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from core.auth import aguardar_rehash
+from core.calibrar_hash import calibrar
+from core.configs import settings
+from core.security import criar_contexto, gerar_hash_senha_async, precisa_rehash, verificar_senha_async
+from models.usuario_model import UsuarioModel
+
+
+@pytest.mark.asyncio
+async def test_hash_e_verificacao_no_pool():
+    hash_senha = await gerar_hash_senha_async("senha123")
+    assert hash_senha != "senha123"
+    assert await verificar_senha_async("senha123", hash_senha)
+    assert not await verificar_senha_async("outra", hash_senha)
+
+
+@pytest.mark.asyncio
+async def test_login_refaz_hash_com_parametros_antigos(client, usuario_teste: dict, db_session):
+    for email, hash_antigo in (
+        ("rounds@example.com", bcrypt.using(rounds=4).hash(usuario_teste["senha"])),
+        ("scrypt@example.com", scrypt.using(rounds=8).hash(usuario_teste["senha"])),
+    ):
+        await db_session.execute(
+            insert(UsuarioModel).values(
+                nome="Antigo", sobrenome="Hash", email=email, senha=hash_antigo, eh_admin=False
+            )
+        )
+        await db_session.commit()
+
+        response = await client.post(
+            "/api/v1/usuarios/login",
+            data={"username": email, "password": usuario_teste["senha"]},
+        )
+        assert response.status_code == 200
+        await aguardar_rehash()
+
+        novo_hash = (
+            await db_session.execute(select(UsuarioModel.senha).filter(UsuarioModel.email == email))
+        ).scalar_one()
+        assert novo_hash != hash_antigo
+        assert novo_hash.startswith("$2b$12$")
+        assert not precisa_rehash(novo_hash)
+
+
+def test_contexto_argon2id(monkeypatch):
+    monkeypatch.setattr(settings, "ARGON2_MEMORY_COST", 1024)
+    contexto = criar_contexto("argon2")
+    hash_senha = contexto.hash("senha123")
+    assert hash_senha.startswith("$argon2id$")
+    assert contexto.verify("senha123", hash_senha)
+    # Hashes bcrypt existentes continuam válidos, mas ficam obsoletos
+    hash_bcrypt = criar_contexto("bcrypt").hash("senha123")
+    assert contexto.verify("senha123", hash_bcrypt)
+    assert contexto.needs_update(hash_bcrypt)
+
+
+def test_calibracao_respeita_orcamento():
+    custo, medicoes = calibrar("bcrypt", orcamento_ms=1, amostras=1)
+    assert custo == 4
+    assert medicoes[0][0] == 4
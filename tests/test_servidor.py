@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+from unittest.mock import patch
+
+from core.servidor import calcular_workers, cpus_disponiveis
+
+
+def test_cpus_da_cota_cgroup_v2(tmp_path: Path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    with patch("core.servidor._cpus_da_maquina", return_value=8):
+        assert cpus_disponiveis(tmp_path) == 1.5
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    with patch("core.servidor._cpus_da_maquina", return_value=8):
+        assert cpus_disponiveis(tmp_path) == 8
+
+
+def test_cpus_da_cota_cgroup_v1(tmp_path: Path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("20000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    with patch("core.servidor._cpus_da_maquina", return_value=8):
+        assert cpus_disponiveis(tmp_path) == 0.2
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    with patch("core.servidor._cpus_da_maquina", return_value=4):
+        assert cpus_disponiveis(tmp_path) == 4
+
+
+def test_cota_acima_das_cpus_da_maquina(tmp_path: Path):
+    (tmp_path / "cpu.max").write_text("800000 100000\n")
+    with patch("core.servidor._cpus_da_maquina", return_value=2):
+        assert cpus_disponiveis(tmp_path) == 2
+
+
+def test_calcular_workers():
+    # Padrão: um worker por pod, qualquer que seja a cota
+    assert calcular_workers(4) == 1
+
+    with patch("core.servidor.settings.SERVIDOR_WORKERS", 0):
+        assert calcular_workers(0.2) == 1
+        assert calcular_workers(1.5) == 1
+        assert calcular_workers(4) == 4
+
+    with patch("core.servidor.settings.SERVIDOR_WORKERS", 3):
+        assert calcular_workers(8) == 3
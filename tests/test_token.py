@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(str(Path(__file__).parent.parent))
+
+import json
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from core.token import CodecJWT, CodecSobDemanda
+from gerar_chaves_jwt import gerar_chave_privada
+
+SEGREDO = "segredo-de-teste"
+
+
+@pytest.fixture
+def codec() -> CodecJWT:
+    return CodecJWT(SEGREDO, "HS256", cache_max_itens=100, cache_ttl_segundos=60)
+
+
+def test_compativel_com_python_jose(codec: CodecJWT):
+    claims = {"sub": "1", "exp": int(time.time()) + 60}
+
+    token = codec.codificar(claims)
+    assert jwt.decode(token, SEGREDO, algorithms=["HS256"]) == claims
+
+    token_jose = jwt.encode(claims, SEGREDO, algorithm="HS256")
+    assert codec.decodificar(token_jose) == claims
+
+
+def test_rejeita_assinatura_e_algoritmo_invalidos(codec: CodecJWT):
+    token = codec.codificar({"sub": "1"})
+
+    with pytest.raises(JWTError):
+        codec.decodificar(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+    with pytest.raises(JWTError):
+        codec.decodificar(jwt.encode({"sub": "1"}, "outro-segredo", algorithm="HS256"))
+    with pytest.raises(JWTError):
+        codec.decodificar(jwt.encode({"sub": "1"}, SEGREDO, algorithm="HS512"))
+    with pytest.raises(JWTError):
+        codec.decodificar("nao-e-um-token")
+
+
+def test_cache_respeita_exp(codec: CodecJWT, monkeypatch):
+    agora = time.time()
+    token = codec.codificar({"sub": "1", "exp": int(agora) + 5})
+
+    assert codec.decodificar(token)["sub"] == "1"
+    assert codec.decodificar(token)["sub"] == "1"
+    assert codec.cache.hits == 1
+
+    monkeypatch.setattr(time, "time", lambda: agora + 10)
+    with pytest.raises(JWTError):
+        codec.decodificar(token)
+
+
+def test_assimetrico_com_rotacao_de_chaves():
+    chave_antiga = gerar_chave_privada("ES256")
+    chave_nova = gerar_chave_privada("ES256")
+    antigo = CodecJWT(chave_antiga, "ES256", 0, 0)
+    token_antigo = antigo.codificar({"sub": "1"})
+
+    novo = CodecJWT(chave_nova, "ES256", 0, 0, chaves_anteriores=[chave_antiga])
+    token_novo = novo.codificar({"sub": "2"})
+
+    assert jwt.get_unverified_header(token_novo)["kid"] == novo.kid
+    assert novo.decodificar(token_novo)["sub"] == "2"
+    assert novo.decodificar(token_antigo)["sub"] == "1"
+    with pytest.raises(JWTError):
+        antigo.decodificar(token_novo)
+
+    # O JWKS publica só as chaves públicas, com os kids usados nos tokens
+    chaves = json.loads(novo.jwks_json)["keys"]
+    assert {c["kid"] for c in chaves} == {antigo.kid, novo.kid}
+    assert all("d" not in c for c in chaves)
+    assert jwt.decode(token_novo, json.loads(novo.jwks_json), algorithms=["ES256"])["sub"] == "2"
+
+
+def test_rs256():
+    codec = CodecJWT(gerar_chave_privada("RS256", bits=1024), "RS256", 0, 0)
+    assert codec.decodificar(codec.codificar({"sub": "1"}))["sub"] == "1"
+
+
+def test_codec_sob_demanda_repassa_leitura_e_escrita():
+    criados = []
+
+    def _fabrica() -> CodecJWT:
+        criados.append(CodecJWT(SEGREDO, "HS256", 0, 0))
+        return criados[-1]
+
+    proxy = CodecSobDemanda(_fabrica)
+    assert criados == []
+
+    proxy.algoritmo = "HS512"
+    assert proxy.codec is criados[0]
+    assert criados[0].algoritmo == "HS512"
+    assert proxy.algoritmo == "HS512"
+    assert len(criados) == 1
+
+
+@pytest.mark.asyncio
+async def test_endpoint_jwks_com_etag(client):
+    response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    # HS256: nenhum segredo é publicado
+    assert response.json() == {"keys": []}
+
+    response = await client.get(
+        "/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
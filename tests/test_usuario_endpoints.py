@@ -7,6 +7,10 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete
+
+from core.configs import settings
+from models.usuario_model import UsuarioModel
 
 pytestmark = pytest.mark.asyncio
 
@@ -90,4 +94,87 @@ async def test_get_usuario_logado(client: AsyncClient, usuario_teste: dict, toke
     response = await client.get("/api/v1/usuarios/logado", headers=headers)
     assert response.status_code == 200
     data = response.json()
-    assert data["email"] == usuario_teste["email"] 
\ No newline at end of file
+    assert data["email"] == usuario_teste["email"] 
+
+
+async def test_get_usuario_logado_stateless(
+    client: AsyncClient, usuario_teste: dict, db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+
+    response = await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    assert response.status_code == 201
+    login_data = {
+        "username": usuario_teste["email"],
+        "password": usuario_teste["senha"]
+    }
+    response = await client.post("/api/v1/usuarios/login", data=login_data)
+    token = response.json()["access_token"]
+
+    # Sem o usuário no banco, o token stateless continua suficiente
+    await db_session.execute(delete(UsuarioModel))
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == usuario_teste["email"]
+
+
+async def test_get_usuarios_paginado(client: AsyncClient, usuario_teste: dict):
+    for i in range(5):
+        dados = {**usuario_teste, "email": f"user{i}@example.com", "eh_admin": i % 2 == 0}
+        response = await client.post("/api/v1/usuarios/signup", json=dados)
+        assert response.status_code == 201
+
+    # Primeira página
+    response = await client.get("/api/v1/usuarios/", params={"limite": 2})
+    assert response.status_code == 200
+    assert [u["email"] for u in response.json()] == ["user0@example.com", "user1@example.com"]
+    cursor = response.headers["X-Proximo-Cursor"]
+
+    # Páginas seguintes até o fim
+    emails = []
+    while cursor:
+        response = await client.get("/api/v1/usuarios/", params={"limite": 2, "cursor": cursor})
+        emails += [u["email"] for u in response.json()]
+        cursor = response.headers.get("X-Proximo-Cursor")
+    assert emails == ["user2@example.com", "user3@example.com", "user4@example.com"]
+
+    # Filtros
+    response = await client.get("/api/v1/usuarios/", params={"eh_admin": True})
+    assert len(response.json()) == 3
+    response = await client.get("/api/v1/usuarios/", params={"email_prefixo": "user3"})
+    assert [u["email"] for u in response.json()] == ["user3@example.com"]
+
+    response = await client.get("/api/v1/usuarios/", params={"cursor": "invalido"})
+    assert response.status_code == 400
+
+
+async def test_refresh_token_rotacao(client: AsyncClient, usuario_teste: dict):
+    await client.post("/api/v1/usuarios/signup", json=usuario_teste)
+    login_data = {
+        "username": usuario_teste["email"],
+        "password": usuario_teste["senha"]
+    }
+    response = await client.post("/api/v1/usuarios/login", data=login_data)
+    refresh_token = response.json()["refresh_token"]
+
+    # O refresh token não serve como token de acesso
+    headers = {"Authorization": f"Bearer {refresh_token}"}
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.status_code == 401
+
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["refresh_token"] != refresh_token
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    response = await client.get("/api/v1/usuarios/logado", headers=headers)
+    assert response.status_code == 200
+
+    # Reutilizar o refresh token antigo falha e revoga o novo também
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    response = await client.post("/api/v1/usuarios/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 401